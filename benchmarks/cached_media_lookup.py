@@ -0,0 +1,133 @@
+"""
+Benchmark: cache lookup by object, the old ILIKE query vs the cached_media_lookup probe, at growing table sizes.
+
+Creates the real cached_media tables (via MediaInfoCache) in a scratch schema, fills them with synthetic rows
+and, at each size, prints the query plan and the average latency of both queries. The scratch schema is dropped
+at the end. Uses the same POSTGRES_* variables as the API.
+
+Usage:
+    OTEL_EXPORTER_OTLP_ENDPOINT=http://localhost:4318 python -m benchmarks.cached_media_lookup --sizes 10000,100000,1000000
+"""
+import argparse
+import os
+import time
+
+import psycopg2
+from dotenv import load_dotenv
+from psycopg2.pool import SimpleConnectionPool
+
+from src.repositories.media_info_cache import MediaInfoCache
+
+_SCHEMA = "media_lookup_benchmark"
+
+# What get_cached_by_obj used to run for a movie with a year.
+_LEGACY_QUERY = """
+    SELECT * FROM cached_media
+    WHERE (title ILIKE %s or searchable_reference ILIKE %s or searchable_reference ILIKE %s)
+      and media_type ILIKE %s and year = %s
+"""
+
+# What get_cached_by_obj runs now for the same object.
+_LOOKUP_QUERY = """
+    SELECT cm.* FROM unnest(%s::text[], %s::text[]) AS wanted(lookup_field, lookup_key)
+    JOIN cached_media_lookup AS lookup
+      ON lookup.lookup_field = wanted.lookup_field
+     AND lookup.lookup_key = wanted.lookup_key
+    JOIN cached_media AS cm ON cm.id = lookup.media_id
+    WHERE lookup.media_type = %s
+      AND lookup.year = %s
+    LIMIT 1
+"""
+
+_FILL_QUERY = """
+    INSERT INTO cached_media (searchable_reference, tmdb_id, title, original_title, media_type, year)
+    SELECT 'benchmark title ' || n, n, 'Benchmark Title ' || n, 'Benchmark Title ' || n, 'movie', 1950 + n %% 70
+    FROM generate_series(%s, %s) AS n;
+"""
+
+
+def _connection_kwargs() -> dict:
+    return {
+        "host": os.environ["POSTGRES_HOST"],
+        "port": int(os.environ["POSTGRES_PORT"]),
+        "user": os.environ["POSTGRES_USER"],
+        "password": os.environ["POSTGRES_PASSWORD"],
+        "dbname": os.environ.get("POSTGRES_DB", "extended_media_info"),
+    }
+
+
+def _run_sql(statement: str) -> None:
+    conn = psycopg2.connect(**_connection_kwargs())
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(statement)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _plan(cursor, query: str, args: tuple) -> str:
+    cursor.execute(f"EXPLAIN (ANALYZE, COSTS OFF) {query}", args)
+    return "\n".join(f"    {row[0]}" for row in cursor.fetchall())
+
+
+def _average_ms(cursor, query: str, args: tuple, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        cursor.execute(query, args)
+        cursor.fetchall()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma separated table sizes to measure.")
+    parser.add_argument("--repeat", type=int, default=20, help="Executions per query when measuring latency.")
+    args = parser.parse_args()
+
+    load_dotenv()
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+
+    # uuid-ossp goes in public first: created from the scratch schema, dropping it would take the extension along.
+    _run_sql(f'CREATE EXTENSION IF NOT EXISTS "uuid-ossp" SCHEMA public; DROP SCHEMA IF EXISTS {_SCHEMA} CASCADE; CREATE SCHEMA {_SCHEMA};')
+    pool = SimpleConnectionPool(minconn=1, maxconn=2, options=f"-c search_path={_SCHEMA},public", **_connection_kwargs())
+
+    try:
+        MediaInfoCache(pool)
+        conn = pool.getconn()
+        rows = 0
+
+        with conn.cursor() as cursor:
+            for size in sizes:
+                started = time.perf_counter()
+                cursor.execute(_FILL_QUERY, (rows + 1, size))
+                cursor.execute("ANALYZE cached_media; ANALYZE cached_media_lookup;")
+                conn.commit()
+                print(f"\n== {size} rows (filled {size - rows} in {time.perf_counter() - started:.1f}s)")
+                rows = size
+
+                # Look for a row in the middle of the table, so the scan can't get lucky early.
+                target = size // 2
+                title = f"Benchmark Title {target}"
+                reference = f"benchmark title {target}"
+                year = 1950 + target % 70
+                legacy_args = (title, reference, reference, "movie", year)
+                lookup_args = (["searchable_reference", "title"], [reference, title.lower()], "movie", year)
+
+                print("  legacy ILIKE query:")
+                print(_plan(cursor, _LEGACY_QUERY, legacy_args))
+                print("  lookup table probe:")
+                print(_plan(cursor, _LOOKUP_QUERY, lookup_args))
+
+                legacy_ms = _average_ms(cursor, _LEGACY_QUERY, legacy_args, args.repeat)
+                lookup_ms = _average_ms(cursor, _LOOKUP_QUERY, lookup_args, args.repeat)
+                print(f"  avg latency: legacy {legacy_ms:8.3f} ms | lookup {lookup_ms:8.3f} ms")
+
+        pool.putconn(conn)
+    finally:
+        pool.closeall()
+        _run_sql(f"DROP SCHEMA IF EXISTS {_SCHEMA} CASCADE;")
+
+
+if __name__ == "__main__":
+    main()
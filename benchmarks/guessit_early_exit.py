@@ -0,0 +1,60 @@
+"""
+Candidates parsed and GuessIt calls per request: parsing every candidate vs ranked evaluation with early exit,
+over the file paths in fixtures/scene_name_corpus.py. The memo cache is cleared before each path, so every request
+starts cold.
+
+Usage:
+    OTEL_EXPORTER_OTLP_ENDPOINT=http://localhost:4318 python -m benchmarks.guessit_early_exit
+"""
+import argparse
+import time
+
+from fixtures.scene_name_corpus import FILE_PATHS
+from src.media_identifiers.media_identification_tasks import guessit_tasks
+
+
+def _run(pick, file_paths) -> dict:
+    parsed = []
+    score_candidate = guessit_tasks._score_candidate
+
+    def counting_score_candidate(candidate, index):
+        parsed.append(candidate)
+        return score_candidate(candidate, index)
+
+    guessit_calls_before = guessit_tasks.get_guessit_stats()["guessit_parses"]
+    guessit_tasks._score_candidate = counting_score_candidate
+    started = time.perf_counter()
+    try:
+        for file_path in file_paths:
+            guessit_tasks.get_guessit_cache().clear()
+            pick(guessit_tasks._generate_guessit_inputs(file_path))
+    finally:
+        guessit_tasks._score_candidate = score_candidate
+
+    return {
+        "parsed": len(parsed),
+        "guessit_calls": guessit_tasks.get_guessit_stats()["guessit_parses"] - guessit_calls_before,
+        "ms": (time.perf_counter() - started) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    file_paths = list(FILE_PATHS)
+    candidates = sum(len(guessit_tasks._generate_guessit_inputs(file_path)) for file_path in file_paths)
+
+    # The first GuessIt call builds its rules; keep it out of the measurement.
+    _run(guessit_tasks._pick_best_candidate, file_paths[:1])
+
+    print(f"{len(file_paths)} requests, {candidates} candidates ({candidates / len(file_paths):.2f} per request)")
+    for label, pick in (("exhaustive", guessit_tasks._pick_best_candidate),
+                        ("ranked", guessit_tasks._pick_best_candidate_ranked)):
+        result = _run(pick, file_paths)
+        print(f"{label:>10}: {result['parsed'] / len(file_paths):.2f} parsed/request | "
+              f"{result['guessit_calls'] / len(file_paths):.2f} GuessIt calls/request | {result['ms']:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
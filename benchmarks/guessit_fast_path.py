@@ -0,0 +1,54 @@
+"""
+Throughput benchmark: parsing release names with GuessIt only vs the fast path with GuessIt as fallback.
+The memo cache is bypassed, so every name is parsed every time.
+
+Usage:
+    OTEL_EXPORTER_OTLP_ENDPOINT=http://localhost:4318 python -m benchmarks.guessit_fast_path --rounds 5
+"""
+import argparse
+import time
+
+from guessit import guessit
+
+from src.media_identifiers.media_identification_tasks.guessit_tasks import _fast_parse_candidate
+from fixtures.scene_name_corpus import SCENE_NAMES
+
+
+def _guessit_only(name: str) -> dict:
+    return dict(guessit(name))
+
+
+def _fast_path_first(name: str) -> dict:
+    fast_metadata = _fast_parse_candidate(name)
+    return fast_metadata if fast_metadata is not None else dict(guessit(name))
+
+
+def _measure(parse, names, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for name in names:
+            parse(name)
+    return rounds * len(names) / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=5, help="Passes over the corpus per strategy.")
+    args = parser.parse_args()
+
+    names = list(SCENE_NAMES)
+    canonical = [name for name in names if _fast_parse_candidate(name) is not None]
+
+    # The first GuessIt call builds its rules; keep it out of the measurement.
+    guessit(names[0])
+
+    print(f"{len(names)} names, {len(canonical)} parsed by the fast path ({len(canonical) / len(names):.0%})")
+    for label, corpus in (("whole corpus", names), ("canonical only", canonical)):
+        guessit_rate = _measure(_guessit_only, corpus, args.rounds)
+        fast_rate = _measure(_fast_path_first, corpus, args.rounds)
+        print(f"{label:>15}: guessit {guessit_rate:9.0f} names/s | fast path {fast_rate:9.0f} names/s "
+              f"({fast_rate / guessit_rate:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
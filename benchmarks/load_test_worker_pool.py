@@ -0,0 +1,105 @@
+"""
+Load test: N concurrent requests, each blocked on a slow upstream call, against two tiny FastAPI apps.
+
+- inline: the blocking call runs directly inside the `async def` endpoint (what the API used to do).
+- offloaded: the blocking call runs on BlockingWorkerPool (what the API does now).
+
+Usage:
+    OTEL_EXPORTER_OTLP_ENDPOINT=http://localhost:4318 python -m benchmarks.load_test_worker_pool --requests 32 --delay 0.5
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI
+
+from src.worker_pool import BlockingWorkerPool
+
+
+def _build_inline_app(delay: float) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow():
+        time.sleep(delay)
+        return {"ok": True}
+
+    return app
+
+
+def _build_offloaded_app(delay: float, pool: BlockingWorkerPool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow():
+        await pool.run(time.sleep, delay)
+        return {"ok": True}
+
+    return app
+
+
+async def _get(app: FastAPI, path: str) -> int:
+    """Calls the app in-process through ASGI, so the benchmark needs no HTTP client. Returns the status code."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"loadtest")],
+        "client": ("127.0.0.1", 0),
+        "server": ("loadtest", 80),
+    }
+    response = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+
+    await app(scope, receive, send)
+    return response["status"]
+
+
+async def _fire(app: FastAPI, total_requests: int) -> float:
+    started = time.perf_counter()
+    statuses = await asyncio.gather(*(_get(app, "/slow") for _ in range(total_requests)))
+    elapsed = time.perf_counter() - started
+
+    failed = [status for status in statuses if status != 200]
+    if failed:
+        raise RuntimeError(f"{len(failed)} requests failed. First status: {failed[0]}")
+
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=32, help="Concurrent requests to fire.")
+    parser.add_argument("--delay", type=float, default=0.5, help="Seconds each simulated upstream call blocks.")
+    parser.add_argument("--workers", type=int, default=8, help="Worker pool size for the offloaded run.")
+    args = parser.parse_args()
+
+    pool = BlockingWorkerPool(max_workers=args.workers, max_queue_depth=args.requests, name="loadtest")
+
+    runs = {
+        "inline": _build_inline_app(args.delay),
+        "offloaded": _build_offloaded_app(args.delay, pool),
+    }
+
+    print(f"{args.requests} concurrent requests, {args.delay}s upstream latency, {args.workers} workers")
+    for label, app in runs.items():
+        elapsed = asyncio.run(_fire(app, args.requests))
+        print(f"{label:>10}: {elapsed:6.2f}s total | {args.requests / elapsed:7.2f} req/s")
+
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
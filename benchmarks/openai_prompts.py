@@ -0,0 +1,91 @@
+"""
+Micro-benchmark: building an OpenAI prompt by reading the AI function source on every call (what we used to do)
+vs reusing the prefix rendered once by the prompt registry.
+
+With --report, also prints cached vs uncached input tokens per AI function and prompt version from openai_history
+(needs the POSTGRES_* variables).
+
+Usage:
+    OTEL_EXPORTER_OTLP_ENDPOINT=http://localhost:4318 python -m benchmarks.openai_prompts --iterations 2000 --report
+"""
+import argparse
+import inspect
+import time
+
+from dotenv import load_dotenv
+
+from src.media_identifiers.ai_functions import extract_movie_title_ai_function, extract_series_title_ai_function
+from src.media_identifiers.ai_functions.extract_media_type_ai_function import extract_media_type_from_filename
+from src.media_identifiers.ai_functions.extract_season_episode_ai_function import extract_season_episode_from_filename
+from src.media_identifiers.prompt_registry import PromptRegistry
+
+_AI_FUNCTIONS = [
+    extract_media_type_from_filename,
+    extract_movie_title_ai_function,
+    extract_series_title_ai_function,
+    extract_season_episode_from_filename,
+]
+_FILE_PATH = "Breaking.Bad.S05E14.720p.HDTV.x264-IMMERSE.mkv"
+_MODEL = "gpt-4o-mini"
+
+
+def _build_with_getsource(file_path: str, ai_function) -> str:
+    return f"""Output only the result as specified in the function comments below.
+Function code:
+```python
+{inspect.getsource(ai_function)}
+```
+Input:
+```plaintext
+{file_path}
+```"""
+
+
+def _measure(build, iterations: int) -> float:
+    started = time.perf_counter()
+    for index in range(iterations):
+        build(f"{index}.{_FILE_PATH}", _AI_FUNCTIONS[index % len(_AI_FUNCTIONS)])
+    return (time.perf_counter() - started) * 1_000_000 / iterations
+
+
+def _print_token_report(days: int) -> None:
+    from src.repositories.repository_factory import get_repository
+
+    report = get_repository("openai_logger").get_token_usage_report(days)
+    print(f"\nToken usage over the last {days} days:")
+    print(f"{'ai_function':<40} {'version':<14} {'calls':>7} {'input':>10} {'cached':>10} {'uncached':>10} {'cached %':>9}")
+    for row in report:
+        print(
+            f"{row['ai_function']:<40} {row['prompt_version']:<14} {row['calls']:>7} {row['input_tokens']:>10} "
+            f"{row['cached_tokens']:>10} {row['uncached_tokens']:>10} {row['cached_ratio'] * 100:>8.1f}%"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000, help="Prompts to build per strategy.")
+    parser.add_argument("--report", action="store_true", help="Also print the cached token report from the database.")
+    parser.add_argument("--days", type=int, default=7, help="Days covered by the token report.")
+    args = parser.parse_args()
+
+    registry = PromptRegistry()
+    registry.register_all(_AI_FUNCTIONS, model=_MODEL)
+
+    for ai_function in _AI_FUNCTIONS:
+        prompt = registry.get(ai_function, _MODEL)
+        assert prompt.build_input(_FILE_PATH) == _build_with_getsource(_FILE_PATH, ai_function)
+
+    getsource_us = _measure(_build_with_getsource, args.iterations)
+    registry_us = _measure(lambda file_path, ai_function: registry.get(ai_function, _MODEL).build_input(file_path), args.iterations)
+
+    print(f"{args.iterations} prompts per strategy")
+    print(f"{'getsource':>10}: {getsource_us:9.2f} us/prompt")
+    print(f"{'registry':>10}: {registry_us:9.2f} us/prompt ({getsource_us / registry_us:.0f}x faster)")
+
+    if args.report:
+        load_dotenv()
+        _print_token_report(args.days)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Micro-benchmark: per-request pipeline overhead (getting the handlers and evaluating which steps apply), without
+running any step.
+
+- per_request: builds every handler again and evaluates every `handles()` predicate, normalizing the media type
+  in each typed predicate (roughly what we used to do).
+- plan: reuses the cached plan for the request's mode and skips the steps that can't apply to the media type.
+
+Each is measured for a movie and a TV episode, with tracing enabled and disabled (OTEL_SDK_DISABLED), each in its
+own process.
+
+Usage:
+    OTEL_EXPORTER_OTLP_ENDPOINT=http://localhost:4318 python -m benchmarks.pipeline_overhead --iterations 20000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+_MEDIA = {
+    "movie": {"media_type": "movie", "title": "Heat", "year": 1995, "tmdb_id": 949},
+    "tv": {"media_type": "tv", "title": "Dark", "year": 2017, "season": 1, "episode": 2, "tmdb_id": 70523,
+           "tmdb_series_id": 70523},
+}
+
+
+def _measure(iterations: int) -> dict:
+    # Imported here so OTEL_SDK_DISABLED is set before the tracer providers are created.
+    from src.media_identifiers.media_type_helpers import normalize_media_type
+    from src.media_identifiers.pipeline import PipelineContext, build_pipeline
+    from src.media_identifiers.pipeline.builder import _build_plan
+    from src.models.media_identification_request import MediaIdentificationRequest
+
+    request = MediaIdentificationRequest.from_filename("benchmark.mkv")
+
+    def per_request(media: dict) -> None:
+        context = PipelineContext(request, cache_repository=None)
+        context.media = dict(media)
+        handlers = _build_plan.__wrapped__(request.mode)
+        for handler in handlers:
+            if handler.media_types is not None:
+                normalize_media_type(context.media_type)
+            handler.handles(context)
+
+    def plan(media: dict) -> None:
+        context = PipelineContext(request, cache_repository=None)
+        context.media = dict(media)
+        handlers = build_pipeline(request)
+        for index, handler in enumerate(handlers):
+            if handlers.applies(index, context.normalized_media_type):
+                handler.handles(context)
+
+    results = {}
+    for name, strategy in [("per_request", per_request), ("plan", plan)]:
+        for media_type, media in _MEDIA.items():
+            strategy(media)
+            started = time.perf_counter()
+            for _ in range(iterations):
+                strategy(media)
+            results[f"{name}/{media_type}"] = (time.perf_counter() - started) * 1_000_000 / iterations
+    return results
+
+
+def _run_child(iterations: int, tracing: bool) -> dict:
+    env = {**os.environ, "OTEL_SDK_DISABLED": "false" if tracing else "true"}
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.pipeline_overhead", "--iterations", str(iterations), "--child"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000, help="Requests simulated per strategy.")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(_measure(args.iterations)), flush=True)
+        # Don't wait for the span exporter to give up on the collector.
+        os._exit(0)
+
+    print(f"{args.iterations} requests per strategy, us/request")
+    print(f"{'tracing':>8} {'media':>6} {'per_request':>12} {'plan':>9} {'speedup':>8}")
+    for tracing in (True, False):
+        results = _run_child(args.iterations, tracing)
+        for media_type in _MEDIA:
+            per_request_us = results[f"per_request/{media_type}"]
+            plan_us = results[f"plan/{media_type}"]
+            print(
+                f"{'on' if tracing else 'off':>8} {media_type:>6} {per_request_us:>12.2f} {plan_us:>9.2f} "
+                f"{per_request_us / plan_us:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Release names and file paths used to check GuessIt shortcuts against the full parse, and to benchmark them.
+
+CANONICAL_SCENE_NAMES are the scene names the fast path must parse exactly like GuessIt, NON_CANONICAL_SCENE_NAMES
+the tricky ones it must leave to GuessIt, and SCENE_NAMES both. FILE_PATHS are whole paths as the API receives them,
+several candidates each.
+"""
+
+CANONICAL_SCENE_NAMES = (
+    "The.Matrix.1999.1080p.BluRay.x264.DTS-FGT.mkv",
+    "the.matrix.1999.1080p.bluray.x264-grp.mkv",
+    "The Matrix 1999 1080p BluRay x264-GRP",
+    "Gone.Girl.2014.1080p.BluRay.x264-SPARKS",
+    "Heat.1995.mkv",
+    "Death Proof 2007 1080p BluRay x264-1920",
+    "Death.Proof.2007.1080p.BluRay.x264-1920",
+    "Inception.2010.720p.BluRay.x264-REFiNED.mkv",
+    "Oppenheimer.2023.1080p.WEB-DL.DDP5.1.Atmos.H.264-FLUX.mkv",
+    "Arrival.2016.1080p.WEBRip.x264-RARBG.mp4",
+    "Joker.2019.PROPER.1080p.WEBRip.x264-GRP",
+    "The.Lord.of.the.Rings.The.Fellowship.of.the.Ring.2001.EXTENDED.1080p.BluRay.x264",
+    "Mad.Max.Fury.Road.2015.1080p.BluRay.x264-SPARKS",
+    "Pulp.Fiction.1994.1080p.BluRay.x264-AMIABLE",
+    "Godzilla.Minus.One.2023.1080p.WEB-DL.AAC2.0.H.264-GRP",
+    "Avatar.The.Way.of.Water.2022.2160p.WEB-DL.DDP5.1.Atmos.HDR.HEVC-CMRG",
+    "Lost.in.Translation.2003.1080p.BluRay.x264",
+    "Back.to.the.Future.1985.1080p.BluRay.x264",
+    "Death.on.the.Nile.2022.1080p.WEB-DL.DDP5.1.H.264-EVO",
+    "Men.In.Black.1997.1080p.BluRay.x264",
+    "Breaking.Bad.S05E14.720p.HDTV.x264-IMMERSE.mkv",
+    "Breaking Bad S05E14 720p HDTV x264-IMMERSE",
+    "Friends.2x11.480p.DVD.x264-SAiNTS.mkv",
+    "Grey's.Anatomy.S01E01.720p.WEB-DL.DDP5.1.H.264-NTb.mkv",
+    "Chernobyl.2019.S01E03.720p.WEB-DL.x264-MEMENTO.mkv",
+    "Doctor.Who.2005.S01E01.mkv",
+    "Mad.Men.S01E01.REPACK.720p.BluRay.x264-GRP",
+    "Sherlock.S04E01.1080p.AMZN.WEB-DL.DDP5.1.H.264-NTb",
+    "Fargo.S01E01.720p.HDTV.x264-KILLERS",
+    "Lost.S01E01E02.720p.mkv",
+    "Rick.and.Morty.S05E01E02.720p.WEBRip.x264-ION10.mkv",
+    "Game.of.Thrones.S08E06.1080p.WEB.H264-MEMENTO",
+    "Severance.S02E01.1080p.ATVP.WEB-DL.DDP5.1.Atmos.H.264-FLUX.mkv",
+    "The.Mandalorian.S03E08.2160p.DSNP.WEB-DL.DDP5.1.Atmos.DV.HDR.H.265-FLUX",
+    "Stranger.Things.S04E09.1080p.NF.WEB-DL.DDP5.1.Atmos.x264-TEPES",
+    "House.of.the.Dragon.S01E01.1080p.WEB.H264-CAKES",
+    "Only.Murders.in.the.Building.S03E01.1080p.WEB.h264-ETHEL",
+    "Ted.Lasso.S03E12.2160p.ATVP.WEB-DL.DDP5.1.Atmos.HDR.H.265-NTb",
+    "Succession.S04E10.720p.HDTV.x264-SYNCOPY",
+    "The.Crown.S06E10.1080p.NF.WEB-DL.DDP5.1.Atmos.H.264-FLUX",
+    "Better.Things.S01E01.720p.HDTV.x264-FLEET",
+    "Peaky.Blinders.6x01.720p.HDTV.x264-FENiX",
+    "Westworld.S04E08.2160p.HMAX.WEB-DL.x265.10bit.HDR.DDP5.1.Atmos-SMURF",
+    "Westworld 2016 S01E01 1080p BluRay x264-ROVERS",
+    "Dexter.New.Blood.S01E01.1080p.WEB.H264-GGEZ",
+    "Frasier.2023.S01E01.1080p.WEB.h264-ETHEL",
+)
+
+NON_CANONICAL_SCENE_NAMES = (
+    "Interstellar.2014.2160p.UHD.BluRay.x265.10bit.HDR.DTS-HD.MA.5.1-SWTYBLZ",
+    "Parasite.2019.KOREAN.1080p.BluRay.x264.DTS-FGT",
+    "Alien.1979.Directors.Cut.1080p.BluRay.x264",
+    "Blade.Runner.2049.2017.1080p.BluRay.x264-GROUP.mkv",
+    "Se7en.1995.avi",
+    "2012.2009.BluRay.avi",
+    "Us.2019.1080p.BluRay.x264-GRP",
+    "Up.2009.1080p.BluRay.x264-GRP",
+    "It.2017.1080p.BluRay.x264-GRP",
+    "Dune.Part.Two.2024.2160p.WEB-DL.DDP5.1.Atmos.DV.HDR.H.265-FLUX",
+    "Spider-Man.No.Way.Home.2021.1080p.WEB-DL.DDP5.1.H.264-EVO",
+    "Amelie.2001.FRENCH.1080p.BluRay.x264-GRP",
+    "Kill.Bill.Vol.1.2003.1080p.BluRay.x264",
+    "Toy.Story.3.2010.1080p.BluRay.x264",
+    "Grave.of.the.Fireflies.1988.JAPANESE.1080p.BluRay.x264",
+    "Once.Upon.a.Time.in.Hollywood.2019.1080p.BluRay.x264-SPARKS",
+    "Stand.By.Me.1986.1080p.BluRay.x264",
+    "The.Office.US.S07E17.720p.NF.WEB-DL.DDP5.1.x264-NTb.mkv",
+    "Show.S01E02.Episode.Name.720p.mkv",
+    "Mr.Robot.S01E01.eps1.0_hellofriend.mov.720p",
+    "Seinfeld.821.720p.HDTV.x264-GROUP.mkv",
+    "The.Last.of.Us.S01E03.2160p.HMAX.WEB-DL.DDP5.1.Atmos.DV.HDR.H.265-FLUX",
+    "The.Bear.S02E06.Fishes.1080p.HULU.WEB-DL.DDP5.1.H.264-NTb",
+    "Shogun.2024.S01E01.Anjin.1080p.DSNP.WEB-DL.DDP5.1.H.264-NTb",
+    "Band.of.Brothers.E01.Currahee.1080p.BluRay.x264",
+    "Dark.S01.1080p.NF.WEB-DL.DDP5.1.x264-NTb",
+    "Better.Call.Saul.S06E13.Saul.Gone.1080p.AMZN.WEB-DL.DDP5.1.H.264-NTb",
+    "The.Wire.S01E01.The.Target.720p.BluRay.x264",
+    "Pulse.2.Afterlife.2008.1080p.BluRay.x264-GUACAMOLE",
+    "It.Chapter.One.2017.UHD.BluRay.1080p.DD+Atmos.5.1.DoVi.HDR10.x265-SM737",
+    "1920-proof.rar",
+    "gua-pulse2.2008-1080p.srr",
+    "poster.jpg",
+    "The Office/US S07E17 720p NF WEB-DL DDP5.1 x264-NTb.mkv",
+)
+
+SCENE_NAMES = CANONICAL_SCENE_NAMES + NON_CANONICAL_SCENE_NAMES
+
+FILE_PATHS = (
+    "Shin Godzilla (2016) 1080p Hybrid Bluray REMUX AVC Dual DTS-HD MA 3.1",
+    "The Blob (1988) (1080p BluRay x265 10bit Tigole).mkv",
+    "The Blob (1988) (1080p BluRay x265 10bit Tigole)/movie.mkv",
+    "Rick.and.Morty.S07E10.Fear.No.Mort.1080p.HMAX.WEB-DL.DDP5.1.H.264-FLUX-poster.jpg",
+    "Rick.and.Morty.S07E10.Fear.No.Mort.1080p.HMAX.WEB-DL.DDP5.1.H.264-FLUX/poster.jpg",
+    "rick.and.morty.s07e10.fear.no.mort.1080p.hmax.web-dl.ddp5.1.h.264-flux/poster.jpg",
+    "tmp/Death.Proof.2007.1080p.BluRay.x264-1920/1920-proof.rar",
+    "Fargo.1080p.BluRay.x264-1920/1920-proof.rmkv",
+    "Fargo.1996.1080p.BluRay.x264-1920/1920-fargo.rmkv",
+    "Fargo.S01E01.1080p.BluRay.x264-1920/1920-fargo.rmkv",
+    "tmp/Killing.Zoe.1993.1080p.BluRay.x264-LCHD/lchd-kz1080p.rar",
+    "Slow.Horses.S02.NORDiC.720p.WEB-DL.H.265.DD5.1-CiNEMiX/Slow.Horses.S02E05.NORDiC.720p.WEB-DL.H.265.DD5.1-CiNEMiX-poster.jpg",
+    "/mnt/mock-test-files/Slow.Horses.S03.NORDiC.720p.WEB-DL.H.265.DD5.1-CiNEMiX/Slow.Horses.S03E01.NORDiC.720p.WEB-DL.H.265.DD5.1-CiNEMiX.nfo",
+    "/mnt/mock-test-files/American.Dad.S20E01.1080p.WEBRip.x264-BAE/American.Dad.S20E01.1080p.WEBRip.x264-BAE.mkv",
+    "/mnt/mock-test-files/Final.Destination.MOViE.PACK.1080p.BluRay.x264-HiTSQUAD/The.Final.Destination.1080p.BluRay.x264-METiS/m-fd4-1080p.mkv",
+    "/mnt/mock-test-files/Marvel.Cinematic.Universe.Phase.01-04.1080p.BluRay.10Bit.X265.DD.5.1-Chivaman/The.Incredible.Hulk.2008.1080p.BluRay.10Bit.X265.DD.5.1-Chivaman.mkv",
+    "/watch/Stake.Land.II.2016.1080p.BluRay.x264-PSYCHD/Subs/Stake.Land.II.2016.1080p.BluRay.x264-PSYCHD.idx",
+    "/mnt/skystorage/apps/transmission-vpn/data/completed/Pulse.2.Afterlife.2008.1080p.BluRay.x264-GUACAMOLE/gua-pulse2.2008-1080p.srr",
+    "/mnt/skystorage/apps/transmission-vpn/data/completed/It.Chapter.One.2017.UHD.BluRay.1080p.DD+Atmos.5.1.DoVi.HDR10.x265-SM737/screens.png",
+    "Pulp.Fiction.1994.DVDRip.XviD.AC3/DISC2/pulpfict-ac3.r03",
+    "Breaking.Bad.S05.720p.HDTV.x264-IMMERSE/Breaking.Bad.S05E14.720p.HDTV.x264-IMMERSE.mkv",
+    "Breaking.Bad.S05.720p.HDTV.x264-IMMERSE/Sample/breaking.bad.s05e14.720p.sample.mkv",
+    "The.Office.US.S07.720p.NF.WEB-DL.DDP5.1.x264-NTb/The.Office.US.S07E17.720p.NF.WEB-DL.DDP5.1.x264-NTb.mkv",
+    "downloads/Gone.Girl.2014.1080p.BluRay.x264-SPARKS/sparks-gonegirl-1080p.mkv",
+    "downloads/Gone.Girl.2014.1080p.BluRay.x264-SPARKS/sparks-gonegirl-1080p.nfo",
+    "downloads/Gone.Girl.2014.1080p.BluRay.x264-SPARKS/Proof/sparks-gonegirl-1080p-proof.jpg",
+    "Chernobyl.2019.S01.720p.WEB-DL.x264-MEMENTO/Chernobyl.2019.S01E03.720p.WEB-DL.x264-MEMENTO.mkv",
+    "Movies/Arrival (2016)/Arrival.2016.1080p.WEBRip.x264-RARBG.mp4",
+    "TV/Severance/Season 2/Severance.S02E01.1080p.ATVP.WEB-DL.DDP5.1.Atmos.H.264-FLUX.mkv",
+    "Se7en.1995.avi",
+)
@@ -1,33 +1,106 @@
-from pathlib import Path
+import json
+from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
 load_dotenv()
 
 from datetime import datetime, UTC
+from typing import List
 from uuid import UUID
 
 import traceback
 from fastapi import FastAPI, HTTPException, Query, Request, Response, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from opentelemetry import trace
+from pydantic import BaseModel
 
-from src.media_identifiers.pipeline.base import PipelineExecutionError
+from src.deadline import DeadlineExceededError, deadline_scope, with_deadline
+from src.guessit_process_pool import close_guessit_process_pool, get_guessit_process_pool_stats
 from src.media_identifiers.media_type_helpers import is_tv, normalize_media_type
-from src.utils import set_request_id, get_otel_log_handler, flush_all_otel_loggers
+from src.utils import set_request_id, get_env_float, get_env_int, get_otel_log_handler, flush_all_otel_loggers
+from src.media_identifiers.batch_identifier import BatchIdentifier
+from src.media_identifiers.helpers import sanitize_filename
+from src.media_identifiers.media_identification_tasks.guessit_tasks import get_guessit_stats
 from src.media_identifiers.media_identifier import MediaIdentifier
-from src.repositories.repository_factory import get_repository
+from src.media_identifiers.openai_extraction_cache import get_openai_extraction_cache
+from src.media_identifiers.pipeline.handlers import close_alternative_titles_executor
+from src.media_identifiers.pipeline.scheduler import close_step_executor
+from src.media_identifiers.stream_identifier import identify_stream, iter_lines
+from src.media_identifiers.tmdb_client import close_tmdb_client, get_tmdb_client_stats
+from src.media_identifiers.tmdb_response_cache import get_tmdb_response_cache
+from src.repositories.batched_request_logger import BatchedRequestLogger
+from src.repositories.media_info_l1_cache import MediaInfoL1Cache
+from src.repositories.repository_factory import (
+    close_connection_pool,
+    get_advisory_lock_pool_stats,
+    get_connection_pool_stats,
+    get_repository,
+)
+from src.single_flight import get_single_flight
+from src.worker_pool import WorkerPoolSaturatedError, get_pipeline_worker_pool
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    yield
+    pipeline_worker_pool.shutdown(wait=True)
+    batch_identifier.close()
+    close_step_executor()
+    close_alternative_titles_executor()
+    close_guessit_process_pool()
+    close_tmdb_client()
+    if isinstance(request_logger, BatchedRequestLogger):
+        # Write the buffered request history before the database pool goes away.
+        request_logger.close()
+    close_connection_pool()
 
 
 app = FastAPI(
     title="GuessIt API",
     description="API for guessing information from filenames using guessit",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 logger = get_otel_log_handler("API", fastapi_app=app)
 request_logger = get_repository('request_logger')
 cache_repository = get_repository('cache')
 media_info_extender = MediaIdentifier()
+pipeline_worker_pool = get_pipeline_worker_pool()
+guess_budget_seconds = get_env_float("GUESS_BUDGET_SECONDS", 20)
+media_info_budget_seconds = get_env_float("MEDIA_INFO_BUDGET_SECONDS", 10)
+guess_batch_max_files = get_env_int("GUESS_BATCH_MAX_FILES", 500)
+guess_batch_total_budget_seconds = get_env_float("GUESS_BATCH_TOTAL_BUDGET_SECONDS", 120)
+guess_stream_max_in_flight = get_env_int("GUESS_STREAM_MAX_IN_FLIGHT", 4)
+guess_stream_max_line_length = get_env_int("GUESS_STREAM_MAX_LINE_LENGTH", 4096)
+guess_stream_identify = with_deadline(
+    media_info_extender.get_media_info_by_path,
+    get_env_float("GUESS_STREAM_BUDGET_SECONDS", 20),
+)
+batch_identifier = BatchIdentifier(
+    with_deadline(media_info_extender.get_media_info_by_path, get_env_float("GUESS_BATCH_BUDGET_SECONDS", 20)),
+    cache_repository,
+    max_concurrency=get_env_int("GUESS_BATCH_MAX_CONCURRENCY", 4),
+)
+
+
+class GuessBatchRequest(BaseModel):
+    files: List[str]
+
+
+async def _run_blocking(func, *args, **kwargs):
+    """
+    Runs blocking work (pipeline, database) on the pipeline worker pool, keeping the event loop free.
+    Translates a saturated pool into a 503, so clients know they can retry.
+    """
+    try:
+        return await pipeline_worker_pool.run(func, *args, **kwargs)
+    except WorkerPoolSaturatedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
 
 
 @logger.trace("_prepare_media_info_response")
@@ -40,37 +113,19 @@ def _prepare_media_info_response(media_data, request_id):
     status_code = status.HTTP_200_OK
     request_logger.log_completed(request_id, status_code, media_data.get('id') if media_data else None)
 
-    serializable_result = {
+    return JSONResponse(content=_serialize_media_info(media_data), status_code=status_code)
+
+def _raise_deadline_exceeded(request_id, error: DeadlineExceededError):
+    status_code = status.HTTP_504_GATEWAY_TIMEOUT
+    request_logger.log_completed(request_id, status_code, error_message=str(error))
+    raise HTTPException(status_code=status_code, detail=str(error))
+
+def _serialize_media_info(media_data: dict) -> dict:
+    return {
         k: str(v) if not isinstance(v, (str, int, float, bool, list, dict, type(None))) else v
         for k, v in media_data.items()
     }
 
-    return JSONResponse(content=serializable_result, status_code=status_code)
-
-@logger.trace("_sanitize_filename")
-def _sanitize_filename(filename: str) -> str:
-    _filename = filename.lower()
-
-    if "halcyon" in _filename and not any(x in _filename for x in ["2015", "2026"]):
-        return _filename.replace("halcyon", "")
-
-    return _filename
-
-@logger.trace("_process_guess_filename")
-def _process_guess_filename(it: str, is_retrying: bool = False):
-    try:
-        filename = _sanitize_filename(it)
-
-        if is_retrying:
-            it_file = Path(filename).name
-            return media_info_extender.get_media_info_by_filename(it_file)
-
-        return media_info_extender.get_media_info_by_filename(filename)
-    except PipelineExecutionError as e:
-        if is_retrying:
-            raise
-        logger.warning(f"Pipeline failed for full path. Retrying with filename only for: {it}")
-        return _process_guess_filename(it, True)
 
 @app.get("/api/guess")
 @logger.trace("/api/guess")
@@ -97,6 +152,7 @@ async def guess_filename(
     Raises:
         400: If the filename is not provided
         500: If there's an error during execution
+        504: If the media couldn't be identified within GUESS_BUDGET_SECONDS
     """
     # Check if the filename is provided
     if not it:
@@ -105,14 +161,22 @@ async def guess_filename(
     # Get the client's IP address
     client_ip = request.client.host
 
+    return await _run_blocking(_guess_filename_blocking, it, client_ip)
+
+
+@logger.trace("_guess_filename_blocking")
+def _guess_filename_blocking(it: str, client_ip: str):
     request_id = request_logger.log_start("/api/guess", it, client_ip)
 
     try:
         set_request_id(request_id)
 
-        media_data = _process_guess_filename(it)
+        with deadline_scope(guess_budget_seconds):
+            media_data = media_info_extender.get_media_info_by_path(it)
 
         return _prepare_media_info_response(media_data, request_id)
+    except DeadlineExceededError as e:
+        _raise_deadline_exceeded(request_id, e)
     except Exception as e:
         # Capture the error and return a 500 response
         error_detail = f"Error processing filename: {str(e)}"
@@ -124,6 +188,140 @@ async def guess_filename(
         raise HTTPException(status_code=status_code, detail=error_detail)
 
 
+@app.post("/api/guess/batch")
+@logger.trace("/api/guess/batch")
+async def guess_filenames_batch(request: Request, body: GuessBatchRequest):
+    span = trace.get_current_span()
+    if span.is_recording():
+        span.set_attributes({
+            "http.method": request.method,
+            "http.client_ip": request.client.host,
+            "media.input_count": len(body.files),
+        })
+    """
+    Same as `/api/guess`, for many filenames at once. Filenames of the same release and filenames that resolve to
+    the same media share the work: GuessIt parses, one cache query for the whole batch, and one identification per
+    media that isn't cached yet.
+
+    Args:
+        request: The FastAPI request object
+        body: JSON object with the filenames to analyze: {"files": ["...", "..."]}
+
+    Returns:
+        JSON object with one result per filename, in the same order: {"results": [{"index", "input", "status",
+        "media", "error"}]}. `status` is 200 (identified), 204 (nothing found), 500 (error, see `error`) or 504
+        (not identified before the batch ran out of GUESS_BATCH_TOTAL_BUDGET_SECONDS).
+
+    Raises:
+        400: If no filenames are provided, or more than GUESS_BATCH_MAX_FILES
+    """
+    files = [it for it in body.files if it]
+    if not files:
+        raise HTTPException(status_code=400, detail="Filenames not provided")
+
+    if len(files) > guess_batch_max_files:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many filenames. A batch can have up to {guess_batch_max_files}.",
+        )
+
+    client_ip = request.client.host
+
+    return await _run_blocking(_guess_filenames_batch_blocking, files, client_ip)
+
+
+@logger.trace("_guess_filenames_batch_blocking")
+def _guess_filenames_batch_blocking(files: List[str], client_ip: str):
+    request_id = request_logger.log_start("/api/guess/batch", f"{len(files)} files", client_ip)
+
+    try:
+        set_request_id(request_id)
+
+        with deadline_scope(guess_batch_total_budget_seconds):
+            results = batch_identifier.identify_many([sanitize_filename(it) for it in files])
+        for result, it in zip(results, files):
+            result["input"] = it
+            if result["media"] is not None:
+                result["media"] = _serialize_media_info(result["media"])
+
+        request_logger.log_completed(request_id, status.HTTP_200_OK, None)
+        return JSONResponse(content={"results": results}, status_code=status.HTTP_200_OK)
+    except Exception as e:
+        error_detail = f"Error processing filenames: {str(e)}"
+        traceback.print_exc()  # Print traceback for debugging
+        status_code = 500
+
+        request_logger.log_completed(request_id, status_code, error_message=error_detail)
+
+        raise HTTPException(status_code=status_code, detail=error_detail)
+
+
+@app.post("/api/guess/stream")
+@logger.trace("/api/guess/stream")
+async def guess_filenames_stream(request: Request):
+    span = trace.get_current_span()
+    if span.is_recording():
+        span.set_attributes({
+            "http.method": request.method,
+            "http.client_ip": request.client.host,
+        })
+    """
+    Same as `/api/guess`, for a stream of filenames. Meant for very large lists (initial imports of whole libraries).
+
+    The request body is read as it arrives, one filename per line. Each result is written as soon as its
+    identification completes, so results come out of order; use `index` (the line number among non-empty lines)
+    to match them. Up to GUESS_STREAM_MAX_IN_FLIGHT filenames are identified at a time, and no more input is read
+    until one of them is done, so neither side has to hold the whole list in memory. Identifications run on the
+    same worker pool as `/api/guess`: when it's full, the stream waits for its own identifications to free a slot.
+
+    Args:
+        request: The FastAPI request object. Body: newline-delimited filenames.
+
+    Returns:
+        NDJSON, one object per filename: {"index", "input", "status", "media", "error"}.
+        `status` is 200 (identified), 204 (nothing found), 500 (error, see `error`) or 503 (the worker pool was
+        full and the stream had nothing running to wait for; send that filename again later).
+        If the stream itself fails (e.g. a line longer than GUESS_STREAM_MAX_LINE_LENGTH), the last line is
+        {"error": "..."}.
+    """
+    client_ip = request.client.host
+    request_id = await _run_blocking(request_logger.log_start, "/api/guess/stream", "stream", client_ip)
+    set_request_id(request_id)
+
+    return StreamingResponse(_stream_guess_results(request, request_id), media_type="application/x-ndjson")
+
+
+async def _stream_guess_results(request: Request, request_id):
+    status_code = status.HTTP_200_OK
+    error_detail = None
+    try:
+        file_paths = iter_lines(request.stream(), guess_stream_max_line_length)
+        async for result in identify_stream(
+                file_paths,
+                guess_stream_identify,
+                guess_stream_max_in_flight,
+                pipeline_worker_pool.submit):
+            if result["media"] is not None:
+                result["media"] = _serialize_media_info(result["media"])
+            yield json.dumps(result) + "\n"
+    except Exception as e:
+        # The response has already started; all we can do is say so on the last line.
+        error_detail = f"Error processing filename stream: {str(e)}"
+        traceback.print_exc()  # Print traceback for debugging
+        status_code = 500
+        yield json.dumps({"error": error_detail}) + "\n"
+    finally:
+        try:
+            await pipeline_worker_pool.run(
+                request_logger.log_completed,
+                request_id,
+                status_code,
+                None,
+                error_message=error_detail)
+        except WorkerPoolSaturatedError:
+            logger.warning(f"Could not record the completion of stream request {request_id}: worker pool saturated.")
+
+
 @app.get("/api/media-info")
 @logger.trace("/api/media-info")
 async def get_media_info(
@@ -163,6 +361,7 @@ async def get_media_info(
     Raises:
         400: If required information is not provided.
         500: If there's an error during execution
+        504: If the media couldn't be identified within MEDIA_INFO_BUDGET_SECONDS
     """
     # Check if required data is provided
     if not media_type or not year or not title:
@@ -190,20 +389,31 @@ async def get_media_info(
     # Get the client's IP address
     client_ip = request.client.host
 
-    request_id = request_logger.log_start("/api/media-info", request.url.query, client_ip)
+    return await _run_blocking(
+        _get_media_info_blocking,
+        request.url.query,
+        client_ip,
+        media_type=normalized_media_type,
+        year=year,
+        title=title,
+        season=season,
+        episode=episode,
+    )
+
+
+@logger.trace("_get_media_info_blocking")
+def _get_media_info_blocking(query: str, client_ip: str, **metadata):
+    request_id = request_logger.log_start("/api/media-info", query, client_ip)
 
     try:
         set_request_id(request_id)
 
-        media_data = media_info_extender.get_media_info(
-            media_type=normalized_media_type,
-            year=year,
-            title=title,
-            season=season,
-            episode=episode,
-        )
+        with deadline_scope(media_info_budget_seconds):
+            media_data = media_info_extender.get_media_info(**metadata)
 
         return _prepare_media_info_response(media_data, request_id)
+    except DeadlineExceededError as e:
+        _raise_deadline_exceeded(request_id, e)
     except Exception as e:
         # Capture the error and return a 500 response
         error_detail = f"Error getting media info: {str(e)}"
@@ -243,11 +453,17 @@ async def get_media_info_by_id(
         500: If there's an error during execution.
     """
     client_ip = request.client.host
-    request_id = request_logger.log_start("/api/media-info/{media_id}", str(media_id), client_ip)
+
+    return await _run_blocking(_get_media_info_by_id_blocking, str(media_id), client_ip)
+
+
+@logger.trace("_get_media_info_by_id_blocking")
+def _get_media_info_by_id_blocking(media_id: str, client_ip: str):
+    request_id = request_logger.log_start("/api/media-info/{media_id}", media_id, client_ip)
 
     try:
         set_request_id(request_id)
-        cached_media = cache_repository.get_cached(str(media_id), None, "id")
+        cached_media = cache_repository.get_cached(media_id, None, "id")
     except Exception as exc:
         error_detail = f"Error retrieving media by id: {str(exc)}"
         traceback.print_exc()
@@ -301,14 +517,50 @@ async def get_statistics(num_requests: int = Query(100, description="Number of r
         - recent_requests: List of the most recent N requests
     """
     try:
-        stats = request_logger.get_recent_requests(num_requests)
+        stats = await _run_blocking(request_logger.get_recent_requests, num_requests)
         return stats
+    except HTTPException:
+        raise
     except Exception as e:
         error_detail = f"Error retrieving statistics: {str(e)}"
         traceback.print_exc()  # Print traceback for debugging
         raise HTTPException(status_code=500, detail=error_detail)
 
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """
+    Get in-process runtime metrics for this worker.
+
+    Returns:
+        JSON object with one entry per component:
+        - worker_pool: Pipeline worker pool usage (in-flight, queued, completed and rejected tasks)
+        - tmdb: TMDB client info and rate limiter counters (wait time, rejections, 429 pauses)
+        - tmdb_response_cache: Hits, misses and evictions of the raw TMDB response cache
+        - single_flight: Identifications in flight, and how many requests waited on one instead of running
+        - media_cache_l1: Hits, misses and evictions of the in-process cache in front of the cached_media table
+        - db_pool: Database connections open, idle and in use, waiters, wait times and recycled connections
+        - advisory_lock_pool: The same, for the connections holding cross-worker single-flight locks
+        - request_logger: Request history records buffered, written and dropped by the write-behind logger
+        - guessit: Memoized GuessIt results per filename candidate, and names parsed by the fast path vs GuessIt
+        - guessit_process_pool: GuessIt worker processes usage, parses done in the caller, timeouts and restarts
+        - openai_extraction_cache: Hits and misses of the OpenAI answers memoized by AI function, prompt version and input
+    """
+    return {
+        "worker_pool": pipeline_worker_pool.stats(),
+        "tmdb": get_tmdb_client_stats(),
+        "tmdb_response_cache": get_tmdb_response_cache().stats(),
+        "single_flight": get_single_flight("identification").stats(),
+        "media_cache_l1": cache_repository.stats() if isinstance(cache_repository, MediaInfoL1Cache) else None,
+        "db_pool": get_connection_pool_stats(),
+        "advisory_lock_pool": get_advisory_lock_pool_stats(),
+        "request_logger": request_logger.stats() if isinstance(request_logger, BatchedRequestLogger) else None,
+        "guessit": get_guessit_stats(),
+        "guessit_process_pool": get_guessit_process_pool_stats(),
+        "openai_extraction_cache": get_openai_extraction_cache().stats(),
+    }
+
+
 if __name__ == "__main__":
     # Flush ALL OTEL log handlers before starting uvicorn.
     # On Windows the BatchLogRecordProcessor's background HTTP export
@@ -0,0 +1,298 @@
+"""
+Identifies every media file under a folder (or in a list of paths) without going through the API, e.g. to fill
+cached_media for a whole library overnight. Needs the same environment variables as the API.
+
+Results are written as they complete, to JSONL (full media info) or CSV (main columns), chosen by the output
+extension. The output file is also the checkpoint: it's flushed every --checkpoint-every results, and running the
+same command again skips the paths already in it, so a crashed or interrupted run carries on where it stopped.
+Paths that failed with an error are tried again.
+
+Usage:
+    OTEL_EXPORTER_OTLP_ENDPOINT=http://localhost:4318 python -m src.bulk_identification --root /mnt/nas/media --output results.jsonl
+    OTEL_EXPORTER_OTLP_ENDPOINT=http://localhost:4318 python -m src.bulk_identification --paths-file paths.txt --output results.csv --workers 8
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, Optional, Set, TextIO
+
+from src.media_identifiers.batch_identifier import build_identification_result
+from src.utils import get_otel_log_handler
+
+_logger = get_otel_log_handler("BulkIdentification")
+
+_DEFAULT_EXTENSIONS = "mkv,mp4,avi,m4v,mov,wmv,mpg,mpeg,ts,m2ts,webm,flv"
+_CSV_MEDIA_COLUMNS = [
+    "id",
+    "media_type",
+    "title",
+    "year",
+    "season",
+    "episode",
+    "episode_title",
+    "tmdb_id",
+    "tmdb_series_id",
+    "imdb_id",
+]
+_CSV_COLUMNS = ["index", "input", "status", "error", *_CSV_MEDIA_COLUMNS]
+
+
+def iter_paths_from_root(root: str, extensions: Set[str]) -> Iterator[str]:
+    """Walks the tree in sorted order, so the same tree always yields the same sequence (and indexes)."""
+    for folder, subfolders, filenames in os.walk(root):
+        subfolders.sort()
+        for filename in sorted(filenames):
+            extension = os.path.splitext(filename)[1].lstrip(".").lower()
+            if extension in extensions:
+                yield os.path.join(folder, filename)
+
+
+def iter_paths_from_file(paths_file: str) -> Iterator[str]:
+    with open(paths_file, encoding="utf-8") as lines:
+        for line in lines:
+            path = line.strip()
+            if path:
+                yield path
+
+
+def _should_retry(status) -> bool:
+    # Errors are usually transient (TMDB or OpenAI down), so a resumed run tries those paths again. The new result is
+    # appended after the failed one. CSV gives the status back as text.
+    return int(status) >= 500
+
+
+class JsonlResultWriter:
+    def __init__(self, output: TextIO):
+        self._output = output
+
+    @staticmethod
+    def read_done_inputs(output: TextIO) -> Set[str]:
+        results = (json.loads(line) for line in output if line.strip())
+        return {result["input"] for result in results if not _should_retry(result["status"])}
+
+    def write(self, result: dict) -> None:
+        self._output.write(json.dumps(result, default=str) + "\n")
+
+
+class CsvResultWriter:
+    def __init__(self, output: TextIO, write_header: bool):
+        self._writer = csv.DictWriter(output, fieldnames=_CSV_COLUMNS, extrasaction="ignore")
+        if write_header:
+            self._writer.writeheader()
+
+    @staticmethod
+    def read_done_inputs(output: TextIO) -> Set[str]:
+        return {row["input"] for row in csv.DictReader(output) if not _should_retry(row["status"])}
+
+    def write(self, result: dict) -> None:
+        media = result["media"] or {}
+        self._writer.writerow({
+            **{column: media.get(column) for column in _CSV_MEDIA_COLUMNS},
+            "index": result["index"],
+            "input": result["input"],
+            "status": result["status"],
+            "error": result["error"],
+        })
+
+
+class ProgressReporter:
+    """Prints done/total, throughput and ETA at most once per `interval` seconds."""
+    def __init__(self, total: Optional[int], interval: float, stream: TextIO = sys.stderr):
+        self._total = total
+        self._interval = interval
+        self._stream = stream
+        self._started = time.monotonic()
+        self._last_report = 0.0
+        self.counts: Dict[int, int] = {200: 0, 204: 0, 500: 0}
+
+    @property
+    def done(self) -> int:
+        return sum(self.counts.values())
+
+    def record(self, status_code: int) -> None:
+        self.counts[status_code] = self.counts.get(status_code, 0) + 1
+
+        now = time.monotonic()
+        if now - self._last_report >= self._interval:
+            self._last_report = now
+            self.report()
+
+    def report(self) -> None:
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        rate = self.done / elapsed
+
+        progress = f"{self.done}"
+        eta = "?"
+        if self._total:
+            progress = f"{self.done}/{self._total} ({self.done / self._total:.1%})"
+            if rate > 0:
+                eta = _format_duration((self._total - self.done) / rate)
+
+        print(
+            f"{progress} | {rate:.1f} files/s | ETA {eta} | identified {self.counts[200]}, "
+            f"not found {self.counts[204]}, errors {self.counts[500]}",
+            file=self._stream,
+            flush=True,
+        )
+
+
+def run_bulk_identification(
+        file_paths: Iterable[str],
+        identify: Callable[[str], Optional[dict]],
+        writer,
+        workers: int,
+        done_inputs: Set[str],
+        progress: ProgressReporter,
+        checkpoint: Callable[[], None],
+        checkpoint_every: int) -> None:
+    """
+    Identifies the paths not in `done_inputs` with `workers` threads and writes each result as it completes.
+    Paths are pulled from `file_paths` only as workers free up, so a huge tree is never held in memory.
+    """
+    pending: Dict[Future, tuple] = {}
+    since_checkpoint = 0
+
+    def collect(done_futures) -> None:
+        nonlocal since_checkpoint
+        for future in done_futures:
+            index, file_path = pending.pop(future)
+            try:
+                result = build_identification_result(index, file_path, future.result(), None)
+            except Exception as exc:  # noqa: BLE001
+                _logger.error(f"Error identifying [{file_path}]: {exc}")
+                result = build_identification_result(index, file_path, None, str(exc))
+
+            writer.write(result)
+            progress.record(result["status"])
+            since_checkpoint += 1
+            if since_checkpoint >= checkpoint_every:
+                checkpoint()
+                since_checkpoint = 0
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk-identification") as executor:
+        for index, file_path in enumerate(file_paths):
+            if file_path in done_inputs:
+                continue
+
+            if len(pending) >= workers * 2:
+                done_futures, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done_futures)
+
+            pending[executor.submit(identify, file_path)] = (index, file_path)
+
+        while pending:
+            done_futures, _ = wait(pending, return_when=FIRST_COMPLETED)
+            collect(done_futures)
+
+    checkpoint()
+
+
+def _truncate_partial_last_line(output_path: str) -> None:
+    """A crash can leave half a line at the end of the output. Drop it, so its path is identified again."""
+    with open(output_path, "rb+") as output:
+        content_end = output.seek(0, os.SEEK_END)
+        position = content_end
+        while position > 0:
+            step = min(4096, position)
+            position -= step
+            output.seek(position)
+            newline_at = output.read(step).rfind(b"\n")
+            if newline_at != -1:
+                last_line_end = position + newline_at + 1
+                break
+        else:
+            last_line_end = 0
+
+        if last_line_end != content_end:
+            output.truncate(last_line_end)
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--root", help="Folder to walk for media files.")
+    source.add_argument("--paths-file", help="Text file with one path per line.")
+    parser.add_argument("--output", required=True, help="Results file. '.csv' writes CSV, anything else JSONL.")
+    parser.add_argument("--workers", type=int, default=4, help="Files identified at the same time.")
+    parser.add_argument("--extensions", default=_DEFAULT_EXTENSIONS, help="File extensions picked up by --root.")
+    parser.add_argument("--checkpoint-every", type=int, default=100, help="Results between flushes of the output.")
+    parser.add_argument("--progress-interval", type=float, default=5, help="Seconds between progress lines.")
+    parser.add_argument("--restart", action="store_true", help="Overwrite the output instead of resuming from it.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = _parse_args(argv)
+    if args.workers < 1:
+        raise SystemExit("--workers must be at least 1.")
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    # Imported here so --help works without a database or API keys.
+    from src.guessit_process_pool import close_guessit_process_pool
+    from src.media_identifiers.media_identifier import MediaIdentifier
+    from src.media_identifiers.tmdb_client import close_tmdb_client
+    from src.repositories.repository_factory import close_connection_pool
+
+    if args.root:
+        extensions = {extension.strip().lstrip(".").lower() for extension in args.extensions.split(",")}
+        list_paths = lambda: iter_paths_from_root(args.root, extensions)  # noqa: E731
+    else:
+        list_paths = lambda: iter_paths_from_file(args.paths_file)  # noqa: E731
+
+    is_csv = args.output.lower().endswith(".csv")
+    writer_type = CsvResultWriter if is_csv else JsonlResultWriter
+
+    done_inputs: Set[str] = set()
+    resuming = os.path.exists(args.output) and os.path.getsize(args.output) > 0 and not args.restart
+    if resuming:
+        _truncate_partial_last_line(args.output)
+        with open(args.output, encoding="utf-8", newline="") as previous_output:
+            done_inputs = writer_type.read_done_inputs(previous_output)
+        print(f"Resuming: {len(done_inputs)} paths already in {args.output}.", file=sys.stderr)
+
+    # Counting first costs one directory walk, and gives the ETA.
+    total = sum(1 for file_path in list_paths() if file_path not in done_inputs)
+    print(f"{total} paths to identify.", file=sys.stderr)
+
+    identifier = MediaIdentifier()
+    progress = ProgressReporter(total, args.progress_interval)
+    with open(args.output, "a" if resuming else "w", encoding="utf-8", newline="") as output:
+        writer = CsvResultWriter(output, write_header=not resuming) if is_csv else JsonlResultWriter(output)
+
+        def checkpoint() -> None:
+            output.flush()
+            os.fsync(output.fileno())
+
+        try:
+            run_bulk_identification(
+                list_paths(),
+                identifier.get_media_info_by_path,
+                writer,
+                workers=args.workers,
+                done_inputs=done_inputs,
+                progress=progress,
+                checkpoint=checkpoint,
+                checkpoint_every=args.checkpoint_every,
+            )
+        except KeyboardInterrupt:
+            print("Interrupted. Run the same command again to resume.", file=sys.stderr)
+        finally:
+            progress.report()
+            close_guessit_process_pool()
+            close_tmdb_client()
+            close_connection_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+_deadline_var: contextvars.ContextVar[Optional["Deadline"]] = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceededError(TimeoutError):
+    pass
+
+
+class Deadline:
+    """The point in time (monotonic clock) by which a request has to be answered."""
+    def __init__(self, budget_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.budget_seconds = budget_seconds
+        self._clock = clock
+        self._expires_at = clock() + budget_seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self._expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+def get_deadline() -> Optional[Deadline]:
+    """The deadline of the current request, or None when it has no latency budget."""
+    return _deadline_var.get()
+
+
+@contextmanager
+def deadline_scope(budget_seconds: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """
+    Gives the code inside (and whatever it submits with `submit_with_context`) `budget_seconds` to finish.
+    None or 0 means no budget. An enclosing deadline that ends sooner is kept.
+    """
+    current = _deadline_var.get()
+    if not budget_seconds or budget_seconds <= 0:
+        yield current
+        return
+
+    deadline = Deadline(budget_seconds)
+    if current is not None and current.remaining() < deadline.remaining():
+        deadline = current
+
+    token = _deadline_var.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline_var.reset(token)
+
+
+def with_deadline(func: Callable[..., Any], budget_seconds: Optional[float]) -> Callable[..., Any]:
+    """Wraps `func` so that every call gets its own `budget_seconds` (e.g. each filename of a batch)."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with deadline_scope(budget_seconds):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def remaining_budget(limit: Optional[float] = None) -> Optional[float]:
+    """
+    Time left for the current request, capped at `limit` (e.g. a client's own timeout).
+    Returns `limit` when there is no deadline.
+    """
+    deadline = _deadline_var.get()
+    if deadline is None:
+        return limit
+
+    remaining = deadline.remaining()
+    return remaining if limit is None else min(limit, remaining)
+
+
+def check_deadline(operation: str) -> None:
+    """Raises DeadlineExceededError if the current request has run out of time, instead of starting `operation`."""
+    deadline = _deadline_var.get()
+    if deadline is not None and deadline.expired:
+        raise DeadlineExceededError(
+            f"No time left in the {deadline.budget_seconds:g}s request budget for {operation}."
+        )
@@ -0,0 +1,176 @@
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from src.guessit_worker import initialize_worker, parse_candidate
+from src.utils import get_env_float, get_env_int, get_otel_log_handler
+
+_logger = get_otel_log_handler("GuessItProcessPool")
+_guessit_process_pool: Optional["GuessItProcessPool"] = None
+_guessit_process_pool_lock = threading.Lock()
+
+
+class GuessItProcessPool:
+    """
+    Parses filenames with GuessIt on warm worker processes, so CPU-bound parsing isn't limited to the one core the
+    GIL gives each API worker.
+
+    Capacity is `max_workers` running parses plus `max_queue_depth` waiting ones. Past that, the caller parses
+    in its own thread instead of queueing. A parse that takes longer than `task_timeout` is given up on (the
+    candidate yields nothing). If a worker process dies, the pool is replaced and the parse runs in the caller.
+    """
+    def __init__(self, max_workers: int, max_queue_depth: int, task_timeout: float):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+
+        if max_queue_depth < 0:
+            raise ValueError("max_queue_depth must not be negative.")
+
+        self._max_workers = max_workers
+        self._max_queue_depth = max_queue_depth
+        self._task_timeout = task_timeout
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._inline = 0
+        self._timeouts = 0
+        self._restarts = 0
+        self._executor = self._create_executor()
+
+    @property
+    def capacity(self) -> int:
+        return self._max_workers + self._max_queue_depth
+
+    def guess(self, candidate: str) -> Optional[dict]:
+        """Returns GuessIt's raw metadata for the candidate, or None if the parse timed out."""
+        if not self._acquire_slot():
+            return parse_candidate(candidate)
+
+        executor = self._executor
+        try:
+            future = executor.submit(parse_candidate, candidate)
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._release_slot(None)
+            self._replace_executor(executor, e)
+            return self._guess_inline(candidate)
+
+        # The slot is released when the worker finishes, not when the caller stops waiting: a parse that timed
+        # out still occupies its process.
+        future.add_done_callback(self._release_slot)
+
+        try:
+            return future.result(timeout=self._task_timeout)
+        except FuturesTimeoutError:
+            with self._lock:
+                self._timeouts += 1
+            _logger.warning(f"GuessIt took longer than {self._task_timeout}s to parse [{candidate}]. Skipping it.")
+            return None
+        except BrokenProcessPool as e:
+            self._replace_executor(executor, e)
+            return self._guess_inline(candidate)
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = self._in_flight
+            return {
+                "max_workers": self._max_workers,
+                "max_queue_depth": self._max_queue_depth,
+                "in_flight": in_flight,
+                "queued": max(0, in_flight - self._max_workers),
+                "completed": self._completed,
+                "inline": self._inline,
+                "timeouts": self._timeouts,
+                "restarts": self._restarts,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self._max_workers,
+            mp_context=_get_mp_context(),
+            initializer=initialize_worker,
+        )
+
+    def _replace_executor(self, broken_executor: ProcessPoolExecutor, error: Exception) -> None:
+        with self._lock:
+            # Several callers can see the same broken pool. Only the first one replaces it.
+            if self._executor is not broken_executor:
+                return
+            self._executor = self._create_executor()
+            self._restarts += 1
+            restarts = self._restarts
+
+        _logger.error(f"A GuessIt worker process died ({error}). Pool replaced. Restarts so far: {restarts}")
+        broken_executor.shutdown(wait=False, cancel_futures=True)
+
+    def _guess_inline(self, candidate: str) -> dict:
+        with self._lock:
+            self._inline += 1
+        return parse_candidate(candidate)
+
+    def _acquire_slot(self) -> bool:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._inline += 1
+                return False
+
+            self._in_flight += 1
+            return True
+
+    def _release_slot(self, _future: Optional[Future]) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if _future is not None:
+                self._completed += 1
+
+
+def _get_mp_context():
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        # Windows: every worker is spawned from scratch.
+        return multiprocessing.get_context("spawn")
+
+    # Workers are forked from a server that has only imported GuessIt, never from the API process (which has
+    # threads and open connections), and the server doesn't re-import the API's main module.
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["src.guessit_worker"])
+    return context
+
+
+def get_guessit_process_pool() -> Optional[GuessItProcessPool]:
+    """Returns the process-wide pool, or None when GUESSIT_PROCESS_POOL_WORKERS is 0 and parsing runs in-thread."""
+    global _guessit_process_pool
+
+    if _guessit_process_pool is not None:
+        return _guessit_process_pool
+
+    max_workers = get_env_int("GUESSIT_PROCESS_POOL_WORKERS", 0)
+    if max_workers < 1:
+        return None
+
+    with _guessit_process_pool_lock:
+        if _guessit_process_pool is None:
+            _guessit_process_pool = GuessItProcessPool(
+                max_workers=max_workers,
+                max_queue_depth=get_env_int("GUESSIT_PROCESS_POOL_MAX_QUEUE_DEPTH", 32),
+                task_timeout=get_env_float("GUESSIT_PROCESS_POOL_TIMEOUT_SECONDS", 5),
+            )
+            _logger.debug(f"GuessIt process pool created with {max_workers} workers.")
+
+    return _guessit_process_pool
+
+
+def get_guessit_process_pool_stats() -> Optional[dict]:
+    return _guessit_process_pool.stats() if _guessit_process_pool is not None else None
+
+
+def close_guessit_process_pool() -> None:
+    global _guessit_process_pool
+
+    with _guessit_process_pool_lock:
+        if _guessit_process_pool is not None:
+            _guessit_process_pool.shutdown(wait=True)
+            _guessit_process_pool = None
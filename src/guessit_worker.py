@@ -0,0 +1,16 @@
+"""
+Runs inside the GuessIt worker processes. It only imports GuessIt, so starting a worker doesn't pull in the API,
+the database pool or the telemetry exporters.
+"""
+from guessit import guessit
+
+_WARM_UP_INPUT = "Warm.Up.2000.S01E01.1080p.BluRay.x264-GROUP.mkv"
+
+
+def initialize_worker() -> None:
+    # GuessIt builds its rules on the first call. Do it when the process starts, not on the first request.
+    guessit(_WARM_UP_INPUT)
+
+
+def parse_candidate(candidate: str) -> dict:
+    return dict(guessit(candidate))
@@ -0,0 +1,37 @@
+import inspect
+
+OUTPUT: str = ""
+
+def extract_media_details_from_filename(_input_filename: str) -> str:
+    # Input: Takes in the filename the user wants to be analyzed.
+    # Function: Analyzes the input filename and returns, in a single JSON object, its media type, title, year, season and episode.
+    # Important:
+    # - Work to the best of your knowledge and use filename conventions to make an informed decision.
+    # - "media_type" must be exactly one of: "movie", "tv", or "unknown". "unknown" must be your last resort.
+    # - "title" is only the movie or TV show title, cleaned, with spaces and proper capitalization (e.g., "Game of Thrones").
+    #   No year, no season/episode markers, no quality, codecs, group tags or file extension. Use null if you cannot find it.
+    # - "year" is the release year when the filename contains it, otherwise null. Never guess a year.
+    # - "season" and "episode" are integers without leading zeros, only for TV show episodes. Use null for movies or when absent.
+    # - For double-episode files, return the first episode (e.g., S01E01E02 = episode 1).
+    # - Ignore folders that only hold discs or parts (CD1, DISC2, Part2) and the file extension.
+    # - The output must be only the JSON object. No explanation or context.
+    # Output:
+    # - {"media_type": "movie" | "tv" | "unknown", "title": string | null, "year": integer | null, "season": integer | null, "episode": integer | null}
+    # Examples:
+    # - "The.Matrix.1999.1080p.BluRay.x264.DTS-FGT.mkv" -> {"media_type": "movie", "title": "The Matrix", "year": 1999, "season": null, "episode": null}
+    # - "Breaking.Bad.S05E14.720p.HDTV.x264-IMMERSE.mkv" -> {"media_type": "tv", "title": "Breaking Bad", "year": null, "season": 5, "episode": 14}
+    # - "Chernobyl.2019.S01E03.720p.WEB-DL.x264-MEMENTO.mkv" -> {"media_type": "tv", "title": "Chernobyl", "year": 2019, "season": 1, "episode": 3}
+    # - "Friends.2x11.480p.DVD.x264-SAiNTS.mkv" -> {"media_type": "tv", "title": "Friends", "year": null, "season": 2, "episode": 11}
+    # - "Rick.and.Morty.S05E01E02.720p.WEBRip.x264-ION10.mkv" -> {"media_type": "tv", "title": "Rick and Morty", "year": null, "season": 5, "episode": 1}
+    # - "Seinfeld.821.720p.HDTV.x264-GROUP.mkv" -> {"media_type": "tv", "title": "Seinfeld", "year": null, "season": 8, "episode": 21}
+    # - "The Office/US S07E17 720p NF WEB-DL DDP5.1 x264-NTb.mkv" -> {"media_type": "tv", "title": "The Office US", "year": null, "season": 7, "episode": 17}
+    # - "Blade.Runner.2049.2017.1080p.BluRay.x264-GROUP.mkv" -> {"media_type": "movie", "title": "Blade Runner 2049", "year": 2017, "season": null, "episode": null}
+    # - "2012.2009.BluRay.avi" -> {"media_type": "movie", "title": "2012", "year": 2009, "season": null, "episode": null}
+    # - "Pulp.Fiction.1994.DVDRip.XviD.AC3\DISC2\pulpfict-ac3.r03" -> {"media_type": "movie", "title": "Pulp Fiction", "year": 1994, "season": null, "episode": null}
+    # - "Se7en.1995.avi" -> {"media_type": "movie", "title": "Se7en", "year": 1995, "season": null, "episode": null}
+    # - "README.txt" -> {"media_type": "unknown", "title": null, "year": null, "season": null, "episode": null}
+    return OUTPUT
+
+
+if __name__ == '__main__':
+    print(inspect.getsource(extract_media_details_from_filename))
@@ -0,0 +1,137 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PureWindowsPath
+from typing import Callable, Dict, Hashable, List, Optional
+
+from opentelemetry import trace
+
+from src.deadline import DeadlineExceededError, check_deadline
+from src.media_identifiers.helpers import build_identification_key
+from src.media_identifiers.media_identification_tasks.guessit_tasks import identify_media_with_guess_it
+from src.utils import get_otel_log_handler, submit_with_context
+
+
+_logger = get_otel_log_handler("BatchIdentifier")
+
+
+class BatchIdentifier:
+    """
+    Identifies many filenames at once, doing the shared work only once.
+
+    Inputs are parsed with GuessIt in release folder order (so the memoized folder candidates are reused), the
+    ones that describe the same media (same identification key) are grouped, and every group is looked up in the
+    cache with a single query. Only one input per group that missed the cache runs the full identification; TMDB
+    calls still go through the shared client and its rate limiter.
+
+    Identifications run on `max_concurrency` threads shared by every batch, so concurrent batches queue for them
+    instead of adding threads (and database connections). Inside a deadline (see src.deadline), identifications that
+    haven't started when it passes are given up on, with a 504 result.
+    """
+    def __init__(self, identify: Callable[[str], Optional[dict]], cache_repository, max_concurrency: int):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+
+        self._identify = identify
+        self._cache_repository = cache_repository
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="batch-identifier")
+
+    @_logger.trace("identify_many")
+    def identify_many(self, file_paths: List[str]) -> List[dict]:
+        """
+        Returns one result per input, in input order: {"index", "input", "status", "media", "error"}.
+        `status` is 200 (identified), 204 (nothing found) or 500 (the identification failed).
+        """
+        unique_paths = sorted(set(file_paths), key=_release_folder_order)
+        groups: Dict[Hashable, List[str]] = {}
+        guesses: Dict[Hashable, dict] = {}
+        for file_path in unique_paths:
+            guess = identify_media_with_guess_it(file_path)
+            # Inputs GuessIt can't make sense of don't share anything; each one gets its own group.
+            key = build_identification_key(guess) or ("input", file_path)
+            groups.setdefault(key, []).append(file_path)
+            if guess and key not in guesses:
+                guesses[key] = guess
+
+        outcomes: Dict[Hashable, dict] = {}
+        cacheable_keys = [key for key in groups if key in guesses]
+        if cacheable_keys:
+            cached_records = self._cache_repository.get_cached_by_objs([guesses[key] for key in cacheable_keys])
+            for key, cached in zip(cacheable_keys, cached_records):
+                if cached:
+                    outcomes[key] = {"media": cached, "error": None}
+
+        pending_keys = [key for key in groups if key not in outcomes]
+        futures = {
+            key: submit_with_context(self._executor, self._identify_in_time, groups[key][0])
+            for key in pending_keys
+        }
+        for key, future in futures.items():
+            try:
+                outcomes[key] = {"media": future.result(), "error": None}
+            except DeadlineExceededError as exc:
+                outcomes[key] = {"media": None, "error": str(exc), "status_code": 504}
+            except Exception as exc:  # noqa: BLE001
+                _logger.error(f"Error identifying [{groups[key][0]}] in a batch: {exc}")
+                outcomes[key] = {"media": None, "error": str(exc)}
+
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.set_attributes({
+                "batch.inputs": len(file_paths),
+                "batch.unique_inputs": len(unique_paths),
+                "batch.groups": len(groups),
+                "batch.cache_hits": len(groups) - len(pending_keys),
+                "batch.identifications": len(pending_keys),
+            })
+
+        outcome_by_path = {
+            file_path: outcomes[key]
+            for key, group_paths in groups.items()
+            for file_path in group_paths
+        }
+        return [
+            build_identification_result(
+                index,
+                file_path,
+                outcome_by_path[file_path]["media"],
+                outcome_by_path[file_path]["error"],
+                outcome_by_path[file_path].get("status_code"))
+            for index, file_path in enumerate(file_paths)
+        ]
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def _identify_in_time(self, file_path: str) -> Optional[dict]:
+        check_deadline(f"identifying [{file_path}]")
+        return self._identify(file_path)
+
+
+def _release_folder_order(file_path: str) -> tuple:
+    # PureWindowsPath understands both separators.
+    path = PureWindowsPath(file_path)
+    return str(path.parent).lower(), path.name.lower()
+
+
+def build_identification_result(
+        index: int,
+        file_path: str,
+        media: Optional[dict],
+        error: Optional[str],
+        status_code: Optional[int] = None) -> dict:
+    """The per-input result of the batch and streaming endpoints. `status_code` overrides the one worked out here."""
+    if status_code is None:
+        if error is not None:
+            status_code = 500
+        elif not media:
+            status_code = 204
+        else:
+            status_code = 200
+
+    return {
+        "index": index,
+        "input": file_path,
+        "status": status_code,
+        # Results are shared by every input of a group; callers may change theirs.
+        "media": dict(media) if media else None,
+        "error": error,
+    }
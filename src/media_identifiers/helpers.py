@@ -2,8 +2,10 @@ from __future__ import annotations
 
 from typing import Optional, Tuple
 
+from src.converters.create_searchable_reference import create_searchable_reference
+from src.media_identifiers.media_type_helpers import is_tv, normalize_media_type
 from src.models.media_info import MediaInfoBuilder
-from src.utils import get_otel_log_handler
+from src.utils import get_otel_log_handler, is_valid_year
 
 _logger = get_otel_log_handler("MediaIdentifierHelpers")
 
@@ -86,3 +88,37 @@ def _extract_number(segment: str, label: str, logger) -> Optional[int]:
         return None
     return int(tokens[1])
 
+
+def build_identification_key(media: Optional[dict]) -> Optional[Tuple]:
+    """
+    Normalized key for "the same identification": (searchable_reference, media_type, year, season, episode).
+    Returns None while the media doesn't have a title and a valid media type yet.
+    """
+    if not media:
+        return None
+
+    media_type = normalize_media_type(media.get("media_type"))
+    reference = media.get("searchable_reference") or create_searchable_reference(media.get("title"))
+    if media_type is None or not reference:
+        return None
+
+    year = media.get("year")
+    season = media.get("season") if is_tv(media_type) else None
+    episode = media.get("episode") if is_tv(media_type) else None
+
+    return (
+        reference.strip().lower(),
+        media_type,
+        year if is_valid_year(year) else None,
+        season,
+        episode,
+    )
+
+
+def sanitize_filename(filename: str) -> str:
+    _filename = filename.lower()
+
+    if "halcyon" in _filename and not any(x in _filename for x in ["2015", "2026"]):
+        return _filename.replace("halcyon", "")
+
+    return _filename
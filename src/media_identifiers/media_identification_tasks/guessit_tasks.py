@@ -1,13 +1,23 @@
 import re
+import threading
+from pathlib import PureWindowsPath
 from typing import List, Optional, Tuple
 
 from guessit import guessit
 
+from src.guessit_process_pool import get_guessit_process_pool
 from src.media_identifiers.helpers import apply_basic_media_attributes
+from src.memory_cache import TTLLRUCache
 from src.models.media_info import MediaInfoBuilder
-from src.utils import get_otel_log_handler
+from src.utils import get_env_bool, get_env_int, get_otel_log_handler
 
 _logger = get_otel_log_handler("MediaIdentifier")
+_guessit_cache: Optional[TTLLRUCache] = None
+_guessit_cache_lock = threading.Lock()
+_parse_counts = {"fast_path_parses": 0, "guessit_parses": 0, "candidates_skipped": 0}
+_parse_counts_lock = threading.Lock()
+_fast_path_enabled = get_env_bool("GUESSIT_FAST_PATH", True)
+_ranked_evaluation_enabled = get_env_bool("GUESSIT_RANKED_EVALUATION", True)
 
 _PATH_SEGMENT_FILTER = {
     "tmp",
@@ -171,45 +181,440 @@ _SOURCE_NOISE_TOKENS = (
 )
 _LOW_INFORMATION_EXTENSIONS = {"rar", "zip", "7z", "r00", "r01", "r02", "sfv", "md5", "srr", "txt"}
 _MAX_FALLBACK_SEGMENTS = 2
+# Most `_metadata_quality` adds besides the title: valid type (3), season (1) and episode (1), and a plausible year (2).
+_MAX_QUALITY_BONUS_WITHOUT_YEAR = 5
+_MAX_YEAR_BONUS = 2
 _VALID_MEDIA_TYPES = {"movie", "episode", "tv"}
 _TOKEN_SPLIT_RE = re.compile(r"[^\w]+")
+_LETTER_RUN_RE = re.compile(r"[^\W\d_]{2,}")
 _TRAILING_YEAR_PATTERN = re.compile(
     r"^(?P<title>.*?)(?:[\s\[\(\-]+(?P<year>(?:18|19|20)\d{2}))[\]\)\s]*$",
     re.IGNORECASE,
 )
 
+# Fast path for textbook scene names: "Title.Year.<release tokens>" and "Title[.Year].S01E02|1x02.<release tokens>".
+# Anything else, or any token it doesn't know, goes to GuessIt.
+_FAST_PATH_NON_RELEASE_TOKENS = {
+    "the",
+    "and",
+    "or",
+    "a",
+    "an",
+    "movie",
+    "pack",
+    "collection",
+    "anthology",
+    "phase",
+    "cinematic",
+    "universe",
+    "complete",
+    "edition",
+    "cut",
+    "version",
+    "subs",
+    "subtitles",
+    "dub",
+    "multi",
+    "digital",
+    "rip",
+}
+_FAST_PATH_RELEASE_TOKENS = (_GENERIC_TITLE_TOKENS - _FAST_PATH_NON_RELEASE_TOKENS) | {
+    "hdtv",
+    "pdtv",
+    "dvd",
+    "brrip",
+    "xvid",
+    "divx",
+    "avc",
+    "eac3",
+    "internal",
+    "dv",
+    "dovi",
+    "sdr",
+    "8bit",
+    "amzn",
+    "nf",
+    "dsnp",
+    "hmax",
+    "atvp",
+    "hulu",
+}
+# Words GuessIt reads as something other than a title: editions, parts, languages, episode markers.
+_FAST_PATH_TITLE_STOP_TOKENS = (_GENERIC_TITLE_TOKENS - {"the", "and", "or", "a", "an"}) | _FAST_PATH_RELEASE_TOKENS | {
+    "part",
+    "vol",
+    "volume",
+    "chapter",
+    "cd",
+    "disc",
+    "disk",
+    "season",
+    "saison",
+    "episode",
+    "ep",
+    "uncut",
+    "unrated",
+    "directors",
+    "theatrical",
+    "special",
+    "criterion",
+    "final",
+    "real",
+    "limited",
+    "festival",
+    "french",
+    "truefrench",
+    "english",
+    "german",
+    "spanish",
+    "italian",
+    "japanese",
+    "korean",
+    "chinese",
+    "russian",
+    "portuguese",
+    "hindi",
+    "dual",
+    "dubbed",
+    "subbed",
+    "vostfr",
+    "vff",
+    "eng",
+    "fre",
+    "fra",
+    "ger",
+    "deu",
+    "spa",
+    "esp",
+    "ita",
+    "jpn",
+    "kor",
+    "chi",
+    "rus",
+    "por",
+    "hin",
+    "swe",
+    "nor",
+    "dan",
+    "fin",
+    "pol",
+    "cze",
+    "hun",
+    "tur",
+    "ara",
+    "heb",
+    "dut",
+    "nld",
+}
+# Two-letter words are usually country or language codes to GuessIt ("Us", "It"). These connectors are not.
+_FAST_PATH_SHORT_TITLE_TOKENS = {"of", "in", "on", "to", "at", "by"}
+_FAST_PATH_CONTAINERS = {"mkv", "mp4", "avi", "m4v", "mov", "wmv", "ts", "m2ts"}
+_FAST_PATH_SEPARATOR_RE = re.compile(r"[.\s]+")
+_FAST_PATH_RELEASE_GROUP_RE = re.compile(r"-[A-Za-z0-9]+$")
+_FAST_PATH_DOTTED_NUMBER_RE = re.compile(r"(?<=[A-Za-z])(\d)\.(\d)(?=[.\s-]|$)")
+_FAST_PATH_DOTTED_CODEC_RE = re.compile(r"\b([HhXx])\.(26[45])\b")
+_FAST_PATH_TITLE_TOKEN_RE = re.compile(r"^[A-Za-z][A-Za-z']+[A-Za-z]$")
+_FAST_PATH_YEAR_RE = re.compile(r"^(?:19|20)\d{2}$")
+_FAST_PATH_EPISODE_RE = re.compile(r"^(?:[Ss](?P<season>\d{1,2})[Ee](?P<episode>\d{1,3})(?:[Ee]\d{1,3})*|(?P<x_season>\d{1,2})x(?P<x_episode>\d{2,3}))$")
+_FAST_PATH_RELEASE_TOKEN_RE = re.compile(
+    r"^(?:\d{3,4}[pi]|(?:ddp|dd|eac3|ac3|aac|dts|dtshd|truehd|flac|opus)\d{0,2})$",
+    re.IGNORECASE,
+)
+
 
 @_logger.trace("identify_media_with_guess_it")
 def identify_media_with_guess_it(file_path: str) -> Optional[dict]:
     try:
         _logger.debug(f"Identifying media file: {file_path}")
 
-        best_metadata: Optional[dict] = None
-        best_score = float("-inf")
+        candidates = _generate_guessit_inputs(file_path)
+        if _ranked_evaluation_enabled:
+            best_metadata = _pick_best_candidate_ranked(candidates)
+        else:
+            best_metadata = _pick_best_candidate(candidates)
+        if best_metadata is None:
+            return None
+
+        return _create_record_from_guessit_data(best_metadata)
+    except Exception as exc:  # noqa: BLE001
+        _logger.error(f"Error identifying media file {file_path}: {exc}")
+        return None
+
 
+@_logger.trace("identify_media_candidates_with_guess_it")
+def identify_media_candidates_with_guess_it(file_path: str, limit: int) -> List[dict]:
+    """
+    Up to `limit` different identifications GuessIt finds in the path, best first. The first one is what
+    `identify_media_with_guess_it` returns; the others come from the next-best filename candidates. Parses every
+    candidate, so it's meant for when the best one didn't work out.
+
+    The bare file name, parsed on its own, is always added last (if it's different and not there yet): the path's
+    candidates leave out file names weaker than their folder, and those are sometimes the right ones (e.g.
+    `/downloads/my favourite collection of great films/heat.1995.mkv`).
+    """
+    try:
+        scored = []
         for index, candidate in enumerate(_generate_guessit_inputs(file_path)):
-            raw_metadata = guessit(candidate)
-            normalized_metadata = _normalize_guessit_metadata(dict(raw_metadata))
-            quality = _metadata_quality(normalized_metadata)
+            candidate_score = _score_candidate(candidate, index)
+            if candidate_score is not None:
+                scored.append((candidate_score[0], index, candidate_score[1]))
+
+        records = []
+        seen = set()
+        # On a tie the earlier candidate wins, as in `_pick_best_candidate`.
+        for _, _, metadata in sorted(scored, key=lambda item: (-item[0], item[1])):
+            if len(records) >= limit:
+                break
+
+            record = _create_record_from_guessit_data(metadata)
+            if _identification_key(record) not in seen:
+                seen.add(_identification_key(record))
+                records.append(record)
+
+        file_name = PureWindowsPath(file_path).name
+        if file_name and file_name != file_path:
+            file_name_record = identify_media_with_guess_it(file_name)
+            if file_name_record is not None and _identification_key(file_name_record) not in seen:
+                records.append(file_name_record)
+
+        return records
+    except Exception as exc:  # noqa: BLE001
+        _logger.error(f"Error listing GuessIt identifications for {file_path}: {exc}")
+        return []
 
-            if quality == float("-inf"):
-                continue
 
-            noise_penalty = _candidate_noise_penalty(candidate)
-            score = quality - noise_penalty + max(0, 3 - index)
+def _identification_key(record: dict) -> tuple:
+    return (
+        str(record.get("title")).lower(),
+        record.get("media_type"),
+        record.get("year"),
+        record.get("season"),
+        record.get("episode"),
+    )
 
-            if score > best_score:
-                best_score = score
-                best_metadata = normalized_metadata
 
-        if best_metadata is None:
+def _pick_best_candidate(candidates: List[str]) -> Optional[dict]:
+    """Parses every candidate and returns the metadata of the best one. On a tie the earlier candidate wins."""
+    best_metadata: Optional[dict] = None
+    best_score = float("-inf")
+
+    for index, candidate in enumerate(candidates):
+        scored = _score_candidate(candidate, index)
+        if scored is None:
+            continue
+
+        score, normalized_metadata = scored
+        if score > best_score:
+            best_score = score
+            best_metadata = normalized_metadata
+
+    return best_metadata
+
+
+def _pick_best_candidate_ranked(candidates: List[str]) -> Optional[dict]:
+    """
+    Same pick as `_pick_best_candidate`, parsing fewer candidates: they are tried from the highest score they could
+    reach, and parsing stops once none of the remaining ones can beat the best so far.
+    """
+    ranked = sorted(
+        ((_candidate_score_upper_bound(candidate, index), index, candidate) for index, candidate in enumerate(candidates)),
+        key=lambda item: (-item[0], item[1]),
+    )
+
+    best_metadata: Optional[dict] = None
+    best_score = float("-inf")
+    best_index = len(candidates)
+
+    for position, (upper_bound, index, candidate) in enumerate(ranked):
+        # On a tie the earlier candidate wins, as in the exhaustive pick.
+        if upper_bound < best_score or (upper_bound == best_score and index > best_index):
+            _count_parse("candidates_skipped", len(ranked) - position)
+            break
+
+        scored = _score_candidate(candidate, index)
+        if scored is None:
+            continue
+
+        score, normalized_metadata = scored
+        if score > best_score or (score == best_score and index < best_index):
+            best_score = score
+            best_index = index
+            best_metadata = normalized_metadata
+
+    return best_metadata
+
+
+def _candidate_score_upper_bound(candidate: str, index: int) -> float:
+    """
+    The highest score `_score_candidate` could give the candidate, without parsing it. GuessIt takes the title from
+    the candidate, so it has at most one meaningful token per candidate token that could hold one. A year needs
+    digits in the candidate; the type, season and episode bonuses are always counted, as GuessIt can read those from
+    words ("Season One").
+    """
+    possible_title_tokens = sum(1 for token in _tokenize(candidate) if _could_be_meaningful_title_token(token))
+    bonus = _MAX_QUALITY_BONUS_WITHOUT_YEAR
+    if any(char.isdigit() for char in candidate):
+        bonus += _MAX_YEAR_BONUS
+
+    return possible_title_tokens * 10 + bonus - _candidate_noise_penalty(candidate) + max(0, 3 - index)
+
+
+def _could_be_meaningful_title_token(token: str) -> bool:
+    if _token_is_meaningful_title_token(token):
+        return True
+
+    # GuessIt can cut a title off letters glued to digits ("kz1080p"), so those letters count too.
+    return any(_token_is_meaningful_title_token(letters) for letters in _LETTER_RUN_RE.findall(token))
+
+
+def _score_candidate(candidate: str, index: int) -> Optional[Tuple[float, dict]]:
+    normalized_metadata = _guess_candidate(candidate)
+    if normalized_metadata is None:
+        return None
+
+    quality = _metadata_quality(normalized_metadata)
+    if quality == float("-inf"):
+        return None
+
+    noise_penalty = _candidate_noise_penalty(candidate)
+    return quality - noise_penalty + max(0, 3 - index), normalized_metadata
+
+
+def _guess_candidate(candidate: str) -> Optional[dict]:
+    """
+    Parses a candidate with GuessIt, memoized: every file of a release shares its folder name, so the folder is
+    parsed once per release instead of once per file. Returns a copy, so callers can't change the cached result.
+    """
+    guessit_cache = get_guessit_cache()
+    cache_key = _candidate_cache_key(candidate)
+
+    cached = guessit_cache.get(cache_key)
+    if cached is None:
+        raw_metadata = _run_guessit(candidate)
+        if raw_metadata is None:
             return None
 
-        return _create_record_from_guessit_data(best_metadata)
-    except Exception as exc:  # noqa: BLE001
-        _logger.error(f"Error identifying media file {file_path}: {exc}")
+        cached = _normalize_guessit_metadata(raw_metadata)
+        guessit_cache.set(cache_key, cached)
+
+    return dict(cached)
+
+
+def _candidate_cache_key(candidate: str) -> str:
+    # Normalized like build_identification_key, so the same name in another case or with stray spaces shares the parse.
+    return candidate.strip().lower()
+
+
+def _run_guessit(candidate: str) -> Optional[dict]:
+    if _fast_path_enabled:
+        fast_metadata = _fast_parse_candidate(candidate)
+        if fast_metadata is not None:
+            _count_parse("fast_path_parses")
+            return fast_metadata
+
+    _count_parse("guessit_parses")
+    process_pool = get_guessit_process_pool()
+    if process_pool is None:
+        return dict(guessit(candidate))
+
+    # None means the parse timed out in the worker process.
+    return process_pool.guess(candidate)
+
+
+def _fast_parse_candidate(candidate: str) -> Optional[dict]:
+    """
+    Parses canonical scene names without GuessIt and returns what GuessIt would (title, type, year, season and
+    episode), or None when the name isn't one of the shapes it knows for sure, so GuessIt handles it.
+    """
+    name = candidate.strip()
+    if "." in name and name.rsplit(".", 1)[1].lower() in _FAST_PATH_CONTAINERS:
+        name = name.rsplit(".", 1)[0]
+
+    name = _FAST_PATH_DOTTED_CODEC_RE.sub(r"\1\2", name)
+    name = _FAST_PATH_DOTTED_NUMBER_RE.sub(r"\1\2", name)
+
+    tokens = [token for token in _FAST_PATH_SEPARATOR_RE.split(name) if token]
+    if len(tokens) < 2:
         return None
 
+    # The release group only counts as such after a release token, so hyphenated titles aren't cut.
+    group_match = _FAST_PATH_RELEASE_GROUP_RE.search(tokens[-1])
+    if group_match and _is_fast_path_release_token(tokens[-1][:group_match.start()]):
+        tokens[-1] = tokens[-1][:group_match.start()]
+
+    title_tokens: List[str] = []
+    index = 0
+    while index < len(tokens) and _is_fast_path_title_token(tokens[index], is_first=not title_tokens):
+        if tokens[index].lower() in _FAST_PATH_TITLE_STOP_TOKENS:
+            return None
+        title_tokens.append(tokens[index])
+        index += 1
+
+    if not title_tokens:
+        return None
+
+    metadata = {"title": " ".join(title_tokens), "type": "movie"}
+
+    if index < len(tokens) and _FAST_PATH_YEAR_RE.match(tokens[index]):
+        metadata["year"] = int(tokens[index])
+        index += 1
+
+    episode_match = _FAST_PATH_EPISODE_RE.match(tokens[index]) if index < len(tokens) else None
+    if episode_match:
+        metadata["type"] = "episode"
+        metadata["season"] = int(episode_match.group("season") or episode_match.group("x_season"))
+        metadata["episode"] = int(episode_match.group("episode") or episode_match.group("x_episode"))
+        index += 1
+    elif "year" not in metadata:
+        return None
+
+    if not all(_is_fast_path_release_token(token) for token in tokens[index:]):
+        return None
+
+    return metadata
+
+
+def _is_fast_path_title_token(token: str, is_first: bool) -> bool:
+    if _FAST_PATH_TITLE_TOKEN_RE.match(token):
+        return True
+
+    return not is_first and token.lower() in _FAST_PATH_SHORT_TITLE_TOKENS
+
+
+def _is_fast_path_release_token(token: str) -> bool:
+    lower_token = token.replace("-", "").lower()
+    return lower_token in _FAST_PATH_RELEASE_TOKENS or bool(_FAST_PATH_RELEASE_TOKEN_RE.match(lower_token))
+
+
+def _count_parse(counter: str, count: int = 1) -> None:
+    with _parse_counts_lock:
+        _parse_counts[counter] += count
+
+
+def get_guessit_stats() -> dict:
+    with _parse_counts_lock:
+        parse_counts = dict(_parse_counts)
+
+    return {"cache": get_guessit_cache().stats(), **parse_counts}
+
+
+def get_guessit_cache() -> TTLLRUCache:
+    global _guessit_cache
+
+    if _guessit_cache is not None:
+        return _guessit_cache
+
+    with _guessit_cache_lock:
+        if _guessit_cache is None:
+            # GuessIt is deterministic for a given input, so entries never expire; they are only evicted.
+            _guessit_cache = TTLLRUCache(
+                max_entries=get_env_int("GUESSIT_CACHE_MAX_ENTRIES", 8192),
+                default_ttl=None,
+                name="guessit",
+            )
+
+    return _guessit_cache
+
 
 def _create_record_from_guessit_data(guess_it_data):
     title = guess_it_data.get("title")
@@ -428,6 +833,17 @@ def _normalize_guessit_metadata(metadata: dict) -> dict:
     return normalized
 
 
+def guessit_metadata_quality(media: dict) -> float:
+    """The score GuessIt's pick got (see `_metadata_quality`), worked out again from the media built from it."""
+    return _metadata_quality({
+        "title": media.get("title"),
+        "type": media.get("media_type"),
+        "season": media.get("season"),
+        "episode": media.get("episode"),
+        "year": media.get("year"),
+    })
+
+
 def _metadata_quality(metadata: dict) -> float:
     title = metadata.get("title")
     if not title:
@@ -1,9 +1,12 @@
+import os
+
 from src.media_identifiers.helpers import parse_season_episode_string
 from src.media_identifiers.media_type_helpers import (
     is_media_type_valid,
     is_movie,
 )
 from src.media_identifiers.openai_identifier import (
+    identify_media_details_with_open_ai,
     identify_movie_title_with_open_ai,
     identify_series_title_with_open_ai,
     identify_series_season_episode_with_open_ai,
@@ -14,6 +17,25 @@ from src.utils import get_otel_log_handler
 
 _logger = get_otel_log_handler("OpenAI Task")
 
+COMBINED_EXTRACTION = "combined"
+PER_FIELD_EXTRACTION = "per_field"
+
+
+def _read_openai_extraction_mode() -> str:
+    """
+    'per_field' asks OpenAI for media type, title and season/episode in separate calls.
+    'combined' asks for all of them in one structured-output call, and falls back to 'per_field' when that fails.
+    """
+    mode = os.environ.get("OPENAI_EXTRACTION_MODE", PER_FIELD_EXTRACTION).strip().lower()
+    if mode not in (COMBINED_EXTRACTION, PER_FIELD_EXTRACTION):
+        raise ValueError(f"Environment variable 'OPENAI_EXTRACTION_MODE' must be '{PER_FIELD_EXTRACTION}' or '{COMBINED_EXTRACTION}'. Got: [{mode}]")
+    return mode
+
+
+# Read once, so a bad value stops the API at startup instead of failing every OpenAI identification.
+_openai_extraction_mode = _read_openai_extraction_mode()
+
+
 @_logger.trace("openai_identify_series_season_and_episode_by_title")
 def openai_identify_series_season_and_episode_by_title(media_data: dict, **kwargs):
     """
@@ -71,6 +93,17 @@ def openai_run_basic_identification_by_filename(media_data: dict, **kwargs):
         _logger.debug(f"[{log_tag}] No file path provided. Skipping task.")
         return media_data, False
 
+    if _openai_extraction_mode == COMBINED_EXTRACTION:
+        details = identify_media_details_with_open_ai(file_path)
+        if details is not None:
+            _logger.debug(f"[{log_tag}] Media identified in a single call as: {details}")
+            if media_data and media_data.get("year") is not None:
+                # A year parsed from the filename beats one the model came up with.
+                details = {**details, "year": None}
+            return merge_media_info(media_data, {**details, "used_openai": True}), True
+
+        _logger.debug(f"[{log_tag}] Combined extraction failed. Falling back to one call per field.")
+
     media_type = identify_media_type_with_open_ai(file_path)
 
     if not is_media_type_valid(media_type):
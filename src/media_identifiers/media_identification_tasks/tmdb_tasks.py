@@ -2,7 +2,7 @@ from src.media_identifiers.constants import MOVIE, TV
 from src.media_identifiers.media_type_helpers import normalize_media_type
 from src.media_identifiers.tmdb_identifier import identify_media_with_tmdb_movie_search, request_tmdb_movie_details, \
     request_tmdb_external_ids, identify_media_with_tmdb_series_search, request_tmdb_series_details, \
-    request_tmdb_series_episode_details
+    request_tmdb_series_episode_details, request_tmdb_season_details
 from src.models.media_info import merge_media_info
 from src.utils import get_otel_log_handler
 
@@ -122,7 +122,8 @@ def tmdb_get_episode_details(media_data: dict, **kwargs):
         _logger.debug(f"[{log_tag}] Can't run this step if it came from failure. Skipping task.")
         return media_data, False
 
-    tmdb_id = media_data.get('tmdb_id')
+    # Before this step, tmdb_id holds the series id. Prefer the explicit series id when we have it.
+    tmdb_id = media_data.get('tmdb_series_id') or media_data.get('tmdb_id')
     season = media_data.get('season')
     episode = media_data.get('episode')
 
@@ -143,6 +144,47 @@ def tmdb_get_episode_details(media_data: dict, **kwargs):
     return merge_media_info(media_data, episode_details), True
 
 
+@_logger.trace("tmdb_get_episode_details_from_season")
+def tmdb_get_episode_details_from_season(media_data: dict, **kwargs):
+    """
+    Uses TMDB api to get the whole season of the episode, caching every episode of it at once.
+    That way, the other files of a season pack are answered by the cache without calling TMDB.
+    Falls back to tmdb_get_episode_details if the season can't be fetched.
+    """
+    log_tag = tmdb_get_episode_details_from_season.__name__
+
+    if not kwargs.get('success', False):
+        _logger.debug(f"[{log_tag}] Can't run this step if it came from failure. Skipping task.")
+        return media_data, False
+
+    tmdb_series_id = media_data.get('tmdb_series_id') or media_data.get('tmdb_id')
+    season = media_data.get('season')
+    episode = media_data.get('episode')
+    cache_repository = kwargs.get('cache_repository')
+
+    if tmdb_series_id is None or season is None or episode is None or cache_repository is None:
+        _logger.debug(f"[{log_tag}] Missing series id, season, episode or cache. Fetching the episode only.")
+        return tmdb_get_episode_details(media_data, **kwargs)
+
+    season_episodes = request_tmdb_season_details(tmdb_series_id, season)
+
+    if not season_episodes:
+        _logger.debug(f"[{log_tag}] No season details for TMDb ID: [{tmdb_series_id}]. Fetching the episode only.")
+        return tmdb_get_episode_details(media_data, **kwargs)
+
+    season_records = [merge_media_info(media_data, episode_details) for episode_details in season_episodes]
+    current_episode = next((record for record in season_records if record.get('episode') == episode), None)
+
+    inserted = cache_repository.cache_many(season_records)
+    _logger.debug(f"[{log_tag}] Prefetched season {season} of TMDb ID [{tmdb_series_id}]. New cache entries: {inserted}")
+
+    if current_episode is None:
+        _logger.debug(f"[{log_tag}] Episode {episode} is not part of season {season}. Fetching the episode only.")
+        return tmdb_get_episode_details(media_data, **kwargs)
+
+    return current_episode, True
+
+
 @_logger.trace("_tmdb_get_media_external_ids")
 def _tmdb_get_media_external_ids(media_data: dict, **kwargs):
     """
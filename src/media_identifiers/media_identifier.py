@@ -1,10 +1,13 @@
 from typing import Optional
 
+from src.deadline import DeadlineExceededError
+from src.media_identifiers.helpers import sanitize_filename
 from src.media_identifiers.media_type_helpers import is_media_type_valid, is_movie, is_tv
-from src.media_identifiers.pipeline import PipelineContext, PipelineController, build_pipeline
+from src.media_identifiers.pipeline import DagPipelineController, PipelineContext, PipelineController, build_pipeline
+from src.media_identifiers.pipeline.base import PipelineExecutionError
 from src.models.media_identification_request import MediaIdentificationRequest
 from src.repositories.repository_factory import get_repository
-from src.utils import get_otel_log_handler
+from src.utils import get_env_bool, get_otel_log_handler
 
 
 _logger = get_otel_log_handler("MediaIdentifier")
@@ -13,42 +16,80 @@ _logger = get_otel_log_handler("MediaIdentifier")
 class MediaIdentifier:
     def __init__(self):
         self._cache = get_repository("cache")
+        self._lock_repository = get_repository("advisory_lock") if get_env_bool("SINGLE_FLIGHT_CROSS_WORKER", False) else None
+        self._controller_type = DagPipelineController if get_env_bool("PIPELINE_DAG_SCHEDULER", True) else PipelineController
         self._logger = _logger
 
     @_logger.trace("identify")
     def identify(self, request: MediaIdentificationRequest) -> Optional[dict]:
+        context = None
         try:
             self._logger.debug(f"Starting identification: {request.to_logging_payload()}")
 
-            context = PipelineContext(request, cache_repository=self._cache, logger=self._logger)
-            handlers = build_pipeline(request)
-            controller = PipelineController(handlers, logger=self._logger)
-            result = controller.run(context)
+            context = PipelineContext(
+                request,
+                cache_repository=self._cache,
+                logger=self._logger,
+                lock_repository=self._lock_repository,
+            )
+            try:
+                identified = self._run_pipeline(request, context)
+            except PipelineExecutionError as exc:
+                # Steps fail fast once the budget is spent; that's a timeout, not a media we can't identify.
+                if context.deadline is not None and context.deadline.expired:
+                    raise DeadlineExceededError(
+                        f"Could not identify the media within the {context.deadline.budget_seconds:g}s request budget."
+                    ) from exc
+                raise
+
+            # Concurrent requests for the same media are waiting on this result (see SingleFlightHandler).
+            context.release_single_flight(result=identified)
+            return identified
+        except Exception as exc:  # noqa: BLE001
+            self._logger.error(f"Error identifying media request {request.to_logging_payload()}: {exc}")
+            if context is not None:
+                context.release_single_flight(error=exc)
+            raise
 
-            if result.cached is not None:
-                self._logger.debug("Returning cached result from pipeline.")
-                return result.cached
+    def _run_pipeline(self, request: MediaIdentificationRequest, context: PipelineContext) -> Optional[dict]:
+        handlers = build_pipeline(request)
+        controller = self._controller_type(handlers, logger=self._logger)
+        result = controller.run(context)
 
-            media = result.media
-            if not media:
-                self._logger.debug("Pipeline produced no media data.")
-                return None
+        if result.cached is not None:
+            self._logger.debug("Returning cached result from pipeline.")
+            return result.cached
 
-            media_type = media.get("media_type")
-            if not is_media_type_valid(media_type):
-                self._logger.warning(f"Media type [{media_type}] is not valid. Skipping persistence.")
-                return None
+        media = result.media
+        if not media:
+            self._logger.debug("Pipeline produced no media data.")
+            return None
 
-            return self._persist_media(media)
-        except Exception as exc:  # noqa: BLE001
-            self._logger.error(f"Error identifying media request {request.to_logging_payload()}: {exc}")
-            raise
+        media_type = media.get("media_type")
+        if not is_media_type_valid(media_type):
+            self._logger.warning(f"Media type [{media_type}] is not valid. Skipping persistence.")
+            return None
+
+        if result.partial:
+            # Cached media is never enriched again, so only complete results are persisted.
+            self._logger.warning("Request budget ran low before the media was fully enriched. Returning it without caching.")
+            return media
+
+        return self._persist_media(media)
 
     @_logger.trace("get_media_info_by_filename")
     def get_media_info_by_filename(self, file_path: str) -> Optional[dict]:
         request = MediaIdentificationRequest.from_filename(file_path)
         return self.identify(request)
 
+    @_logger.trace("get_media_info_by_path")
+    def get_media_info_by_path(self, file_path: str) -> Optional[dict]:
+        """
+        Identifies a path as given by a user (what `/api/guess` does), sanitized first. When TMDB has nothing for the
+        title GuessIt picked, the pipeline tries the other titles found in the path itself (see TMDB_ALTERNATIVE_TITLES).
+        """
+        return self.get_media_info_by_filename(sanitize_filename(file_path))
+
     @_logger.trace("get_media_info")
     def get_media_info(
         self,
@@ -90,7 +131,7 @@ class MediaIdentifier:
             episode = media.get("episode")
             tmdb_series_id = media.get("tmdb_series_id")
 
-            if tmdb_id is not None:
+            if tmdb_id is not None and tmdb_id != tmdb_series_id:
                 existing = self._cache.get_cached_by_tmdb_id(tmdb_id)
                 if existing:
                     self._logger.debug("Episode already cached by TMDb ID.")
@@ -102,7 +143,7 @@ class MediaIdentifier:
                     self._logger.debug("Episode already cached by series/season/episode.")
                     return existing
 
-            if tmdb_id is None:
+            if tmdb_id is None or tmdb_id == tmdb_series_id:
                 self._logger.debug("Episode lacks TMDb episode ID; returning without caching.")
                 return media
 
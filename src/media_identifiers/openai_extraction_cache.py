@@ -0,0 +1,148 @@
+import hashlib
+import re
+import threading
+from typing import Optional
+
+from src.media_identifiers.prompt_registry import RenderedPrompt
+from src.memory_cache import TTLLRUCache
+from src.utils import get_env_bool, get_env_float, get_env_int, get_otel_log_handler
+
+_logger = get_otel_log_handler("OpenAIExtractionCache")
+_openai_extraction_cache: Optional["OpenAIExtractionCache"] = None
+_openai_extraction_cache_lock = threading.Lock()
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class OpenAIExtractionCache:
+    """
+    Memoizes OpenAI answers by (AI function, prompt version, normalized input), so the same filename is never sent
+    to the model twice for the same prompt, even when the identification fails further down and nothing else
+    gets cached.
+
+    Editing an AI function changes its prompt version, so the old answers are simply never looked up again
+    and expire with their TTL.
+    The in-memory tier is always on. The persistent tier (Postgres) is optional; when it fails the cache
+    degrades to memory only instead of failing the OpenAI call.
+    """
+    def __init__(self, memory_cache: TTLLRUCache, ttl: float, persistent_repository=None):
+        self._memory_cache = memory_cache
+        self._ttl = ttl
+        self._persistent_repository = persistent_repository
+        self._lock = threading.Lock()
+        self._persistent_hits = 0
+        self._persistent_misses = 0
+        self._persistent_errors = 0
+
+    def get(self, prompt: RenderedPrompt, file_path: str) -> Optional[str]:
+        normalized_input = normalize_input(file_path)
+        memory_key = (prompt.name, prompt.version, normalized_input)
+
+        cached = self._memory_cache.get(memory_key)
+        if cached is not None:
+            return cached
+
+        if self._persistent_repository is None:
+            return None
+
+        try:
+            cached = self._persistent_repository.get_output(prompt.name, prompt.version, hash_input(normalized_input))
+        except RuntimeError as e:
+            _logger.warning(f"Could not read the persistent OpenAI extraction cache: {e}")
+            with self._lock:
+                self._persistent_errors += 1
+            return None
+
+        with self._lock:
+            if cached is None:
+                self._persistent_misses += 1
+                return None
+            self._persistent_hits += 1
+
+        self._memory_cache.set(memory_key, cached, ttl=self._ttl)
+        return cached
+
+    def set(self, prompt: RenderedPrompt, file_path: str, output: Optional[str]) -> None:
+        if not output:
+            return
+
+        normalized_input = normalize_input(file_path)
+        self._memory_cache.set((prompt.name, prompt.version, normalized_input), output, ttl=self._ttl)
+
+        if self._persistent_repository is None:
+            return
+
+        try:
+            self._persistent_repository.save_output(
+                prompt.name,
+                prompt.version,
+                hash_input(normalized_input),
+                normalized_input,
+                output,
+                self._ttl)
+        except RuntimeError as e:
+            _logger.warning(f"Could not write to the persistent OpenAI extraction cache: {e}")
+            with self._lock:
+                self._persistent_errors += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            persistent = {
+                "enabled": self._persistent_repository is not None,
+                "hits": self._persistent_hits,
+                "misses": self._persistent_misses,
+                "errors": self._persistent_errors,
+            }
+
+        return {
+            "memory": self._memory_cache.stats(),
+            "persistent": persistent,
+        }
+
+
+def normalize_input(file_path: str) -> str:
+    """Windows and POSIX separators and runs of whitespace don't change the answer, so they don't change the key."""
+    return _WHITESPACE_RE.sub(" ", file_path.replace("\\", "/")).strip()
+
+
+def hash_input(normalized_input: str) -> str:
+    # Paths can be longer than a btree index entry allows, so the table is keyed by a hash of the input.
+    return hashlib.sha256(normalized_input.encode("utf-8")).hexdigest()
+
+
+def get_openai_extraction_cache() -> OpenAIExtractionCache:
+    global _openai_extraction_cache
+
+    if _openai_extraction_cache is not None:
+        return _openai_extraction_cache
+
+    with _openai_extraction_cache_lock:
+        if _openai_extraction_cache is None:
+            _openai_extraction_cache = _create_openai_extraction_cache()
+
+    return _openai_extraction_cache
+
+
+def _create_openai_extraction_cache() -> OpenAIExtractionCache:
+    persistent_repository = None
+    if get_env_bool("OPENAI_EXTRACTION_CACHE_PERSISTENT", False):
+        # Imported here so the in-memory only setup doesn't need a database.
+        from src.repositories.repository_factory import get_repository
+
+        try:
+            persistent_repository = get_repository("openai_extraction_cache")
+        except Exception as e:  # noqa: BLE001
+            _logger.error(f"Persistent OpenAI extraction cache unavailable, using memory only: {e}")
+            persistent_repository = None
+
+    _logger.debug(f"OpenAI extraction cache created. Persistent tier: {persistent_repository is not None}")
+
+    return OpenAIExtractionCache(
+        memory_cache=TTLLRUCache(
+            max_entries=get_env_int("OPENAI_EXTRACTION_CACHE_MAX_ENTRIES", 4096),
+            default_ttl=None,
+            name="openai_extractions",
+        ),
+        ttl=get_env_float("OPENAI_EXTRACTION_CACHE_TTL_SECONDS", 30 * 24 * 60 * 60),
+        persistent_repository=persistent_repository,
+    )
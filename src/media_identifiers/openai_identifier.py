@@ -1,26 +1,59 @@
-import inspect
+import json
 import os
 from typing import Optional, Union
 from opentelemetry import trace
 from openai import OpenAI, OpenAIError, RateLimitError
 
+from src.deadline import DeadlineExceededError, check_deadline, remaining_budget
 from src.media_identifiers.ai_functions import extract_movie_title_ai_function, extract_series_title_ai_function
+from src.media_identifiers.ai_functions.extract_media_details_ai_function import extract_media_details_from_filename
 from src.media_identifiers.ai_functions.extract_media_type_ai_function import extract_media_type_from_filename
 from src.media_identifiers.ai_functions.extract_season_episode_ai_function import extract_season_episode_from_filename
 from src.media_identifiers.helpers import apply_basic_media_attributes, parse_season_episode_string
 from src.media_identifiers.media_type_helpers import (
     is_media_type_valid,
     is_movie,
+    is_tv,
+    normalize_media_type,
 )
+from src.media_identifiers.openai_extraction_cache import get_openai_extraction_cache
+from src.media_identifiers.prompt_registry import SYSTEM_INSTRUCTIONS, RenderedPrompt, get_prompt_registry
 from src.models.media_info import MediaInfoBuilder
 from src.repositories.repository_factory import get_repository
-from src.utils import get_otel_log_handler
+from src.utils import get_otel_log_handler, is_valid_year
 
 _open_ai_model = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
 _logger = get_otel_log_handler("MediaIdentifier")
 _openai_request_logger = None
 _open_ai_client = None
 
+_MEDIA_DETAILS_FORMAT = {
+    "type": "json_schema",
+    "name": "media_details",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "media_type": {"type": "string", "enum": ["movie", "tv", "unknown"]},
+            "title": {"type": ["string", "null"]},
+            "year": {"type": ["integer", "null"]},
+            "season": {"type": ["integer", "null"]},
+            "episode": {"type": ["integer", "null"]},
+        },
+        "required": ["media_type", "title", "year", "season", "episode"],
+        "additionalProperties": False,
+    },
+}
+
+# Rendered once here, instead of reading the function source from disk on every call.
+get_prompt_registry().register_all([
+    extract_media_type_from_filename,
+    extract_movie_title_ai_function,
+    extract_series_title_ai_function,
+    extract_season_episode_from_filename,
+], model=_open_ai_model)
+get_prompt_registry().get(extract_media_details_from_filename, _open_ai_model, _MEDIA_DETAILS_FORMAT)
+
 
 @_logger.trace("identify_media_with_open_ai_multi")
 def identify_media_with_open_ai_multi(file_path: str, media_type: Union[str, None]) -> Optional[dict]:
@@ -65,6 +98,65 @@ def identify_media_with_open_ai_multi(file_path: str, media_type: Union[str, Non
         .build()
 
 
+@_logger.trace("identify_media_details_with_open_ai")
+def identify_media_details_with_open_ai(file_path: str) -> Optional[dict]:
+    """
+    Gets media type, title, year, season and episode in a single structured-output call.
+    Returns None if the call fails or the answer doesn't pass validation, so callers can fall back to the per-field calls.
+    """
+    span = trace.get_current_span()
+    if span.is_recording(): span.set_attribute("media.file_path", file_path)
+
+    try:
+        prompt = get_prompt_registry().get(extract_media_details_from_filename, _open_ai_model, _MEDIA_DETAILS_FORMAT)
+        raw_details = _ask_open_ai_about_file(file_path, prompt)
+    except Exception as e:
+        _logger.error(f"Error extracting media details for file [{file_path}]: {str(e)}")
+        return None
+
+    return parse_media_details(raw_details)
+
+
+def parse_media_details(raw_details: Optional[str]) -> Optional[dict]:
+    if not raw_details:
+        return None
+
+    try:
+        details = json.loads(raw_details)
+    except json.JSONDecodeError:
+        _logger.warning(f"OpenAI media details are not valid JSON: {raw_details}")
+        return None
+
+    if not isinstance(details, dict):
+        _logger.warning(f"OpenAI media details are not a JSON object: {raw_details}")
+        return None
+
+    media_type = normalize_media_type(details.get("media_type")) if isinstance(details.get("media_type"), str) else None
+    title = details.get("title")
+    if media_type is None or not isinstance(title, str) or not title.strip() or title.strip().lower() == "unknown":
+        _logger.debug(f"OpenAI could not identify the media: {raw_details}")
+        return None
+
+    year = _optional_int(details.get("year"))
+    season = _optional_int(details.get("season")) if is_tv(media_type) else None
+    episode = _optional_int(details.get("episode")) if is_tv(media_type) else None
+
+    return {
+        "media_type": media_type,
+        "title": title.strip(),
+        "year": year if is_valid_year(year) else None,
+        "season": season,
+        "episode": episode,
+    }
+
+
+def _optional_int(value) -> Optional[int]:
+    # bool is an int subclass, but never a valid year, season or episode.
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        return None
+    return value
+
+
 @_logger.trace("identify_media_type_with_open_ai")
 def identify_media_type_with_open_ai(file_path: str) -> Optional[str]:
     span = trace.get_current_span()
@@ -96,46 +188,60 @@ def identify_series_season_episode_with_open_ai(file_path: str) -> Optional[str]
 @_logger.trace("_send_task_to_ai")
 def _send_task_to_ai(file_path: str, ai_function: callable) -> Optional[str]:
     try:
-        return _ask_open_ai(ai_input = _prepare_open_ai_input(file_path, ai_function))
+        prompt = get_prompt_registry().get(ai_function, _open_ai_model)
+        return _ask_open_ai_about_file(file_path, prompt)
     except Exception as e:
         _logger.error(f"Error extracting data for file [{file_path}]: {str(e)}")
         return None
 
 
-def _prepare_open_ai_input(file_path: str, ai_function: callable) -> str:
-    return f"""Output only the result as specified in the function comments below.
-Function code:
-```python
-{inspect.getsource(ai_function)}
-```
-Input:
-```plaintext
-{file_path}
-```"""
+def _ask_open_ai_about_file(file_path: str, prompt: RenderedPrompt) -> Optional[str]:
+    """Asks the model only when this prompt version hasn't answered for this file yet. Failed calls aren't cached."""
+    extraction_cache = get_openai_extraction_cache()
+
+    cached = extraction_cache.get(prompt, file_path)
+    span = trace.get_current_span()
+    if span.is_recording(): span.set_attribute("ai.extraction_cache_hit", cached is not None)
+    if cached is not None:
+        return cached
+
+    output = _ask_open_ai(
+        ai_input=prompt.build_input(file_path), prompt=prompt, response_format=prompt.response_format)
+    extraction_cache.set(prompt, file_path, output)
+    return output
 
 
 @_logger.trace("_ask_open_ai")
-def _ask_open_ai(ai_input: str) -> Optional[str]:
+def _ask_open_ai(
+        ai_input: str,
+        prompt: Optional[RenderedPrompt] = None,
+        response_format: Optional[dict] = None) -> Optional[str]:
     span = trace.get_current_span()
     if span.is_recording():
         span.set_attribute("ai.model", _open_ai_model)
+        if prompt is not None:
+            span.set_attributes({
+                "ai.function": prompt.name,
+                "ai.prompt_version": prompt.version,
+            })
 
     try:
-        ai_sys_instructions = """You are an AI that implements Python functions as described in code comments.
-Only respond to the user's request by executing the function as described, strictly following the output format specified in the comments. 
-This is very important: you are forbidden from adding explanations, rephrasing, adding context, adding code blocks, or adding any extra text—output only the function result, as defined.
-Think step by step and double-check your answer before responding, especially when the input is ambiguous or tricky.
-You are forbidden from guessing, inferring, or deducing information that is not explicitly present in the user input or function comments."""
-
         client = _get_open_ai_client()
         if client is None:
             return None
 
+        check_deadline("an OpenAI call")
+        options = {"text": {"format": response_format}} if response_format else {}
+        timeout = remaining_budget()
+        if timeout is not None:
+            options["timeout"] = timeout
+
         response = client.responses.create(
             model=_open_ai_model,
-            instructions=ai_sys_instructions,
+            instructions=SYSTEM_INSTRUCTIONS,
             input=ai_input,
-            temperature=0.1)
+            temperature=0.1,
+            **options)
 
         usage = _extract_usage_from_response(response.usage)
 
@@ -145,13 +251,20 @@ You are forbidden from guessing, inferring, or deducing information that is not
 
         logger = _get_openai_request_logger()
         if logger:
-            logger.log(**usage)
+            logger.log(
+                **usage,
+                ai_function=prompt.name if prompt else None,
+                prompt_version=prompt.version if prompt else None)
 
         return response.output_text
     except RateLimitError as e:
         _logger.error(f"OpenAI rate limit exceeded. You're probably out of credits, bud. Error: {str(e)}")
         return None
 
+    except DeadlineExceededError as e:
+        _logger.warning(f"OpenAI call skipped: {str(e)}")
+        return None
+
     except Exception as e:
         _logger.error(f"Error communicating with OpenAI: {str(e)}")
         return None
@@ -2,16 +2,20 @@ from .base import (
     PipelineContext,
     PipelineController,
     PipelineHandler,
+    PipelinePlan,
     PipelineResult,
     StepResult,
     StepStatus,
 )
 from .builder import build_pipeline
+from .scheduler import DagPipelineController
 
 __all__ = [
+    "DagPipelineController",
     "PipelineContext",
     "PipelineController",
     "PipelineHandler",
+    "PipelinePlan",
     "PipelineResult",
     "StepResult",
     "StepStatus",
@@ -1,14 +1,20 @@
+import copy
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, Optional, Sequence
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
 from opentelemetry import trace
 
+from src.deadline import Deadline, get_deadline
+from src.media_identifiers.constants import MOVIE, TV
+from src.media_identifiers.media_type_helpers import normalize_media_type
 from src.models.media_identification_request import MediaIdentificationRequest, RequestMode
-from src.models.media_info import is_media_type_valid, merge_media_info
-from src.utils import get_otel_log_handler
+from src.models.media_info import merge_media_info
+from src.single_flight import SingleFlightLease
+from src.utils import get_env_float, get_otel_log_handler
 
 
 _logger = get_otel_log_handler("Pipeline")
+_optional_step_min_budget = get_env_float("PIPELINE_OPTIONAL_STEP_MIN_BUDGET_SECONDS", 3)
 
 
 class StepStatus(str, Enum):
@@ -46,6 +52,8 @@ class PipelineResult:
     media: Optional[dict]
     cached: Optional[dict]
     completed: bool
+    # Optional steps were skipped to stay within the request budget, so the media may lack some details.
+    partial: bool = False
 
 
 class PipelineExecutionError(RuntimeError):
@@ -58,15 +66,22 @@ class PipelineContext:
         request: MediaIdentificationRequest,
         cache_repository,
         logger=None,
+        lock_repository=None,
     ):
         self.request = request
         self.cache_repository = cache_repository
+        self.lock_repository = lock_repository
         self.logger = logger or get_otel_log_handler("Pipeline")
         self.file_path = request.file_path
         self.media: Optional[dict] = request.seed_media_info()
         self.cached_result: Optional[dict] = None
         self.completed: bool = False
         self.errors: List[BaseException] = []
+        self.single_flight_lease: Optional[SingleFlightLease] = None
+        self.advisory_lock = None
+        self.deadline: Optional[Deadline] = get_deadline()
+        self.skipped_for_budget: List[str] = []
+        self._normalized_media_type: Optional[Tuple[Optional[str], Optional[str]]] = None
 
     @property
     def mode(self) -> RequestMode:
@@ -78,9 +93,22 @@ class PipelineContext:
             return None
         return self.media.get("media_type")
 
+    @property
+    def normalized_media_type(self) -> Optional[str]:
+        """`media_type` normalized, worked out again only when it changes."""
+        media_type = self.media_type
+        if self._normalized_media_type is None or self._normalized_media_type[0] != media_type:
+            self._normalized_media_type = (media_type, normalize_media_type(media_type))
+        return self._normalized_media_type[1]
+
+    @property
+    def remaining_budget(self) -> Optional[float]:
+        """Seconds left before the request's deadline, or None if it has no latency budget."""
+        return self.deadline.remaining() if self.deadline is not None else None
+
     @property
     def has_media_type(self) -> bool:
-        return is_media_type_valid(self.media_type) if self.media_type else False
+        return self.normalized_media_type is not None
 
     @_logger.trace("PipelineContext.update_media")
     def update_media(self, new_media: Optional[dict]) -> None:
@@ -88,6 +116,25 @@ class PipelineContext:
             return
         self.media = merge_media_info(self.media, new_media)
 
+    def fork(self) -> "PipelineContext":
+        """A copy for a step that runs alongside others. Its changes are brought back with `merge_fork`."""
+        forked = copy.copy(self)
+        forked.media = dict(self.media) if self.media is not None else None
+        forked.errors = []
+        return forked
+
+    def merge_fork(self, forked: "PipelineContext", forked_from: Optional[dict]) -> dict:
+        """Applies what a forked step changed (relative to `forked_from`, the media it started with). Returns the changes."""
+        base = forked_from or {}
+        changes = {key: value for key, value in (forked.media or {}).items() if base.get(key) != value}
+        if changes:
+            self.update_media(changes)
+
+        self.errors.extend(forked.errors)
+        if forked.cached_result is not None:
+            self.mark_cached_result(forked.cached_result)
+        return changes
+
     def mark_cached_result(self, cached: dict) -> None:
         self.cached_result = cached
         self.completed = True
@@ -95,12 +142,46 @@ class PipelineContext:
     def record_error(self, error: BaseException) -> None:
         self.errors.append(error)
 
+    def release_single_flight(self, result: Optional[dict] = None, error: Optional[BaseException] = None) -> None:
+        """Shares the outcome with requests waiting on this one and drops any cross-worker lock. Safe to call twice."""
+        lease, self.single_flight_lease = self.single_flight_lease, None
+        advisory_lock, self.advisory_lock = self.advisory_lock, None
+
+        if advisory_lock is not None:
+            self.lock_repository.release(advisory_lock)
+
+        if lease is None:
+            return
+
+        if error is not None:
+            lease.fail(error)
+        else:
+            lease.complete(result)
+
     def finalize(self) -> PipelineResult:
-        return PipelineResult(media=self.media, cached=self.cached_result, completed=self.completed)
+        return PipelineResult(
+            media=self.media,
+            cached=self.cached_result,
+            completed=self.completed,
+            partial=bool(self.skipped_for_budget),
+        )
 
 
 class PipelineHandler:
     name: str = "pipeline_handler"
+    # Media fields the step looks at (in `handles` or `invoke`) and may change. Steps that declare both can run
+    # alongside each other (see DagPipelineController); None means the step depends on, and affects, everything.
+    reads: Optional[FrozenSet[str]] = None
+    writes: Optional[FrozenSet[str]] = None
+    # Media types the step can apply to. None means any, including media whose type isn't known yet.
+    media_types: Optional[FrozenSet[str]] = None
+    # Steps that only add details to media that is already identified. When the request is short on time, the
+    # controller skips them and returns what it has.
+    optional: bool = False
+
+    @property
+    def is_barrier(self) -> bool:
+        return self.reads is None or self.writes is None
 
     def handles(self, context: PipelineContext) -> bool:
         return True
@@ -109,9 +190,57 @@ class PipelineHandler:
         raise NotImplementedError
 
 
+class PipelinePlan(Sequence[PipelineHandler]):
+    """
+    An immutable list of handlers, built once and shared by every request (see build_pipeline), so handlers must
+    keep per-request state on the context.
+
+    What only depends on the handlers is worked out here, once: the steps that can apply to movies, to TV shows,
+    and to media of unknown type (so a movie request never evaluates TV steps), and what each step has to wait
+    for when steps run concurrently (see DagPipelineController).
+    """
+    def __init__(self, handlers: Iterable[PipelineHandler]):
+        self._handlers: Tuple[PipelineHandler, ...] = tuple(handlers)
+        self._applicable: Dict[Optional[str], FrozenSet[int]] = {
+            media_type: frozenset(
+                index for index, handler in enumerate(self._handlers)
+                if handler.media_types is None or media_type in handler.media_types
+            )
+            for media_type in (MOVIE, TV, None)
+        }
+        self.dependencies: Tuple[Tuple[int, ...], ...] = self._build_dependencies()
+
+    def __getitem__(self, index):
+        return self._handlers[index]
+
+    def __len__(self) -> int:
+        return len(self._handlers)
+
+    def __iter__(self) -> Iterator[PipelineHandler]:
+        return iter(self._handlers)
+
+    def applies(self, index: int, media_type: Optional[str]) -> bool:
+        """Whether the step at `index` can apply to media of the given (normalized) type."""
+        return index in self._applicable.get(media_type, self._applicable[None])
+
+    def _build_dependencies(self) -> Tuple[Tuple[int, ...], ...]:
+        """For every step, the earlier steps it has to wait for: all of them for barriers, else the ones writing what it reads."""
+        dependencies = []
+        for index, handler in enumerate(self._handlers):
+            if handler.is_barrier:
+                dependencies.append(tuple(range(index)))
+                continue
+
+            dependencies.append(tuple(
+                earlier_index for earlier_index, earlier in enumerate(self._handlers[:index])
+                if earlier.is_barrier or earlier.writes & handler.reads
+            ))
+        return tuple(dependencies)
+
+
 class PipelineController:
     def __init__(self, handlers: Sequence[PipelineHandler], logger=None):
-        self.handlers = handlers
+        self.handlers = handlers if isinstance(handlers, PipelinePlan) else PipelinePlan(handlers)
         self.logger = logger or _logger
 
     @_logger.trace("PipelineController.run")
@@ -120,8 +249,10 @@ class PipelineController:
         if span.is_recording():
             span.set_attribute("pipeline.handler_count", len(self.handlers))
 
-        for handler in self.handlers:
-            if not handler.handles(context):
+        for index, handler in enumerate(self.handlers):
+            if not self.handlers.applies(index, context.normalized_media_type) or not handler.handles(context):
+                continue
+            if self._skip_for_budget(context, handler):
                 continue
             handler_name = getattr(handler, "name", handler.__class__.__name__)
             try:
@@ -150,3 +281,15 @@ class PipelineController:
 
         return context.finalize()
 
+    def _skip_for_budget(self, context: PipelineContext, handler: PipelineHandler) -> bool:
+        """Whether an optional step has to be left out because the request is running out of time."""
+        if not handler.optional:
+            return False
+
+        remaining = context.remaining_budget
+        if remaining is None or remaining >= _optional_step_min_budget:
+            return False
+
+        context.skipped_for_budget.append(handler.name)
+        self.logger.warning(f"[{handler.name}] Skipped: only {remaining:.2f}s left in the request budget.")
+        return True
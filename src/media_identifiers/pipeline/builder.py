@@ -1,12 +1,15 @@
+import functools
 from typing import List
 
 from src.utils import get_otel_log_handler
-from src.media_identifiers.pipeline.base import PipelineHandler
+from src.media_identifiers.pipeline.base import PipelineHandler, PipelinePlan
 from src.media_identifiers.pipeline.handlers import (
     CacheLookupHandler,
     GuessItIdentificationHandler,
     OpenAIBasicIdentificationHandler,
     OpenAISeriesSeasonEpisodeHandler,
+    SingleFlightHandler,
+    SpeculativeOpenAIIdentificationHandler,
     TMDBEpisodeDetailsHandler,
     TMDBIdentifyMovieHandler,
     TMDBIdentifySeriesHandler,
@@ -19,21 +22,37 @@ from src.models.media_identification_request import MediaIdentificationRequest,
 _logger = get_otel_log_handler("PipelineBuilder")
 
 
-@_logger.trace("build_pipeline")
-def build_pipeline(request: MediaIdentificationRequest) -> List[PipelineHandler]:
+def build_pipeline(request: MediaIdentificationRequest) -> PipelinePlan:
+    """Returns the plan for the request's mode. Plans are built once and shared by every request."""
+    return _build_plan(request.mode)
+
+
+@functools.lru_cache(maxsize=None)
+def _build_plan(mode: RequestMode) -> PipelinePlan:
+    _logger.debug(f"Building the pipeline plan for {mode.value} requests.")
     handlers: List[PipelineHandler] = []
 
-    if request.mode == RequestMode.FILENAME:
+    if mode == RequestMode.FILENAME:
         handlers.extend(
             [
                 GuessItIdentificationHandler(),
                 CacheLookupHandler(label="post-guessit"),
+                SingleFlightHandler(),
                 OpenAIBasicIdentificationHandler(),
                 CacheLookupHandler(label="post-openai"),
+                # Only runs when the first one couldn't (GuessIt gave no media type or title, OpenAI did): it skips
+                # itself once the request already holds a lease.
+                SingleFlightHandler(),
+                SpeculativeOpenAIIdentificationHandler(),
             ]
         )
     else:
-        handlers.append(CacheLookupHandler(label="metadata-seed"))
+        handlers.extend(
+            [
+                CacheLookupHandler(label="metadata-seed"),
+                SingleFlightHandler(),
+            ]
+        )
 
     handlers.extend(
         [
@@ -48,6 +67,4 @@ def build_pipeline(request: MediaIdentificationRequest) -> List[PipelineHandler]
         ]
     )
 
-    return handlers
-
-
+    return PipelinePlan(handlers)
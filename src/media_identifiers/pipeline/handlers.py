@@ -1,27 +1,79 @@
-from src.utils import get_otel_log_handler
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from src.utils import first_successful, get_env_bool, get_env_float, get_env_int, get_otel_log_handler
 from opentelemetry import trace
-from src.media_identifiers.media_identification_tasks.guessit_tasks import identify_media_with_guess_it
+from src.deadline import remaining_budget
+from src.media_identifiers.constants import MOVIE, TV
+from src.media_identifiers.helpers import build_identification_key
+from src.media_identifiers.media_identification_tasks.guessit_tasks import (
+    guessit_metadata_quality,
+    identify_media_candidates_with_guess_it,
+    identify_media_with_guess_it,
+)
 from src.media_identifiers.media_identification_tasks.openai_tasks import (
     openai_identify_series_season_and_episode_by_title,
     openai_run_basic_identification_by_filename,
 )
 from src.media_identifiers.media_identification_tasks.tmdb_tasks import (
     tmdb_get_episode_details,
+    tmdb_get_episode_details_from_season,
     tmdb_get_movie_external_ids,
     tmdb_get_series_external_ids,
     tmdb_identify_movie_by_id,
     tmdb_identify_series_by_title_and_id,
 )
+from src.media_identifiers.media_type_helpers import normalize_media_type
 from src.media_identifiers.pipeline.base import PipelineContext, PipelineHandler, StepResult
-from src.media_identifiers.media_type_helpers import (
-    is_media_type_valid,
-    is_movie,
-    is_tv,
-)
+from src.media_identifiers.pipeline.scheduler import get_step_executor
 from src.models.media_identification_request import RequestMode
+from src.single_flight import SingleFlightTimeoutError, get_single_flight
 
 
 _logger = get_otel_log_handler("PipelineHandlers")
+_season_prefetch_enabled = get_env_bool("TMDB_SEASON_PREFETCH", True)
+_single_flight_wait_seconds = get_env_float("SINGLE_FLIGHT_WAIT_SECONDS", 30)
+_speculative_openai_enabled = get_env_bool("OPENAI_SPECULATIVE_FALLBACK", False)
+_speculative_openai_quality_threshold = get_env_float("OPENAI_SPECULATIVE_QUALITY_THRESHOLD", 14)
+_tmdb_alternative_titles = get_env_int("TMDB_ALTERNATIVE_TITLES", 3)
+_alternative_titles_executor: Optional[ThreadPoolExecutor] = None
+_alternative_titles_executor_lock = threading.Lock()
+
+# What each TMDB/OpenAI step writes into the media (see PipelineHandler.reads/writes).
+_TMDB_DETAILS_FIELDS = frozenset({
+    "title",
+    "original_title",
+    "searchable_reference",
+    "tmdb_id",
+    "tmdb_series_id",
+    "overview",
+    "year",
+    "media_type",
+    "original_language",
+    "genres",
+    "used_tmdb",
+})
+_EXTERNAL_ID_FIELDS = frozenset({
+    "imdb_id",
+    "tvdb_id",
+    "tvrage_id",
+    "wikidata_id",
+    "facebook_id",
+    "instagram_id",
+    "twitter_id",
+})
+_EPISODE_FIELDS = frozenset({
+    "episode_title",
+    "season",
+    "episode",
+    "media_type",
+    "tmdb_id",
+    "tmdb_series_id",
+    "overview",
+    "year",
+})
 
 
 class CacheLookupHandler(PipelineHandler):
@@ -36,7 +88,7 @@ class CacheLookupHandler(PipelineHandler):
             return False
         if context.media.get("title") is None:
             return False
-        if not is_media_type_valid(context.media.get("media_type")):
+        if not context.has_media_type:
             return False
         return True
 
@@ -59,6 +111,84 @@ class CacheLookupHandler(PipelineHandler):
         return StepResult.success(f"No cache entry during {self.label}")
 
 
+class SingleFlightHandler(PipelineHandler):
+    """
+    Makes concurrent requests for the same media share one pipeline run.
+
+    The first request with a given identification key carries on (and, with a lock repository, also takes a
+    cross-worker advisory lock and re-checks the cache). The others wait for its outcome instead of calling
+    TMDB/OpenAI themselves. The leader's result is published by MediaIdentifier once it is persisted.
+    """
+    name = "single_flight"
+
+    def handles(self, context: PipelineContext) -> bool:
+        if context.completed:
+            return False
+        if context.single_flight_lease is not None:
+            return False
+        if not context.has_media_type:
+            return False
+        # Building the key normalizes the title, so that's left to `invoke`; here it's enough to have a title.
+        return bool(context.media.get("searchable_reference") or context.media.get("title"))
+
+    @_logger.trace("SingleFlightHandler.invoke")
+    def invoke(self, context: PipelineContext) -> StepResult:
+        key = build_identification_key(context.media)
+        if key is None:
+            return StepResult.skip("No identification key for this media.")
+
+        lease = get_single_flight("identification").join(key)
+
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.set_attributes({
+                "pipeline.handler": self.name,
+                "single_flight.leader": lease.is_leader,
+            })
+
+        if lease.is_leader:
+            context.single_flight_lease = lease
+            return self._lead(context, key)
+
+        try:
+            shared = lease.wait(remaining_budget(_single_flight_wait_seconds))
+        except SingleFlightTimeoutError:
+            context.logger.warning(f"[{self.name}] Gave up waiting for the in-flight request; running the pipeline.")
+            return StepResult.success("Single-flight wait timed out.")
+        except Exception as exc:  # noqa: BLE001
+            return StepResult.fatal(f"[{self.name}] The in-flight request for the same media failed: {exc}", exc)
+
+        if shared is None:
+            context.logger.debug(f"[{self.name}] The in-flight request found nothing; running the pipeline.")
+            return StepResult.success("Single-flight leader returned no media.")
+
+        context.logger.debug(f"[{self.name}] Reusing the result of the in-flight request.")
+        context.mark_cached_result(dict(shared))
+        return StepResult.done("Result shared by an in-flight request.")
+
+    def _lead(self, context: PipelineContext, key: tuple) -> StepResult:
+        if context.lock_repository is None:
+            return StepResult.success("Leading the in-process flight.")
+
+        lock_wait = remaining_budget(_single_flight_wait_seconds)
+        if lock_wait <= 0:
+            return StepResult.success("No time left to wait for the cross-worker lock; carrying on without it.")
+
+        lock_name = "media_identification:" + "|".join(str(part) for part in key)
+        context.advisory_lock = context.lock_repository.acquire(lock_name, lock_wait)
+        if context.advisory_lock is None:
+            return StepResult.success("Cross-worker lock not acquired; carrying on without it.")
+
+        # Another worker may have finished the same media while we waited for the lock.
+        cached = context.cache_repository.get_cached_by_obj(context.media)
+        if cached:
+            context.logger.debug(f"[{self.name}] Another worker cached this media while we waited.")
+            context.mark_cached_result(cached)
+            return StepResult.done("Cache hit after acquiring the cross-worker lock.")
+
+        return StepResult.success("Leading the cross-worker flight.")
+
+
 class GuessItIdentificationHandler(PipelineHandler):
     name = "guessit_identification"
 
@@ -99,7 +229,7 @@ class OpenAIBasicIdentificationHandler(PipelineHandler):
             return False
         if context.media is None:
             return True
-        if context.media.get("title") and is_media_type_valid(context.media.get("media_type")):
+        if context.media.get("title") and context.has_media_type:
             return False
         return True
 
@@ -124,11 +254,93 @@ class OpenAIBasicIdentificationHandler(PipelineHandler):
         return StepResult.success()
 
 
+class SpeculativeOpenAIIdentificationHandler(PipelineHandler):
+    """
+    When the title GuessIt picked looks weak (its quality score is below OPENAI_SPECULATIVE_QUALITY_THRESHOLD),
+    searches TMDB for it and, at the same time, asks OpenAI for the title and searches TMDB for that one. The first
+    search that finds a match wins, instead of waiting for the GuessIt search to fail before trying anything else.
+
+    Runs on the request's thread (it doesn't declare reads/writes), so it can wait on the step threads.
+    """
+    name = "speculative_openai_identification"
+
+    def handles(self, context: PipelineContext) -> bool:
+        if not _speculative_openai_enabled:
+            return False
+        if context.mode != RequestMode.FILENAME:
+            return False
+        if context.completed or not context.file_path or context.media is None:
+            return False
+        if not context.media.get("used_guessit") or context.media.get("used_openai"):
+            return False
+        if context.media.get("tmdb_id") or context.media.get("tmdb_series_id"):
+            return False
+        if not context.media.get("title") or context.normalized_media_type not in (MOVIE, TV):
+            return False
+        return guessit_metadata_quality(context.media) < _speculative_openai_quality_threshold
+
+    @_logger.trace("SpeculativeOpenAIIdentificationHandler.invoke")
+    def invoke(self, context: PipelineContext) -> StepResult:
+        guessit_media = dict(context.media)
+        file_path = context.file_path
+        winner, outcome = first_successful(
+            get_step_executor(),
+            [
+                lambda: _tmdb_identify_by_title(guessit_media),
+                lambda: _tmdb_identify_by_title(_openai_identify(guessit_media, file_path)),
+            ],
+            is_success=lambda result: result[1],
+        )
+
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.set_attributes({
+                "pipeline.handler": self.name,
+                "media.file_path": file_path,
+                "speculative.winner": {0: "guessit", 1: "openai"}.get(winner, "none"),
+            })
+
+        if winner is None:
+            # Weak GuessIt titles are what the other titles in the path are for.
+            media_type = context.normalized_media_type
+            identify = tmdb_identify_movie_by_id if media_type == MOVIE else tmdb_identify_series_by_title_and_id
+            media_data, success = _identify_with_guessit_alternatives(context, media_type, identify)
+            if not success or media_data is None:
+                message = f"[{self.name}] Neither the GuessIt, the OpenAI nor any other title in the path matched on TMDB."
+                context.logger.debug(message)
+                return StepResult.fatal(message)
+
+            context.update_media(media_data)
+            context.logger.debug(f"[{self.name}] TMDB match found with another GuessIt title in the path.")
+            return StepResult.success()
+
+        context.update_media(outcome[0])
+        context.logger.debug(f"[{self.name}] TMDB match found with the {'GuessIt' if winner == 0 else 'OpenAI'} title.")
+        return StepResult.success()
+
+
+def _openai_identify(media: dict, file_path: str) -> Optional[dict]:
+    media_data, success = openai_run_basic_identification_by_filename(media, file_path=file_path)
+    return media_data if success else None
+
+
+def _tmdb_identify_by_title(media: Optional[dict]) -> Tuple[Optional[dict], bool]:
+    media_type = normalize_media_type(media.get("media_type")) if media else None
+    if media_type == MOVIE:
+        return tmdb_identify_movie_by_id(media)
+    if media_type == TV:
+        return tmdb_identify_series_by_title_and_id(media)
+    return media, False
+
+
 class OpenAISeriesSeasonEpisodeHandler(PipelineHandler):
     name = "openai_series_season_episode"
+    reads = frozenset({"media_type", "season", "episode", "tmdb_id"})
+    writes = frozenset({"season", "episode", "used_openai"})
+    media_types = frozenset({TV})
 
     def handles(self, context: PipelineContext) -> bool:
-        if not is_tv(context.media_type):
+        if context.normalized_media_type != TV:
             return False
         if context.media is None:
             return False
@@ -161,9 +373,12 @@ class OpenAISeriesSeasonEpisodeHandler(PipelineHandler):
 
 class TMDBIdentifyMovieHandler(PipelineHandler):
     name = "tmdb_identify_movie"
+    reads = frozenset({"media_type", "title", "year", "tmdb_id"})
+    writes = _TMDB_DETAILS_FIELDS
+    media_types = frozenset({MOVIE})
 
     def handles(self, context: PipelineContext) -> bool:
-        if not is_movie(context.media_type):
+        if context.normalized_media_type != MOVIE:
             return False
         if context.media is None:
             return False
@@ -180,6 +395,8 @@ class TMDBIdentifyMovieHandler(PipelineHandler):
                 "media.title": context.media.get("title"),
             })
         media_data, success = tmdb_identify_movie_by_id(context.media)
+        if not success or media_data is None:
+            media_data, success = _identify_with_guessit_alternatives(context, MOVIE, tmdb_identify_movie_by_id)
         if not success or media_data is None:
             message = "[tmdb_identify_movie] Failed to identify movie via TMDB."
             context.logger.debug(message)
@@ -190,11 +407,91 @@ class TMDBIdentifyMovieHandler(PipelineHandler):
         return StepResult.success()
 
 
+def _identify_with_guessit_alternatives(context: PipelineContext, media_type: str, identify) -> Tuple[Optional[dict], bool]:
+    """
+    When TMDB has nothing for the title GuessIt picked, searches it for the next-best ones GuessIt found in the path
+    (up to TMDB_ALTERNATIVE_TITLES, plus the file name parsed on its own), all at once, and returns the first match.
+    """
+    if _tmdb_alternative_titles < 1 or context.mode != RequestMode.FILENAME or not context.file_path:
+        return None, False
+
+    tried = {(str(context.media.get("title")).lower(), context.media.get("year"))}
+    alternatives = []
+    for alternative in identify_media_candidates_with_guess_it(context.file_path, _tmdb_alternative_titles + 1):
+        key = (str(alternative.get("title")).lower(), alternative.get("year"))
+        if key in tried or normalize_media_type(alternative.get("media_type")) != media_type:
+            continue
+
+        tried.add(key)
+        # The year belongs to the title it was found with; season and episode are kept unless this one has its own.
+        alternatives.append({
+            **context.media,
+            "title": alternative.get("title"),
+            "searchable_reference": alternative.get("searchable_reference"),
+            "year": alternative.get("year"),
+            "season": alternative.get("season") or context.media.get("season"),
+            "episode": alternative.get("episode") or context.media.get("episode"),
+        })
+
+    span = trace.get_current_span()
+    if span.is_recording():
+        span.set_attribute("tmdb.alternative_titles", len(alternatives))
+
+    if not alternatives:
+        return None, False
+
+    context.logger.debug(f"Trying {len(alternatives)} other GuessIt titles on TMDB for [{context.file_path}].")
+    winner, outcome = first_successful(
+        get_alternative_titles_executor(),
+        [functools.partial(identify, alternative) for alternative in alternatives],
+        is_success=lambda result: result[1] and result[0] is not None,
+    )
+
+    if winner is None:
+        return None, False
+
+    context.logger.debug(f"TMDB matched the GuessIt title [{alternatives[winner].get('title')}].")
+    return outcome
+
+
+def get_alternative_titles_executor() -> ThreadPoolExecutor:
+    """
+    Threads shared by every request for the searches of alternative titles. Kept apart from the step threads: the
+    search may start from a step thread, which must not wait on other step threads.
+    """
+    global _alternative_titles_executor
+
+    if _alternative_titles_executor is not None:
+        return _alternative_titles_executor
+
+    with _alternative_titles_executor_lock:
+        if _alternative_titles_executor is None:
+            _alternative_titles_executor = ThreadPoolExecutor(
+                max_workers=get_env_int("TMDB_ALTERNATIVE_TITLES_MAX_WORKERS", 8),
+                thread_name_prefix="tmdb-alternatives",
+            )
+
+    return _alternative_titles_executor
+
+
+def close_alternative_titles_executor() -> None:
+    global _alternative_titles_executor
+
+    with _alternative_titles_executor_lock:
+        if _alternative_titles_executor is not None:
+            _alternative_titles_executor.shutdown(wait=True)
+            _alternative_titles_executor = None
+
+
 class TMDBMovieExternalIdsHandler(PipelineHandler):
     name = "tmdb_movie_external_ids"
+    reads = frozenset({"media_type", "tmdb_id"})
+    writes = _EXTERNAL_ID_FIELDS
+    media_types = frozenset({MOVIE})
+    optional = True
 
     def handles(self, context: PipelineContext) -> bool:
-        if not is_movie(context.media_type):
+        if context.normalized_media_type != MOVIE:
             return False
         if context.media is None:
             return False
@@ -222,9 +519,13 @@ class TMDBMovieExternalIdsHandler(PipelineHandler):
 
 class TMDBIdentifySeriesHandler(PipelineHandler):
     name = "tmdb_identify_series"
+    reads = frozenset({"media_type", "title", "year", "tmdb_series_id"})
+    # Season and episode change when an alternative GuessIt identification is the one that matches.
+    writes = _TMDB_DETAILS_FIELDS | {"season", "episode"}
+    media_types = frozenset({TV})
 
     def handles(self, context: PipelineContext) -> bool:
-        if not is_tv(context.media_type):
+        if context.normalized_media_type != TV:
             return False
         if context.media is None:
             return False
@@ -241,6 +542,9 @@ class TMDBIdentifySeriesHandler(PipelineHandler):
                 "media.title": context.media.get("title"),
             })
         media_data, success = tmdb_identify_series_by_title_and_id(context.media)
+        if not success or media_data is None:
+            media_data, success = _identify_with_guessit_alternatives(
+                context, TV, tmdb_identify_series_by_title_and_id)
         if not success or media_data is None:
             message = "[tmdb_identify_series] Failed to identify series via TMDB."
             context.logger.debug(message)
@@ -253,9 +557,13 @@ class TMDBIdentifySeriesHandler(PipelineHandler):
 
 class TMDBSeriesExternalIdsHandler(PipelineHandler):
     name = "tmdb_series_external_ids"
+    reads = frozenset({"media_type", "tmdb_id"})
+    writes = _EXTERNAL_ID_FIELDS
+    media_types = frozenset({TV})
+    optional = True
 
     def handles(self, context: PipelineContext) -> bool:
-        if not is_tv(context.media_type):
+        if context.normalized_media_type != TV:
             return False
         if context.media is None:
             return False
@@ -283,17 +591,24 @@ class TMDBSeriesExternalIdsHandler(PipelineHandler):
 
 class TMDBEpisodeDetailsHandler(PipelineHandler):
     name = "tmdb_episode_details"
+    # The season prefetch caches every episode with the series' external IDs, so it has to wait for them.
+    reads = frozenset({"media_type", "season", "episode", "tmdb_id", "tmdb_series_id"}) | _EXTERNAL_ID_FIELDS
+    writes = _EPISODE_FIELDS
+    media_types = frozenset({TV})
+    optional = True
 
     def handles(self, context: PipelineContext) -> bool:
         if context.media_type != "tv":
             return False
         if context.media is None:
             return False
-        if context.media.get("tmdb_id"):
-            return False
         season = context.media.get("season")
         episode = context.media.get("episode")
         tmdb_series_id = context.media.get("tmdb_series_id")
+        tmdb_id = context.media.get("tmdb_id")
+        # Until this step runs, tmdb_id holds the series id. A different value means we already have the episode.
+        if tmdb_id and tmdb_id != tmdb_series_id:
+            return False
         return tmdb_series_id is not None and season is not None and episode is not None
 
     @_logger.trace("TMDBEpisodeDetailsHandler.invoke")
@@ -306,7 +621,14 @@ class TMDBEpisodeDetailsHandler(PipelineHandler):
                 "media.season": context.media.get("season"),
                 "media.episode": context.media.get("episode"),
             })
-        media_data, success = tmdb_get_episode_details(context.media, success=True)
+        if _season_prefetch_enabled:
+            media_data, success = tmdb_get_episode_details_from_season(
+                context.media,
+                success=True,
+                cache_repository=context.cache_repository,
+            )
+        else:
+            media_data, success = tmdb_get_episode_details(context.media, success=True)
         if not success or media_data is None:
             context.logger.debug("[tmdb_episode_details] Unable to fetch episode details.")
             return StepResult.skip("Episode details not available.")
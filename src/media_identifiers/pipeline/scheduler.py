@@ -0,0 +1,176 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Sequence, Tuple
+
+from opentelemetry import trace
+
+from src.media_identifiers.pipeline.base import (
+    PipelineContext,
+    PipelineController,
+    PipelineExecutionError,
+    PipelineHandler,
+    PipelinePlan,
+    PipelineResult,
+    StepResult,
+    StepStatus,
+)
+from src.utils import get_env_int, get_otel_log_handler, submit_with_context
+
+
+_logger = get_otel_log_handler("PipelineScheduler")
+_step_executor: Optional[ThreadPoolExecutor] = None
+_step_executor_lock = threading.Lock()
+_SKIPPED = (None, None, None)
+
+
+class DagPipelineController(PipelineController):
+    """
+    Runs the same handlers as PipelineController, but lets steps that don't depend on each other run at once
+    (e.g. a series' external IDs and the episode details, which both only need the series id).
+
+    A step depends on every earlier step that writes a field it reads, and starts as soon as those are merged.
+    It runs on a fork of the context, and forks are merged back in handler order, so the outcome is the same as
+    running the list in order. Steps that don't declare `reads`/`writes` run alone, on the context itself, once
+    everything before them is merged.
+    """
+    @_logger.trace("DagPipelineController.run")
+    def run(self, context: PipelineContext) -> PipelineResult:
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.set_attribute("pipeline.handler_count", len(self.handlers))
+
+        handlers = self.handlers
+        dependencies = handlers.dependencies
+        started: Dict[int, Tuple[Optional[Future], PipelineContext, Optional[dict]]] = {}
+        next_to_merge = 0
+        try:
+            while next_to_merge < len(handlers):
+                self._start_ready_steps(context, handlers, dependencies, started, next_to_merge)
+
+                future, forked, forked_from = started.pop(next_to_merge)
+                handler = handlers[next_to_merge]
+                next_to_merge += 1
+                if forked is None:
+                    # Didn't apply to the request.
+                    continue
+
+                result = self._get_step_result(context, handler, future)
+                if forked is not context:
+                    changes = context.merge_fork(forked, forked_from)
+                    self._warn_about_undeclared_writes(handler, changes)
+
+                if result.status in (StepStatus.SKIP, StepStatus.SUCCESS):
+                    continue
+
+                if result.status == StepStatus.DONE:
+                    context.completed = True
+                    return context.finalize()
+
+                if result.status == StepStatus.FATAL:
+                    error = result.error or RuntimeError(result.message or "Pipeline handler failed.")
+                    context.record_error(error)
+                    raise PipelineExecutionError(result.message or "Pipeline handler failed.") from error
+
+            return context.finalize()
+        finally:
+            # Steps started ahead of a step that ended the pipeline. Their results are dropped.
+            for future, _, _ in started.values():
+                if future is not None:
+                    future.cancel()
+
+    def _start_ready_steps(
+            self,
+            context: PipelineContext,
+            handlers: PipelinePlan,
+            dependencies: Sequence[Sequence[int]],
+            started: dict,
+            next_to_merge: int) -> None:
+        to_fork = []
+        found_ready = True
+        while found_ready:
+            found_ready = False
+            for index in range(next_to_merge, len(handlers)):
+                if index in started or index in to_fork:
+                    continue
+                # Steps that don't apply change nothing, so nobody has to wait for them.
+                if not all(dependency < next_to_merge or started.get(dependency) is _SKIPPED
+                           for dependency in dependencies[index]):
+                    continue
+
+                found_ready = True
+                handler = handlers[index]
+                # Everything the step reads is already merged, so `handles` sees what it would see in order.
+                if (not handlers.applies(index, context.normalized_media_type)
+                        or not handler.handles(context)
+                        or self._skip_for_budget(context, handler)):
+                    started[index] = _SKIPPED
+                elif handler.is_barrier:
+                    # Only ready once every earlier step is merged (or skipped): it runs on the context itself.
+                    started[index] = (None, context, None)
+                else:
+                    to_fork.append(index)
+
+        to_fork.sort()
+        forks = {index: context.fork() for index in to_fork}
+        forked_from = dict(context.media) if context.media is not None else None
+        for index in to_fork[1:]:
+            future = submit_with_context(get_step_executor(), handlers[index].invoke, forks[index])
+            started[index] = (future, forks[index], forked_from)
+
+        if to_fork:
+            # The first one is merged first anyway: run it here, while the others run on the step threads.
+            first = to_fork[0]
+            started[first] = (_run_now(handlers[first], forks[first]), forks[first], forked_from)
+
+    def _get_step_result(self, context: PipelineContext, handler: PipelineHandler, future: Optional[Future]) -> StepResult:
+        handler_name = getattr(handler, "name", handler.__class__.__name__)
+        try:
+            return future.result() if future is not None else handler.invoke(context)
+        except Exception as exc:  # noqa: BLE001
+            context.record_error(exc)
+            self.logger.error(f"[{handler_name}] raised unhandled error: {exc}")
+            raise PipelineExecutionError(
+                f"Handler '{handler_name}' execution failed: {exc}"
+            ) from exc
+
+    def _warn_about_undeclared_writes(self, handler: PipelineHandler, changes: dict) -> None:
+        undeclared = set(changes) - handler.writes
+        if undeclared:
+            self.logger.warning(
+                f"[{handler.name}] changed fields it doesn't declare in `writes`: {sorted(undeclared)}. "
+                f"Steps that read them may have run too early.")
+
+
+def _run_now(handler: PipelineHandler, forked: PipelineContext) -> Future:
+    future = Future()
+    try:
+        future.set_result(handler.invoke(forked))
+    except Exception as exc:  # noqa: BLE001
+        future.set_exception(exc)
+    return future
+
+
+def get_step_executor() -> ThreadPoolExecutor:
+    """Threads for the steps that run alongside the one running on the request's own thread."""
+    global _step_executor
+
+    if _step_executor is not None:
+        return _step_executor
+
+    with _step_executor_lock:
+        if _step_executor is None:
+            _step_executor = ThreadPoolExecutor(
+                max_workers=get_env_int("PIPELINE_STEP_MAX_WORKERS", 8),
+                thread_name_prefix="pipeline-step",
+            )
+
+    return _step_executor
+
+
+def close_step_executor() -> None:
+    global _step_executor
+
+    with _step_executor_lock:
+        if _step_executor is not None:
+            _step_executor.shutdown(wait=True)
+            _step_executor = None
@@ -0,0 +1,99 @@
+import hashlib
+import inspect
+import json
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.utils import get_otel_log_handler
+
+_logger = get_otel_log_handler("PromptRegistry")
+_prompt_registry: Optional["PromptRegistry"] = None
+_prompt_registry_lock = threading.Lock()
+
+SYSTEM_INSTRUCTIONS = """You are an AI that implements Python functions as described in code comments.
+Only respond to the user's request by executing the function as described, strictly following the output format specified in the comments.
+This is very important: you are forbidden from adding explanations, rephrasing, adding context, adding code blocks, or adding any extra text—output only the function result, as defined.
+Think step by step and double-check your answer before responding, especially when the input is ambiguous or tricky.
+You are forbidden from guessing, inferring, or deducing information that is not explicitly present in the user input or function comments."""
+
+_INPUT_SUFFIX = "\n```"
+
+
+@dataclass(frozen=True)
+class RenderedPrompt:
+    """
+    An AI function rendered once into a constant prefix. Only the filename changes between calls, and it goes last,
+    so every call with the same function shares a byte-identical prefix the provider can cache.
+
+    The version changes with anything that can change the answer: instructions, function source, model and
+    structured-output format.
+    """
+    name: str
+    prefix: str
+    version: str
+    response_format: Optional[dict] = None
+
+    def build_input(self, file_path: str) -> str:
+        return f"{self.prefix}{file_path}{_INPUT_SUFFIX}"
+
+
+class PromptRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._prompts: Dict[Tuple[str, str], RenderedPrompt] = {}
+
+    def get(self, ai_function, model: str, response_format: Optional[dict] = None) -> RenderedPrompt:
+        """The prompt of `ai_function` for `model`. A function is always asked with the same `response_format`."""
+        key = (_prompt_name(ai_function), model)
+
+        prompt = self._prompts.get(key)
+        if prompt is not None:
+            return prompt
+
+        with self._lock:
+            prompt = self._prompts.get(key)
+            if prompt is None:
+                prompt = _render(key[0], ai_function, model, response_format)
+                self._prompts[key] = prompt
+                _logger.debug(f"Prompt [{key[0]}] rendered for [{model}]. Version: {prompt.version}")
+
+        return prompt
+
+    def register_all(self, ai_functions: Iterable, model: str) -> None:
+        for ai_function in ai_functions:
+            self.get(ai_function, model)
+
+
+def _prompt_name(ai_function) -> str:
+    # AI functions are passed either as functions or as their whole module.
+    return ai_function.__name__.rsplit(".", 1)[-1]
+
+
+def _render(name: str, ai_function, model: str, response_format: Optional[dict]) -> RenderedPrompt:
+    prefix = f"""Output only the result as specified in the function comments below.
+Function code:
+```python
+{inspect.getsource(ai_function)}
+```
+Input:
+```plaintext
+"""
+    # The instructions are part of the cached prefix too, so they are part of the version. So are the model and the
+    # output schema: answers of another model, or for another schema, must not be served from the extraction cache.
+    schema = json.dumps(response_format, sort_keys=True) if response_format else ""
+    version = hashlib.sha256(f"{SYSTEM_INSTRUCTIONS}\0{model}\0{schema}\0{prefix}".encode("utf-8")).hexdigest()[:12]
+    return RenderedPrompt(name=name, prefix=prefix, version=version, response_format=response_format)
+
+
+def get_prompt_registry() -> PromptRegistry:
+    global _prompt_registry
+
+    if _prompt_registry is not None:
+        return _prompt_registry
+
+    with _prompt_registry_lock:
+        if _prompt_registry is None:
+            _prompt_registry = PromptRegistry()
+
+    return _prompt_registry
@@ -0,0 +1,108 @@
+import asyncio
+from concurrent.futures import Future
+from typing import AsyncIterator, Awaitable, Callable, Optional, Set
+
+from src.media_identifiers.batch_identifier import build_identification_result
+from src.utils import get_otel_log_handler
+from src.worker_pool import WorkerPoolSaturatedError
+
+
+_logger = get_otel_log_handler("StreamIdentifier")
+
+
+class LineTooLongError(ValueError):
+    pass
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_length: int) -> AsyncIterator[str]:
+    """
+    Splits a byte stream into stripped, non-empty lines (LF or CRLF). Only the current partial line is buffered,
+    so a line longer than `max_line_length` bytes stops the stream instead of growing the buffer.
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            text = line.decode("utf-8", errors="replace").strip()
+            if text:
+                yield text
+
+        if len(buffer) > max_line_length:
+            raise LineTooLongError(f"A line is longer than {max_line_length} bytes.")
+
+    text = buffer.decode("utf-8", errors="replace").strip()
+    if text:
+        yield text
+
+
+async def identify_stream(
+        file_paths: AsyncIterator[str],
+        identify: Callable[[str], Optional[dict]],
+        max_in_flight: int,
+        submit: Callable[..., Future]) -> AsyncIterator[dict]:
+    """
+    Identifies the paths as they arrive and yields each result as soon as it's ready, so results come out of
+    order (see their `index`).
+
+    Identifications are handed to `submit` (the pipeline worker pool's, so streams share its limits with every
+    other request). When the pool is saturated, the stream waits for one of its own identifications to finish and
+    tries again; with none running, that path gets a 503 result.
+
+    Nothing is read ahead: the next path is only taken once fewer than `max_in_flight` identifications are running,
+    and the generator only runs when the consumer asks for a result. A slow client slows down the reading of its own
+    input, and memory stays the same whatever the size of the input.
+    """
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be at least 1.")
+
+    pending: Set[asyncio.Future] = set()
+    try:
+        index = 0
+        async for file_path in file_paths:
+            while len(pending) >= max_in_flight:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+
+            while True:
+                try:
+                    pending.add(asyncio.ensure_future(_identify_one(submit, identify, index, file_path)))
+                    break
+                except WorkerPoolSaturatedError as exc:
+                    if not pending:
+                        yield build_identification_result(index, file_path, None, str(exc), status_code=503)
+                        break
+
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+            index += 1
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        # The client may have gone away mid-stream. Identifications already running finish in the background
+        # (their results are cached); cancelling the rest drops the ones still queued in the pool.
+        for task in pending:
+            task.cancel()
+
+
+def _identify_one(
+        submit: Callable[..., Future],
+        identify: Callable[[str], Optional[dict]],
+        index: int,
+        file_path: str) -> Awaitable[dict]:
+    # Submitted right away, so a saturated pool is known before the path is counted as in flight.
+    future = asyncio.wrap_future(submit(identify, file_path))
+
+    async def wait_for_result() -> dict:
+        try:
+            return build_identification_result(index, file_path, await future, None)
+        except Exception as exc:  # noqa: BLE001
+            _logger.error(f"Error identifying [{file_path}] in a stream: {exc}")
+            return build_identification_result(index, file_path, None, str(exc))
+
+    return wait_for_result()
@@ -0,0 +1,188 @@
+import importlib.util
+import os
+import threading
+from datetime import datetime, UTC
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
+from opentelemetry import trace
+
+from src.deadline import check_deadline, remaining_budget
+from src.rate_limiter import SharedWindowRateLimiter, TokenBucketRateLimiter
+from src.utils import get_env_float, get_env_int, get_otel_log_handler
+
+_logger = get_otel_log_handler("TMDBClient")
+_tmdb_client: Optional["TMDBClient"] = None
+_tmdb_client_lock = threading.Lock()
+_RATE_LIMITER_NAME = "tmdb"
+
+
+class TMDBClient:
+    """
+    Shared HTTP client for the TMDB API.
+
+    Keeps a pool of keep-alive connections to api.themoviedb.org, so only the first call of a worker pays
+    for the TCP+TLS handshake. Uses HTTP/2 (one multiplexed connection) when the `h2` package is installed.
+    The underlying httpx.Client is thread-safe, so every pipeline worker thread shares the same pool.
+
+    Every call first takes a slot from the rate limiter. When TMDB still answers 429, the limiter is paused
+    for the Retry-After period and the call is retried, as long as the wait fits in the limiter deadline.
+
+    Inside a request with a latency budget (see src.deadline), the limiter wait, the HTTP timeout and the 429
+    retries are all capped by the time the request has left.
+    """
+    def __init__(
+            self,
+            rate_limiter,
+            max_connections: int,
+            max_keepalive_connections: int,
+            keepalive_expiry: float,
+            timeout: float,
+            rate_limit_max_wait: float,
+            max_retries: int,
+            default_retry_after: float):
+        self._rate_limiter = rate_limiter
+        self._timeout = timeout
+        self._rate_limit_max_wait = rate_limit_max_wait
+        self._max_retries = max_retries
+        self._default_retry_after = default_retry_after
+        self._http2 = _is_http2_available()
+        self._client = httpx.Client(
+            http2=self._http2,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+
+        _logger.debug(
+            f"TMDB client created. HTTP/2: {self._http2}, Max connections: {max_connections}, "
+            f"Max keep-alive connections: {max_keepalive_connections}"
+        )
+
+    @property
+    def uses_http2(self) -> bool:
+        return self._http2
+
+    @property
+    def rate_limiter(self):
+        return self._rate_limiter
+
+    def get(self, url: str, params: Dict[str, Any], headers: Dict[str, str]) -> httpx.Response:
+        span = trace.get_current_span()
+        retries = 0
+
+        while True:
+            check_deadline("a TMDB call")
+            waited = self._rate_limiter.acquire(remaining_budget(self._rate_limit_max_wait))
+            if span.is_recording():
+                span.set_attribute("tmdb.rate_limiter.wait_seconds", waited)
+
+            response = self._client.get(url, params=params, headers=headers, timeout=remaining_budget(self._timeout))
+
+            if response.status_code != 429 or retries >= self._max_retries:
+                return response
+
+            retry_after = _parse_retry_after(response.headers.get("Retry-After"), self._default_retry_after)
+            if retry_after >= remaining_budget(float("inf")):
+                _logger.warning(f"TMDB API rate limit exceeded. Not retrying: {retry_after:.2f}s is past the request deadline.")
+                return response
+
+            retries += 1
+            _logger.warning(f"TMDB API rate limit exceeded. Retry {retries}/{self._max_retries} after {retry_after:.2f}s.")
+            self._rate_limiter.pause_for(retry_after)
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def _is_http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _parse_retry_after(value: Optional[str], default: float) -> float:
+    """Reads a Retry-After header, which is either a number of seconds or an HTTP date."""
+    if value is None or value.strip() == "":
+        return default
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+
+    return max(0.0, (retry_at - datetime.now(UTC)).total_seconds())
+
+
+def _create_tmdb_rate_limiter():
+    rate_per_second = get_env_float("TMDB_RATE_LIMIT_PER_SECOND", 40)
+    backend = os.environ.get("TMDB_RATE_LIMIT_BACKEND", "memory").strip().lower()
+
+    if backend == "postgres":
+        # Imported here so the in-memory backend doesn't need a database.
+        from src.repositories.repository_factory import get_repository
+
+        return SharedWindowRateLimiter(
+            get_repository("rate_limit"),
+            limit_per_second=int(rate_per_second),
+            name=_RATE_LIMITER_NAME,
+        )
+
+    if backend != "memory":
+        raise ValueError(f"TMDB_RATE_LIMIT_BACKEND must be 'memory' or 'postgres'. Got: [{backend}]")
+
+    return TokenBucketRateLimiter(
+        rate_per_second=rate_per_second,
+        burst=get_env_int("TMDB_RATE_LIMIT_BURST", 20),
+        name=_RATE_LIMITER_NAME,
+    )
+
+
+def get_tmdb_client() -> TMDBClient:
+    global _tmdb_client
+
+    if _tmdb_client is not None:
+        return _tmdb_client
+
+    with _tmdb_client_lock:
+        if _tmdb_client is None:
+            _tmdb_client = TMDBClient(
+                rate_limiter=_create_tmdb_rate_limiter(),
+                max_connections=get_env_int("TMDB_MAX_CONNECTIONS", 20),
+                max_keepalive_connections=get_env_int("TMDB_MAX_KEEPALIVE_CONNECTIONS", 10),
+                keepalive_expiry=get_env_float("TMDB_KEEPALIVE_EXPIRY_SECONDS", 30),
+                timeout=get_env_float("TMDB_TIMEOUT_SECONDS", 10),
+                rate_limit_max_wait=get_env_float("TMDB_RATE_LIMIT_MAX_WAIT_SECONDS", 5),
+                max_retries=get_env_int("TMDB_RATE_LIMIT_MAX_RETRIES", 2),
+                default_retry_after=get_env_float("TMDB_RATE_LIMIT_DEFAULT_RETRY_AFTER_SECONDS", 2),
+            )
+
+    return _tmdb_client
+
+
+def get_tmdb_client_stats() -> dict:
+    return {
+        "http2": get_tmdb_client().uses_http2,
+        "rate_limiter": get_tmdb_client().rate_limiter.stats(),
+    }
+
+
+def close_tmdb_client() -> None:
+    global _tmdb_client
+
+    with _tmdb_client_lock:
+        if _tmdb_client is None:
+            return
+
+        _tmdb_client.close()
+        _tmdb_client = None
@@ -1,11 +1,13 @@
 from opentelemetry import trace
 import os
-import random
-import time
-from typing import Dict, Any, Optional, Union
-import requests
+from typing import Dict, Any, List, Optional, Union
+import httpx
 
+from src.deadline import DeadlineExceededError
 from src.media_identifiers.constants import MOVIE, TV
+from src.media_identifiers.tmdb_client import get_tmdb_client
+from src.media_identifiers.tmdb_response_cache import get_tmdb_response_cache
+from src.rate_limiter import RateLimitExceededError
 from src.media_identifiers.media_type_helpers import normalize_media_type
 from src.models.media_info import MediaInfoBuilder
 from src.utils import is_valid_year, get_otel_log_handler
@@ -77,16 +79,39 @@ def request_tmdb_series_episode_details(tmdb_id: int, season: int, episode: int)
         _logger.warning(f"No details found for TMDB ID: {tmdb_id}")
         return None
 
-    return MediaInfoBuilder() \
-        .with_episode_title(episode_details.get('name')) \
-        .with_episode(episode_details.get('episode_number', episode)) \
-        .with_season(episode_details.get('season_number', season)) \
-        .with_media_type(TV) \
-        .with_tmdb_id(episode_details.get('id')) \
-        .with_tmdb_series_id(tmdb_id) \
-        .with_overview(episode_details.get('overview')) \
-        .with_year(_extract_year_from_tmdb_multi_data(episode_details)) \
-        .build()
+    return _build_episode_record(episode_details, tmdb_id, season, episode)
+
+
+@_logger.trace("request_tmdb_season_details")
+def request_tmdb_season_details(tmdb_id: int, season: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Fetches a whole season in one call and returns one record per episode, shaped like the ones
+    returned by request_tmdb_series_episode_details.
+    """
+    span = trace.get_current_span()
+    if span.is_recording():
+        span.set_attributes({
+            "tmdb.id": tmdb_id,
+            "media.season": season,
+        })
+
+    if not tmdb_id:
+        raise ValueError("TMDB ID must not be None or empty.")
+
+    if not season:
+        raise ValueError("Season number must not be None or empty.")
+
+    season_details = _make_request(f'https://api.themoviedb.org/3/tv/{tmdb_id}/season/{season}')
+
+    if not season_details or not season_details.get('episodes'):
+        _logger.warning(f"No season details found for TMDB ID: {tmdb_id}, Season: {season}")
+        return None
+
+    return [
+        _build_episode_record(episode_details, tmdb_id, season, episode_details.get('episode_number'))
+        for episode_details in season_details['episodes']
+        if episode_details.get('id') and episode_details.get('episode_number') is not None
+    ]
 
 
 @_logger.trace("request_tmdb_external_ids")
@@ -240,14 +265,6 @@ def _prepare_tmdb_parameters(params: Dict[str, Any]) -> Dict[str, Any]:
     return params
 
 
-def _get_debounce_time():
-    base_wait_time = 8
-    min_jitter = 1
-    max_jitter = 3
-    jitter = random.uniform(min_jitter, max_jitter)
-    return base_wait_time + jitter
-
-
 @_logger.trace("_make_request")
 def _make_request(url: str, params: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
     span = trace.get_current_span()
@@ -256,35 +273,46 @@ def _make_request(url: str, params: Dict[str, Any] = None) -> Optional[Dict[str,
     response = None
 
     try:
-        headers = _prepare_tmdb_headers()
         params = _prepare_tmdb_parameters(params)
 
+        response_cache = get_tmdb_response_cache()
+        cached_response = response_cache.get(url, params)
+        if span.is_recording():
+            span.set_attribute("tmdb.response_cache_hit", cached_response is not None)
+
+        if cached_response is not None:
+            _logger.debug(f"TMDB API: Cached response found for url: [{url}] Params: [{params}]")
+            return cached_response
+
+        headers = _prepare_tmdb_headers()
+
         _logger.debug(f"TMDB API: About to make request to url: [{url}] Params: [{params}]")
 
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+        response = get_tmdb_client().get(url, params=params, headers=headers)
 
         _logger.debug(f"TMDB API: Got response [{response.status_code}] Body: [{response.text}]")
 
-        if response.status_code == 429:
-            debounce_time = _get_debounce_time()
+        response.raise_for_status()
 
-            _logger.warning(f"TMDB API rate limit exceeded. Retrying after {debounce_time} seconds.")
-            time.sleep(debounce_time)
+        response_data = response.json()
+        response_cache.set(url, params, response_data)
 
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+        return response_data
 
-        response.raise_for_status()
+    except RateLimitExceededError as e:
+        _logger.error(f"TMDB API request dropped by the rate limiter for url: {url}: {e}")
 
-        return response.json()
+    except DeadlineExceededError as e:
+        _logger.warning(f"TMDB API request skipped for url: {url}: {e}")
 
-    except requests.Timeout:
+    except httpx.TimeoutException:
         _logger.error(f"TMDB API request timed out for url: {url}")
 
-    except requests.HTTPError as e:
+    except httpx.HTTPStatusError as e:
         _logger.error(f"TMDB API HTTP error for url: {url}: {e}")
 
-    except requests.RequestException as e:
-        status_code = response.status_code if response else 'unknown'
+    except httpx.HTTPError as e:
+        status_code = response.status_code if response is not None else 'unknown'
         _logger.error(f"TMDB API request failed with status [{status_code}] for url: [{url}]: {e}")
 
     except ValueError as e:
@@ -304,6 +332,19 @@ def _extract_year_from_tmdb_multi_data(tmdb_multi_data: Dict[str, Any]) -> Optio
     return None
 
 
+def _build_episode_record(episode_details: Dict[str, Any], tmdb_series_id: int, season: int, episode: int) -> Dict[str, Any]:
+    return MediaInfoBuilder() \
+        .with_episode_title(episode_details.get('name')) \
+        .with_episode(episode_details.get('episode_number', episode)) \
+        .with_season(episode_details.get('season_number', season)) \
+        .with_media_type(TV) \
+        .with_tmdb_id(episode_details.get('id')) \
+        .with_tmdb_series_id(tmdb_series_id) \
+        .with_overview(episode_details.get('overview')) \
+        .with_year(_extract_year_from_tmdb_multi_data(episode_details)) \
+        .build()
+
+
 def _get_record_builder_for_tmdb_data(tmdb_data: Dict[str, Any]) -> MediaInfoBuilder:
     return MediaInfoBuilder() \
         .with_title(tmdb_data.get('title', tmdb_data.get('name'))) \
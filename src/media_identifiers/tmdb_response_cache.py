@@ -0,0 +1,168 @@
+import re
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode, urlsplit
+
+from src.memory_cache import TTLLRUCache
+from src.utils import get_env_bool, get_env_float, get_env_int, get_otel_log_handler
+
+_logger = get_otel_log_handler("TMDBResponseCache")
+_tmdb_response_cache: Optional["TMDBResponseCache"] = None
+_tmdb_response_cache_lock = threading.Lock()
+
+_HOUR = 60 * 60
+_DAY = 24 * _HOUR
+
+# Searches can change as TMDB adds titles, so they expire sooner than details, which rarely change.
+_DEFAULT_ENDPOINT_TTLS = {
+    "search": _DAY,
+    "details": 7 * _DAY,
+    "external_ids": 7 * _DAY,
+    "season": _DAY,
+    "episode": 7 * _DAY,
+}
+_SEASON_PATH_RE = re.compile(r"/season/\d+$")
+_EPISODE_PATH_RE = re.compile(r"/season/\d+/episode/\d+$")
+
+
+class TMDBResponseCache:
+    """
+    Caches raw TMDB responses by URL + normalized parameters, with a TTL per endpoint kind.
+
+    The in-memory tier is always on. The persistent tier (Postgres) is optional and lets responses
+    survive restarts and be shared between workers.
+    """
+    def __init__(self, memory_cache: TTLLRUCache, endpoint_ttls: Dict[str, float], persistent_repository=None):
+        self._memory_cache = memory_cache
+        self._endpoint_ttls = endpoint_ttls
+        self._persistent_repository = persistent_repository
+        self._lock = threading.Lock()
+        self._persistent_hits = 0
+        self._persistent_misses = 0
+
+    def get(self, url: str, params: Optional[Dict[str, Any]]) -> Optional[dict]:
+        cache_key = build_cache_key(url, params)
+
+        cached = self._memory_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if self._persistent_repository is None:
+            return None
+
+        cached = self._persistent_repository.get_response(cache_key)
+        with self._lock:
+            if cached is None:
+                self._persistent_misses += 1
+                return None
+            self._persistent_hits += 1
+
+        self._memory_cache.set(cache_key, cached, ttl=self.ttl_for(url))
+        return cached
+
+    def set(self, url: str, params: Optional[Dict[str, Any]], response: dict) -> None:
+        if not response:
+            return
+
+        cache_key = build_cache_key(url, params)
+        ttl = self.ttl_for(url)
+
+        self._memory_cache.set(cache_key, response, ttl=ttl)
+
+        if self._persistent_repository is not None:
+            self._persistent_repository.save_response(cache_key, url, response, ttl)
+
+    def ttl_for(self, url: str) -> float:
+        return self._endpoint_ttls[classify_endpoint(url)]
+
+    def stats(self) -> dict:
+        with self._lock:
+            persistent = {
+                "enabled": self._persistent_repository is not None,
+                "hits": self._persistent_hits,
+                "misses": self._persistent_misses,
+            }
+
+        return {
+            "memory": self._memory_cache.stats(),
+            "persistent": persistent,
+        }
+
+
+def classify_endpoint(url: str) -> str:
+    path = urlsplit(url).path.rstrip("/")
+
+    if "/search/" in path:
+        return "search"
+
+    if path.endswith("/external_ids"):
+        return "external_ids"
+
+    if _EPISODE_PATH_RE.search(path):
+        return "episode"
+
+    if _SEASON_PATH_RE.search(path):
+        return "season"
+
+    return "details"
+
+
+def build_cache_key(url: str, params: Optional[Dict[str, Any]]) -> str:
+    """Builds a stable key: parameter order, key case and surrounding spaces don't matter."""
+    normalized_params = sorted(
+        (str(key).strip().lower(), _normalize_param_value(value))
+        for key, value in (params or {}).items()
+        if value is not None
+    )
+
+    base_url = url.strip().rstrip("/")
+    if not normalized_params:
+        return base_url
+
+    return f"{base_url}?{urlencode(normalized_params)}"
+
+
+def _normalize_param_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+
+    return str(value).strip()
+
+
+def get_tmdb_response_cache() -> TMDBResponseCache:
+    global _tmdb_response_cache
+
+    if _tmdb_response_cache is not None:
+        return _tmdb_response_cache
+
+    with _tmdb_response_cache_lock:
+        if _tmdb_response_cache is None:
+            _tmdb_response_cache = _create_tmdb_response_cache()
+
+    return _tmdb_response_cache
+
+
+def _create_tmdb_response_cache() -> TMDBResponseCache:
+    endpoint_ttls = {
+        endpoint: get_env_float(f"TMDB_CACHE_TTL_{endpoint.upper()}_SECONDS", default_ttl)
+        for endpoint, default_ttl in _DEFAULT_ENDPOINT_TTLS.items()
+    }
+
+    persistent_repository = None
+    if get_env_bool("TMDB_RESPONSE_CACHE_PERSISTENT", False):
+        # Imported here so the in-memory only setup doesn't need a database.
+        from src.repositories.repository_factory import get_repository
+
+        persistent_repository = get_repository("tmdb_response_cache")
+
+    _logger.debug(f"TMDB response cache created. Persistent tier: {persistent_repository is not None}")
+
+    return TMDBResponseCache(
+        memory_cache=TTLLRUCache(
+            max_entries=get_env_int("TMDB_RESPONSE_CACHE_MAX_ENTRIES", 2048),
+            default_ttl=None,
+            name="tmdb_responses",
+        ),
+        endpoint_ttls=endpoint_ttls,
+        persistent_repository=persistent_repository,
+    )
@@ -0,0 +1,198 @@
+import math
+import threading
+import time
+from typing import Callable
+
+from src.utils import get_otel_log_handler
+
+_logger = get_otel_log_handler("RateLimiter")
+
+
+class RateLimitExceededError(RuntimeError):
+    pass
+
+
+class _RateLimiterStats:
+    def __init__(self):
+        self.acquired = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record_wait(self, waited: float) -> None:
+        self.acquired += 1
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def to_dict(self) -> dict:
+        return {
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "throttled": self.throttled,
+            "total_wait_seconds": round(self.total_wait_seconds, 3),
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+            "avg_wait_seconds": round(self.total_wait_seconds / self.acquired, 3) if self.acquired else 0.0,
+        }
+
+
+class TokenBucketRateLimiter:
+    """
+    In-process token bucket shared by every thread of the worker.
+
+    Callers reserve a token and sleep until it becomes available. If the wait would exceed the caller's
+    deadline, the call is rejected right away with RateLimitExceededError instead of sleeping.
+    """
+    def __init__(
+            self,
+            rate_per_second: float,
+            burst: int,
+            name: str,
+            clock: Callable[[], float] = time.monotonic,
+            sleep: Callable[[float], None] = time.sleep):
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be greater than zero.")
+
+        if burst < 1:
+            raise ValueError("burst must be at least 1.")
+
+        self._rate = rate_per_second
+        self._burst = burst
+        self._name = name
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._last_refill = clock()
+        self._paused_until = 0.0
+        self._stats = _RateLimiterStats()
+
+    def acquire(self, max_wait: float) -> float:
+        """Takes one token, waiting at most `max_wait` seconds for it. Returns how long it waited."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+
+            # During a pause the bucket doesn't refill, so the callers queued behind it still have to be spaced
+            # out by the rate once it ends instead of all waking up together.
+            wait = max(0.0, self._paused_until - now) + max(0.0, (1 - self._tokens) / self._rate)
+            if wait > max_wait:
+                self._stats.rejected += 1
+                raise RateLimitExceededError(
+                    f"Rate limiter [{self._name}] needs {wait:.2f}s for a slot, but the deadline is {max_wait:.2f}s."
+                )
+
+            # Tokens may go negative: that's the queue of callers that already reserved their slot.
+            self._tokens -= 1
+            self._stats.record_wait(wait)
+
+        if wait > 0:
+            self._sleep(wait)
+
+        return wait
+
+    def pause_for(self, seconds: float) -> None:
+        """Blocks every caller for `seconds` (e.g. the upstream's Retry-After) and drains the bucket."""
+        with self._lock:
+            now = self._clock()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = min(self._tokens, 0.0)
+            self._last_refill = max(self._last_refill, self._paused_until)
+            self._stats.throttled += 1
+
+        _logger.warning(f"Rate limiter [{self._name}] paused for {seconds:.2f}s by upstream.")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self._name,
+                "backend": "memory",
+                "rate_per_second": self._rate,
+                "burst": self._burst,
+                **self._stats.to_dict(),
+            }
+
+    def _refill(self, now: float) -> None:
+        if now <= self._last_refill:
+            return
+
+        elapsed = now - self._last_refill
+        self._tokens = min(float(self._burst), self._tokens + elapsed * self._rate)
+        self._last_refill = now
+
+
+class SharedWindowRateLimiter:
+    """
+    Rate limiter shared by every worker process through a per-second counter in the database.
+
+    Each call increments the counter of the current one-second window. If the window is full, the caller
+    waits for the next one, up to its deadline. Retry-After pauses still apply only to this process.
+    """
+    def __init__(
+            self,
+            repository,
+            limit_per_second: int,
+            name: str,
+            clock: Callable[[], float] = time.time,
+            sleep: Callable[[float], None] = time.sleep):
+        if limit_per_second < 1:
+            raise ValueError("limit_per_second must be at least 1.")
+
+        self._repository = repository
+        self._limit = limit_per_second
+        self._name = name
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self._stats = _RateLimiterStats()
+
+    def acquire(self, max_wait: float) -> float:
+        started = self._clock()
+        deadline = started + max_wait
+
+        with self._lock:
+            paused_until = self._paused_until
+
+        if paused_until > started:
+            self._wait_until(paused_until, deadline, started)
+
+        while True:
+            now = self._clock()
+            window = math.floor(now)
+            count = self._repository.increment_window(self._name, window)
+
+            if count <= self._limit:
+                waited = now - started
+                with self._lock:
+                    self._stats.record_wait(waited)
+                return waited
+
+            self._wait_until(window + 1, deadline, started)
+
+    def pause_for(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+            self._stats.throttled += 1
+
+        _logger.warning(f"Rate limiter [{self._name}] paused for {seconds:.2f}s by upstream.")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self._name,
+                "backend": "postgres",
+                "rate_per_second": self._limit,
+                "burst": self._limit,
+                **self._stats.to_dict(),
+            }
+
+    def _wait_until(self, target: float, deadline: float, started: float) -> None:
+        if target > deadline:
+            with self._lock:
+                self._stats.rejected += 1
+            raise RateLimitExceededError(
+                f"Rate limiter [{self._name}] has no free slot within the {deadline - started:.2f}s deadline."
+            )
+
+        self._sleep(max(0.0, target - self._clock()))
@@ -0,0 +1,88 @@
+from typing import Optional
+
+import psycopg2
+from psycopg2 import errors
+from opentelemetry import trace
+
+from src.repositories.base_repository import BaseRepository
+from src.repositories.connection_pool import BlockingConnectionPool, ConnectionPoolTimeoutError
+from src.utils import get_otel_log_handler
+
+
+_logger = get_otel_log_handler("AdvisoryLockRepository")
+
+
+class AdvisoryLock:
+    def __init__(self, lock_name: str, connection):
+        self.lock_name = lock_name
+        self.connection = connection
+
+
+class AdvisoryLockRepository(BaseRepository):
+    """
+    Session-level Postgres advisory locks, used to coordinate work between API workers.
+
+    A held lock keeps its connection checked out of the pool until it is released, because
+    the lock belongs to that database session. That's why the repository factory gives this
+    repository a pool of its own, separate from the one every other repository shares.
+    """
+    def __init__(self, conn_pool: BlockingConnectionPool, skip_database_initialization: bool = False):
+        # Advisory locks don't need any table, so there is nothing to initialize.
+        super().__init__(conn_pool, _logger)
+
+    @_logger.trace("acquire")
+    def acquire(self, lock_name: str, timeout_seconds: float) -> Optional[AdvisoryLock]:
+        """
+        Waits up to `timeout_seconds` for the lock. Returns None if another session kept it for longer,
+        or if every connection of the lock pool is already holding a lock.
+        """
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.set_attributes({
+                "db.operation": "pg_advisory_lock",
+                "lock.name": lock_name,
+            })
+
+        try:
+            conn = self._conn_pool.getconn(timeout_seconds)
+        except ConnectionPoolTimeoutError:
+            self._logger.warning(f"No connection free to take advisory lock [{lock_name}].")
+            return None
+
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT set_config('lock_timeout', %s, false);", (f"{int(timeout_seconds * 1000)}ms",))
+                cursor.execute("SELECT pg_advisory_lock(hashtextextended(%s, 0));", (lock_name,))
+            conn.commit()
+            return AdvisoryLock(lock_name, conn)
+        except errors.LockNotAvailable:
+            # Rolling back also reverts the lock_timeout set above.
+            conn.rollback()
+            self._conn_pool.putconn(conn)
+            self._logger.warning(f"Timed out waiting for advisory lock [{lock_name}].")
+            return None
+        except psycopg2.Error as e:
+            self._conn_pool.putconn(conn, close=True)
+            error_message = f"Error acquiring advisory lock: {str(e)}"
+            self._logger.error(error_message)
+            raise RuntimeError(error_message) from e
+
+    @_logger.trace("release")
+    def release(self, lock: AdvisoryLock) -> None:
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.set_attributes({
+                "db.operation": "pg_advisory_unlock",
+                "lock.name": lock.lock_name,
+            })
+
+        try:
+            with lock.connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(hashtextextended(%s, 0));", (lock.lock_name,))
+                cursor.execute("SELECT set_config('lock_timeout', '0', false);")
+            lock.connection.commit()
+            self._conn_pool.putconn(lock.connection)
+        except psycopg2.Error as e:
+            # Closing the session is enough to drop the lock, so this is not worth failing the request for.
+            self._logger.error(f"Error releasing advisory lock [{lock.lock_name}]: {str(e)}")
+            self._conn_pool.putconn(lock.connection, close=True)
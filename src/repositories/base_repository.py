@@ -1,10 +1,13 @@
 from contextlib import contextmanager
+from typing import List, Sequence
 
-from psycopg2.pool import SimpleConnectionPool
+from psycopg2 import extensions
+
+from src.repositories.connection_pool import BlockingConnectionPool
 
 
 class BaseRepository:
-    def __init__(self, conn_pool: SimpleConnectionPool, logger):
+    def __init__(self, conn_pool: BlockingConnectionPool, logger):
         self._conn_pool = conn_pool
         self._logger = logger
 
@@ -15,3 +18,13 @@ class BaseRepository:
             yield conn
         finally:
             self._conn_pool.putconn(conn)
+
+    @staticmethod
+    def _values_list(cursor, rows: List[Sequence]) -> str:
+        """
+        Renders rows as the body of a VALUES clause. Used instead of psycopg2's execute_values, which sends its
+        query as bytes: with the SQL commenter enabled, the instrumentation turns them into their repr (b'...').
+        """
+        placeholders = f"({', '.join(['%s'] * len(rows[0]))})"
+        encoding = extensions.encodings[cursor.connection.encoding]
+        return ", ".join(cursor.mogrify(placeholders, row).decode(encoding) for row in rows)
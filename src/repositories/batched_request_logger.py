@@ -0,0 +1,182 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, UTC
+from typing import Dict, List, Optional
+
+from src.repositories.request_logger import RequestLogger
+from src.utils import get_otel_log_handler
+
+
+_logger = get_otel_log_handler("BatchedRequestLogger")
+
+
+class BatchedRequestLogger:
+    """
+    Write-behind front for RequestLogger: `log_start` and `log_completed` only touch memory, and a background
+    thread writes the buffered rows in batches, so request history never adds a database round trip to a request.
+
+    Request ids and timestamps are generated here instead of by the database. The buffer is bounded: under
+    pressure new requests are dropped (and counted) rather than growing memory without limit.
+    """
+    def __init__(
+            self,
+            repository: RequestLogger,
+            max_buffered: int,
+            batch_size: int,
+            flush_interval: float,
+            start_thread: bool = True):
+        self._repository = repository
+        self._max_buffered = max_buffered
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._buffer: "OrderedDict[str, dict]" = OrderedDict()
+        # Start fields of requests that haven't completed yet, so a completion can always be written as a full row.
+        self._in_flight: Dict[str, dict] = {}
+        self._stopping = False
+
+        self._flushed = 0
+        self._batches = 0
+        self._dropped = 0
+        self._failed_batches = 0
+        self._last_flush_ms = 0.0
+        self._last_flush_failed = False
+
+        self._thread: Optional[threading.Thread] = None
+        if start_thread:
+            self._thread = threading.Thread(target=self._run, name="request-logger-flush", daemon=True)
+            self._thread.start()
+
+    def log_start(self, endpoint: str, filename: str, requester_ip: str) -> str:
+        request_id = str(uuid.uuid4())
+        record = {
+            "id": request_id,
+            "endpoint": endpoint,
+            "filename": filename,
+            "requester_ip": requester_ip,
+            "received_at": datetime.now(UTC),
+        }
+
+        with self._condition:
+            if len(self._buffer) >= self._max_buffered or len(self._in_flight) >= self._max_buffered:
+                self._dropped += 1
+                return request_id
+
+            self._in_flight[request_id] = record
+            self._buffer[request_id] = dict(record)
+            self._notify_if_batch_ready()
+
+        return request_id
+
+    def log_completed(self, request_id: str, status_code: int, result_media_id: str = None, error_message: str = None):
+        completion = {
+            "result_status": status_code,
+            "result_media_id": result_media_id,
+            "responded_at": datetime.now(UTC),
+            "error_message": error_message,
+        }
+
+        with self._condition:
+            started = self._in_flight.pop(request_id, None)
+            if started is None:
+                # The start was dropped, so there is no row to complete.
+                return
+
+            if request_id not in self._buffer and len(self._buffer) >= self._max_buffered:
+                self._dropped += 1
+                return
+
+            self._buffer[request_id] = {**started, **self._buffer.get(request_id, {}), **completion}
+            self._notify_if_batch_ready()
+
+    def get_recent_requests(self, limit: int = 100):
+        # Write what is buffered first, so the most recent requests show up.
+        self.flush()
+        return self._repository.get_recent_requests(limit)
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._condition:
+                records = list(self._buffer.values())
+                self._buffer.clear()
+
+            if not records:
+                return 0
+
+            started = time.perf_counter()
+            written = 0
+            failed = False
+            for index in range(0, len(records), self._batch_size):
+                batch = records[index:index + self._batch_size]
+                try:
+                    saved = self._repository.save_batch(batch)
+                except Exception as e:  # noqa: BLE001
+                    _logger.error(f"Failed to write {len(batch)} request history records: {e}")
+                    self._requeue(batch)
+                    failed = True
+                    with self._condition:
+                        self._failed_batches += 1
+                    continue
+
+                written += saved
+                with self._condition:
+                    self._flushed += saved
+                    self._batches += 1
+
+            with self._condition:
+                self._last_flush_ms = round((time.perf_counter() - started) * 1000, 3)
+                self._last_flush_failed = failed
+
+            return written
+
+    def close(self) -> None:
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+
+        if self._thread is not None:
+            self._thread.join()
+
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "buffered": len(self._buffer),
+                "in_flight": len(self._in_flight),
+                "max_buffered": self._max_buffered,
+                "flushed": self._flushed,
+                "batches": self._batches,
+                "failed_batches": self._failed_batches,
+                "dropped": self._dropped,
+                "last_flush_ms": self._last_flush_ms,
+            }
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                # After a failed write, wait for the interval even if a full batch is waiting, instead of spinning.
+                if not self._stopping and (len(self._buffer) < self._batch_size or self._last_flush_failed):
+                    self._condition.wait(self._flush_interval)
+                if self._stopping:
+                    return
+
+            self.flush()
+
+    def _notify_if_batch_ready(self) -> None:
+        if len(self._buffer) >= self._batch_size:
+            self._condition.notify()
+
+    def _requeue(self, records: List[dict]) -> None:
+        """Puts a failed batch back for the next flush. Newer buffered values for the same request win."""
+        with self._condition:
+            for record in records:
+                newer = self._buffer.get(record["id"])
+                if newer is None and len(self._buffer) >= self._max_buffered:
+                    self._dropped += 1
+                    continue
+                self._buffer[record["id"]] = {**record, **(newer or {})}
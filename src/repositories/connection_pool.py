@@ -0,0 +1,250 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+
+import psycopg2
+from psycopg2 import extensions
+from opentelemetry import trace
+
+from src.utils import get_otel_log_handler
+
+
+_logger = get_otel_log_handler("ConnectionPool")
+
+
+class ConnectionPoolTimeoutError(RuntimeError):
+    pass
+
+
+class _PooledConnection:
+    def __init__(self, connection, created_at: float):
+        self.connection = connection
+        self.created_at = created_at
+        self.last_used_at = created_at
+
+
+class BlockingConnectionPool:
+    """
+    Thread-safe Postgres connection pool. When every connection is in use, `getconn` waits (up to a timeout)
+    for one to be returned instead of failing right away.
+
+    Connections idle for longer than `health_check_interval` are pinged before being handed out, and connections
+    older than `max_lifetime` are replaced, so a database failover doesn't leave the pool full of dead sessions.
+    Exposes the same getconn/putconn/closeall methods as psycopg2's pools.
+    """
+    def __init__(
+            self,
+            min_connections: int,
+            max_connections: int,
+            acquire_timeout: float,
+            health_check_interval: float,
+            max_lifetime: float,
+            name: str = "postgres",
+            connect: Callable = psycopg2.connect,
+            clock: Callable[[], float] = time.monotonic,
+            **connect_kwargs):
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1.")
+        if not 0 <= min_connections <= max_connections:
+            raise ValueError("min_connections must be between 0 and max_connections.")
+
+        self._min_connections = min_connections
+        self._max_connections = max_connections
+        self._acquire_timeout = acquire_timeout
+        self._health_check_interval = health_check_interval
+        self._max_lifetime = max_lifetime
+        self._name = name
+        self._connect = connect
+        self._clock = clock
+        self._connect_kwargs = connect_kwargs
+
+        self._condition = threading.Condition()
+        self._idle: Deque[_PooledConnection] = deque()
+        self._in_use: Dict[int, _PooledConnection] = {}
+        self._open_connections = 0
+        self._closed = False
+
+        self._waiters = 0
+        self._acquired = 0
+        self._timeouts = 0
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._recycled = 0
+        self._failed_health_checks = 0
+
+        for _ in range(min_connections):
+            self._idle.append(self._new_connection())
+            self._open_connections += 1
+
+    def getconn(self, timeout: Optional[float] = None):
+        timeout = self._acquire_timeout if timeout is None else timeout
+        started = self._clock()
+        deadline = started + timeout
+
+        with self._condition:
+            self._waiters += 1
+            try:
+                while True:
+                    if self._closed:
+                        raise RuntimeError(f"Connection pool [{self._name}] is closed.")
+
+                    if self._idle:
+                        # LIFO: the most recently used connection is the least likely to have gone stale.
+                        pooled = self._idle.pop()
+                        break
+
+                    if self._open_connections < self._max_connections:
+                        self._open_connections += 1
+                        pooled = None
+                        break
+
+                    remaining = deadline - self._clock()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise ConnectionPoolTimeoutError(
+                            f"No database connection available in pool [{self._name}] after {timeout}s "
+                            f"({self._max_connections} in use)."
+                        )
+                    self._condition.wait(remaining)
+            except ConnectionPoolTimeoutError as e:
+                _logger.warning(str(e))
+                raise
+            finally:
+                self._waiters -= 1
+
+            waited = self._clock() - started
+            self._acquired += 1
+            self._total_wait_seconds += waited
+            self._max_wait_seconds = max(self._max_wait_seconds, waited)
+
+        try:
+            pooled = self._ensure_usable(pooled)
+        except Exception:
+            with self._condition:
+                self._open_connections -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._in_use[id(pooled.connection)] = pooled
+            in_use = len(self._in_use)
+
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.set_attributes({
+                "db.pool.wait_seconds": round(waited, 6),
+                "db.pool.in_use": in_use,
+            })
+
+        return pooled.connection
+
+    def putconn(self, conn, close: bool = False) -> None:
+        with self._condition:
+            pooled = self._in_use.pop(id(conn), None)
+
+        if pooled is None:
+            raise ValueError(f"Connection does not belong to pool [{self._name}].")
+
+        if not close and not conn.closed:
+            close = not self._reset(conn)
+
+        if close or conn.closed or self._closed:
+            self._close_quietly(conn)
+            with self._condition:
+                self._open_connections -= 1
+                self._condition.notify()
+            return
+
+        pooled.last_used_at = self._clock()
+        with self._condition:
+            self._idle.append(pooled)
+            self._condition.notify()
+
+    def closeall(self) -> None:
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open_connections -= len(idle)
+            self._condition.notify_all()
+
+        # Connections still in use are closed when they are returned.
+        for pooled in idle:
+            self._close_quietly(pooled.connection)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "name": self._name,
+                "min_connections": self._min_connections,
+                "max_connections": self._max_connections,
+                "open": self._open_connections,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "waiters": self._waiters,
+                "acquired": self._acquired,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": round(self._total_wait_seconds * 1000 / self._acquired, 3) if self._acquired else 0.0,
+                "max_wait_ms": round(self._max_wait_seconds * 1000, 3),
+                "recycled": self._recycled,
+                "failed_health_checks": self._failed_health_checks,
+            }
+
+    def _new_connection(self) -> _PooledConnection:
+        return _PooledConnection(self._connect(**self._connect_kwargs), self._clock())
+
+    def _ensure_usable(self, pooled: Optional[_PooledConnection]) -> _PooledConnection:
+        if pooled is None:
+            return self._new_connection()
+
+        now = self._clock()
+        if pooled.connection.closed or now - pooled.created_at >= self._max_lifetime:
+            self._recycle(pooled)
+            return self._new_connection()
+
+        if now - pooled.last_used_at >= self._health_check_interval and not self._ping(pooled.connection):
+            with self._condition:
+                self._failed_health_checks += 1
+            _logger.warning(f"Discarding a dead connection from pool [{self._name}].")
+            self._recycle(pooled)
+            return self._new_connection()
+
+        return pooled
+
+    def _recycle(self, pooled: _PooledConnection) -> None:
+        self._close_quietly(pooled.connection)
+        with self._condition:
+            self._recycled += 1
+
+    @staticmethod
+    def _ping(conn) -> bool:
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _reset(conn) -> bool:
+        """Leaves the connection outside any transaction. Returns False if it should be closed instead."""
+        status = conn.info.transaction_status
+        if status == extensions.TRANSACTION_STATUS_IDLE:
+            return True
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+
+        try:
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn) -> None:
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
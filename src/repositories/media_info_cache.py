@@ -1,19 +1,35 @@
+from typing import List, Optional
+
 import psycopg2
-from psycopg2.pool import SimpleConnectionPool
 from opentelemetry import trace
 
 from src.converters.create_searchable_reference import create_searchable_reference
 from src.media_identifiers.constants import MOVIE, TV
 from src.media_identifiers.media_type_helpers import normalize_media_type
 from src.repositories.base_repository import BaseRepository
+from src.repositories.connection_pool import BlockingConnectionPool
 from src.utils import is_valid_year, get_otel_log_handler
 
 
 _logger = get_otel_log_handler("Cache")
 
+# One lookup row per non-empty normalized name, tagged with the column it came from. When two records share a name,
+# the first one keeps it, which matches the old query returning whichever row it found first.
+_LOOKUP_INSERT_SQL = """
+    INSERT INTO cached_media_lookup (lookup_field, lookup_key, media_type, year, season, episode, media_id)
+    SELECT names.lookup_field, names.lookup_key, LOWER(cm.media_type), cm.year, COALESCE(cm.season, 0),
+           COALESCE(cm.episode, 0), cm.id
+    FROM {source}
+    CROSS JOIN LATERAL (
+        VALUES ('title', LOWER(cm.title)), ('searchable_reference', LOWER(cm.searchable_reference))
+    ) AS names (lookup_field, lookup_key)
+    WHERE names.lookup_key IS NOT NULL AND names.lookup_key <> ''
+    ON CONFLICT DO NOTHING;
+"""
+
 
 class MediaInfoCache(BaseRepository):
-    def __init__(self, conn_pool: SimpleConnectionPool, skip_database_initialization: bool = False):
+    def __init__(self, conn_pool: BlockingConnectionPool, skip_database_initialization: bool = False):
         super().__init__(conn_pool, _logger)
 
         if not skip_database_initialization:
@@ -92,12 +108,69 @@ class MediaInfoCache(BaseRepository):
                         ON cached_media (LOWER(media_type), year);
                         """
                     )
+
+                    self._ensure_lookup_table_exists(cursor)
                     conn.commit()
         except psycopg2.Error as e:
             error_message = f"Error creating the cache table: {str(e)}"
             self._logger.error(error_message)
             raise RuntimeError(error_message) from e
 
+    def _ensure_lookup_table_exists(self, cursor):
+        """
+        cached_media_lookup holds one row per normalized name of a cached record (its title and its searchable
+        reference, lowercased, each tagged with its column), so get_cached_by_obj is an equality probe on the
+        primary key. A trigger keeps it in sync with every insert and update on cached_media.
+        """
+        cursor.execute("SELECT to_regclass('cached_media_lookup') IS NULL;")
+        needs_backfill = cursor.fetchone()[0]
+
+        self._logger.debug("Creating cached_media_lookup table if it does not exist")
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cached_media_lookup (
+                lookup_field TEXT NOT NULL,
+                lookup_key TEXT NOT NULL,
+                media_type TEXT NOT NULL,
+                year INTEGER NOT NULL,
+                season INTEGER NOT NULL DEFAULT 0,
+                episode INTEGER NOT NULL DEFAULT 0,
+                media_id UUID NOT NULL REFERENCES cached_media (id) ON DELETE CASCADE,
+                PRIMARY KEY (lookup_field, lookup_key, media_type, year, season, episode)
+                );
+            """
+        )
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_cached_media_lookup_media_id
+            ON cached_media_lookup (media_id);
+            """
+        )
+        cursor.execute(
+            f"""
+            CREATE OR REPLACE FUNCTION sync_cached_media_lookup() RETURNS TRIGGER AS $$
+            BEGIN
+                DELETE FROM cached_media_lookup WHERE media_id = NEW.id;
+                {_LOOKUP_INSERT_SQL.format(source="(SELECT NEW.*) AS cm")}
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+            """
+        )
+        cursor.execute("DROP TRIGGER IF EXISTS trg_sync_cached_media_lookup ON cached_media;")
+        cursor.execute(
+            """
+            CREATE TRIGGER trg_sync_cached_media_lookup
+            AFTER INSERT OR UPDATE OF title, searchable_reference, media_type, year, season, episode
+            ON cached_media
+            FOR EACH ROW EXECUTE FUNCTION sync_cached_media_lookup();
+            """
+        )
+
+        if needs_backfill:
+            self._logger.debug("Backfilling cached_media_lookup from existing cached_media rows")
+            cursor.execute(_LOOKUP_INSERT_SQL.format(source="cached_media AS cm"))
+
     @staticmethod
     def _prepare_values_for_cache(new_record: dict, target_keys: list):
         values = []
@@ -118,7 +191,7 @@ class MediaInfoCache(BaseRepository):
         span = trace.get_current_span()
         if span.is_recording():
             span.set_attributes({
-                "db.table": "cached_media",
+                "db.table": "cached_media_lookup",
                 "db.operation": "select",
             })
         try:
@@ -128,50 +201,31 @@ class MediaInfoCache(BaseRepository):
                 self._logger.debug("No object provided, returning None")
                 return None
 
-            media_type = normalize_media_type(obj.get('media_type'))
-            title = obj.get('title')
-            searchable_reference_from_title = create_searchable_reference(title)
-            searchable_reference = obj.get('searchable_reference')
-            year = obj.get('year')
-
-            if any(x is None for x in [media_type, title]):
-                self._logger.debug("Object does not contain all required fields, returning None")
+            lookup_params = self._object_lookup_params(obj)
+            if lookup_params is None:
                 return None
 
+            lookup_names, media_type, season_number, episode_number, year = lookup_params
+
+            query = """
+                    SELECT cm.* FROM unnest(%s::text[], %s::text[]) AS wanted(lookup_field, lookup_key)
+                    JOIN cached_media_lookup AS lookup
+                      ON lookup.lookup_field = wanted.lookup_field
+                     AND lookup.lookup_key = wanted.lookup_key
+                    JOIN cached_media AS cm ON cm.id = lookup.media_id
+                    WHERE lookup.media_type = %s
+                    """
+            query_args = ([field for field, _ in lookup_names], [key for _, key in lookup_names], media_type)
+            if season_number is not None:
+                query = f"{query} AND lookup.season = %s AND lookup.episode = %s"
+                query_args = (*query_args, season_number, episode_number)
+            if year is not None:
+                query = f"{query} AND lookup.year = %s"
+                query_args = (*query_args, year)
+
             with self._get_connection() as conn:
                 with conn.cursor() as cursor:
-                    base_query = "SELECT * FROM cached_media WHERE (title ILIKE %s or searchable_reference ILIKE %s or searchable_reference ILIKE %s) and media_type ILIKE %s"
-
-                    query_args = ()
-
-                    if media_type == TV:
-                        episode_number = obj.get('episode')
-                        season_number = obj.get('season')
-
-                        if episode_number is None and season_number is None:
-                            self._logger.debug(f"Object does not contain season or episode number, returning None. Object: {obj}")
-                            return None
-
-                        query = f"{base_query} and season = %s and episode = %s"
-                        if is_valid_year(year):
-                            query = f"{query} and year = %s"
-                            query_args = (title, searchable_reference_from_title, searchable_reference, media_type, season_number, episode_number, year)
-                            cursor.execute(query, query_args)
-                        else:
-                            query_args = (title, searchable_reference_from_title, searchable_reference, media_type, season_number, episode_number)
-                            cursor.execute(query, query_args)
-                    elif media_type == MOVIE:
-                        if is_valid_year(year):
-                            query = f"{base_query} and year = %s"
-                            query_args = (title, searchable_reference_from_title, searchable_reference, media_type, year)
-                            cursor.execute(query, query_args)
-                        else:
-                            query_args = (title, searchable_reference_from_title, searchable_reference, media_type)
-                            cursor.execute(base_query, query_args)
-
-                    else:
-                        self._logger.debug("Object does not contain a valid media type, returning None")
-                        return None
+                    cursor.execute(f"{query} LIMIT 1;", query_args)
 
                     result = cursor.fetchone()
                     if result:
@@ -185,6 +239,112 @@ class MediaInfoCache(BaseRepository):
             self._logger.error(error_message)
             raise RuntimeError(error_message) from e
 
+    @_logger.trace("get_cached_by_objs")
+    def get_cached_by_objs(self, objs: List[dict]) -> List[Optional[dict]]:
+        """Looks up many objects in one query. Returns one result per object, in the same order (None on a miss)."""
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.set_attributes({
+                "db.table": "cached_media_lookup",
+                "db.operation": "select",
+                "db.lookup_count": len(objs),
+            })
+
+        results: List[Optional[dict]] = [None] * len(objs)
+        positions, lookup_fields, lookup_keys, media_types, seasons, episodes, years = [], [], [], [], [], [], []
+        for position, obj in enumerate(objs):
+            lookup_params = self._object_lookup_params(obj)
+            if lookup_params is None:
+                continue
+
+            lookup_names, media_type, season_number, episode_number, year = lookup_params
+            for lookup_field, lookup_key in lookup_names:
+                positions.append(position)
+                lookup_fields.append(lookup_field)
+                lookup_keys.append(lookup_key)
+                media_types.append(media_type)
+                seasons.append(season_number)
+                episodes.append(episode_number)
+                years.append(year)
+
+        if not positions:
+            return results
+
+        try:
+            with self._get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        SELECT DISTINCT ON (wanted.wanted_position) wanted.wanted_position, cm.*
+                        FROM unnest(%s::int[], %s::text[], %s::text[], %s::text[], %s::int[], %s::int[], %s::int[])
+                             AS wanted(wanted_position, lookup_field, lookup_key, media_type, season, episode, year)
+                        JOIN cached_media_lookup AS lookup
+                          ON lookup.lookup_field = wanted.lookup_field
+                         AND lookup.lookup_key = wanted.lookup_key
+                         AND lookup.media_type = wanted.media_type
+                         AND (wanted.season IS NULL OR lookup.season = wanted.season)
+                         AND (wanted.episode IS NULL OR lookup.episode = wanted.episode)
+                         AND (wanted.year IS NULL OR lookup.year = wanted.year)
+                        JOIN cached_media AS cm ON cm.id = lookup.media_id
+                        ORDER BY wanted.wanted_position;
+                        """,
+                        (positions, lookup_fields, lookup_keys, media_types, seasons, episodes, years),
+                    )
+
+                    columns = [desc[0] for desc in cursor.description]
+                    for row in cursor.fetchall():
+                        record = dict(zip(columns, row))
+                        results[record.pop("wanted_position")] = record
+
+            return results
+        except psycopg2.Error as e:
+            error_message = f"Error getting cached data by objects: {str(e)}"
+            self._logger.error(error_message)
+            raise RuntimeError(error_message) from e
+
+    def _object_lookup_params(self, obj) -> Optional[tuple]:
+        """
+        Returns ((lookup field, lookup key) pairs, media type, season, episode, year) to find the object, or None if it
+        can't be. Matches what the old ILIKE query did: the title against cached titles, the searchable references
+        (given and built from the title) against cached searchable references, case-insensitively. Season and
+        episode are None for movies, which aren't filtered on them, and year is None when it isn't a valid one.
+        An episode without both season and episode can't match, as `season = NULL` never did.
+        """
+        media_type = normalize_media_type(obj.get('media_type'))
+        title = obj.get('title')
+        searchable_reference_from_title = create_searchable_reference(title)
+        searchable_reference = obj.get('searchable_reference')
+        year = obj.get('year')
+
+        if any(x is None for x in [media_type, title]):
+            self._logger.debug("Object does not contain all required fields, returning None")
+            return None
+
+        season_number = None
+        episode_number = None
+        if media_type == TV:
+            season_number = obj.get('season')
+            episode_number = obj.get('episode')
+
+            if season_number is None or episode_number is None:
+                self._logger.debug(f"Object does not contain season and episode numbers, returning None. Object: {obj}")
+                return None
+        elif media_type != MOVIE:
+            self._logger.debug("Object does not contain a valid media type, returning None")
+            return None
+
+        lookup_names = sorted({
+            (lookup_field, name.lower())
+            for lookup_field, name in [
+                ("title", title),
+                ("searchable_reference", searchable_reference_from_title),
+                ("searchable_reference", searchable_reference),
+            ]
+            if name and name.strip()
+        })
+
+        return lookup_names, media_type, season_number, episode_number, year if is_valid_year(year) else None
+
     @_logger.trace("get_cached")
     def get_cached(self, search_term: str, media_type: str, search_prop_name: str = "searchable_reference"):
         span = trace.get_current_span()
@@ -299,10 +459,19 @@ class MediaInfoCache(BaseRepository):
                     # Prepare the insert query
                     columns = ', '.join(keys)
                     placeholders = ', '.join(['%s'] * len(keys))
-                    query = f"INSERT INTO cached_media ({columns}) VALUES ({placeholders}) RETURNING id;"
+                    query = f"INSERT INTO cached_media ({columns}) VALUES ({placeholders}) ON CONFLICT (tmdb_id) DO NOTHING RETURNING id;"
 
                     cursor.execute(query, tuple(values))
-                    new_id = cursor.fetchone()[0]
+                    inserted = cursor.fetchone()
+                    if inserted is None:
+                        # A concurrent request cached the same media first; return its row instead of failing.
+                        cursor.execute("SELECT * FROM cached_media WHERE tmdb_id = %s;", (new_record.get('tmdb_id'),))
+                        existing = cursor.fetchone()
+                        conn.commit()
+                        self._logger.debug(f"Record with TMDb ID [{new_record.get('tmdb_id')}] was already cached.")
+                        return dict(zip([desc[0] for desc in cursor.description], existing))
+
+                    new_id = inserted[0]
                     conn.commit()
                     self._logger.debug(f"Record cached with ID: {new_id}")
 
@@ -315,6 +484,50 @@ class MediaInfoCache(BaseRepository):
             self._logger.error(error_message)
             raise RuntimeError(error_message) from e
 
+    @_logger.trace("cache_many")
+    def cache_many(self, new_records: List[dict]) -> int:
+        """
+        Inserts several records in a single statement. Records whose tmdb_id is already cached are skipped.
+        Returns how many records were actually inserted.
+        """
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.set_attributes({
+                "db.table": "cached_media",
+                "db.operation": "insert",
+                "db.record_count": len(new_records),
+            })
+
+        if not new_records:
+            return 0
+
+        try:
+            self._logger.debug(f"Caching {len(new_records)} records with title: {new_records[0].get('title', '[Unknown]')}")
+
+            for record in new_records:
+                if not all(col in record for col in self._required_columns):
+                    raise ValueError("Missing required fields in the record")
+
+            keys = [key for key in new_records[0].keys() if key not in ['id', 'created_at', 'modified_at']]
+            rows = [tuple(self._prepare_values_for_cache({key: record.get(key) for key in keys}, keys)) for record in new_records]
+
+            with self._get_connection() as conn:
+                with conn.cursor() as cursor:
+                    query = (
+                        f"INSERT INTO cached_media ({', '.join(keys)}) VALUES {self._values_list(cursor, rows)} "
+                        f"ON CONFLICT (tmdb_id) DO NOTHING RETURNING id;"
+                    )
+                    cursor.execute(query)
+                    inserted_ids = cursor.fetchall()
+                    conn.commit()
+
+                    self._logger.debug(f"Records cached: {len(inserted_ids)} of {len(new_records)}")
+                    return len(inserted_ids)
+        except psycopg2.Error as e:
+            error_message = f"Error caching records: {str(e)}"
+            self._logger.error(error_message)
+            raise RuntimeError(error_message) from e
+
     @_logger.trace("update_cache")
     def update_cache(self, new_record: dict):
         span = trace.get_current_span()
@@ -0,0 +1,195 @@
+import threading
+from typing import Hashable, List, Optional
+
+from opentelemetry import trace
+
+from src.media_identifiers.media_type_helpers import is_tv, normalize_media_type
+from src.memory_cache import TTLLRUCache
+from src.repositories.media_info_cache import MediaInfoCache
+from src.utils import get_otel_log_handler, is_valid_year
+
+
+_logger = get_otel_log_handler("CacheL1")
+
+
+class MediaInfoL1Cache:
+    """
+    In-process cache in front of MediaInfoCache, so hot titles are answered without a database round trip.
+
+    Only hits are kept: a miss always goes to the database, so a record cached by another worker is found right away.
+    Every lookup key (object, TMDb ID, series/season/episode) points at the record id, and the record itself is stored
+    once under that id. That way `update_cache` only has to rewrite one entry to refresh every key.
+    """
+    def __init__(self, repository: MediaInfoCache, memory_cache: TTLLRUCache):
+        self._repository = repository
+        self._memory_cache = memory_cache
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @_logger.trace("get_cached_by_obj")
+    def get_cached_by_obj(self, obj):
+        lookup_key = self._object_key(obj)
+        if lookup_key is None:
+            return self._repository.get_cached_by_obj(obj)
+
+        return self._get_through(lookup_key, lambda: self._repository.get_cached_by_obj(obj))
+
+    @_logger.trace("get_cached_by_objs")
+    def get_cached_by_objs(self, objs: List[dict]) -> List[Optional[dict]]:
+        results: List[Optional[dict]] = [None] * len(objs)
+        missing_positions = []
+        for position, obj in enumerate(objs):
+            lookup_key = self._object_key(obj)
+            cached = self._get_from_memory(lookup_key) if lookup_key is not None else None
+            if cached is not None:
+                results[position] = cached
+            else:
+                missing_positions.append(position)
+
+        with self._lock:
+            self._hits += len(objs) - len(missing_positions)
+            self._misses += len(missing_positions)
+
+        if not missing_positions:
+            return results
+
+        loaded = self._repository.get_cached_by_objs([objs[position] for position in missing_positions])
+        for position, record in zip(missing_positions, loaded):
+            if record:
+                lookup_key = self._object_key(objs[position])
+                self._remember(record, *([lookup_key] if lookup_key is not None else []))
+            results[position] = record
+
+        return results
+
+    @_logger.trace("get_cached")
+    def get_cached(self, search_term: str, media_type: str, search_prop_name: str = "searchable_reference"):
+        # Only lookups by record id are unambiguous enough to be answered from memory.
+        if search_prop_name != "id" or media_type is not None:
+            return self._repository.get_cached(search_term, media_type, search_prop_name)
+
+        return self._get_through(("id", str(search_term)), lambda: self._repository.get_cached(search_term, None, "id"))
+
+    @_logger.trace("get_cached_by_tmdb_id")
+    def get_cached_by_tmdb_id(self, tmdb_id: int):
+        return self._get_through(("tmdb_id", tmdb_id), lambda: self._repository.get_cached_by_tmdb_id(tmdb_id))
+
+    @_logger.trace("get_cached_tv_episode")
+    def get_cached_tv_episode(self, tmdb_series_id: int, season: int, episode: int):
+        return self._get_through(
+            ("episode", tmdb_series_id, season, episode),
+            lambda: self._repository.get_cached_tv_episode(tmdb_series_id, season, episode),
+        )
+
+    @_logger.trace("cache_data")
+    def cache_data(self, new_record: dict):
+        cached = self._repository.cache_data(new_record)
+        self._remember(cached)
+        return cached
+
+    @_logger.trace("cache_many")
+    def cache_many(self, new_records: List[dict]) -> int:
+        # Inserted rows aren't returned, so they are picked up by the first lookup instead.
+        return self._repository.cache_many(new_records)
+
+    @_logger.trace("update_cache")
+    def update_cache(self, new_record: dict):
+        self._repository.update_cache(new_record)
+
+        current = self._memory_cache.get(("id", str(new_record["id"])))
+        if current is not None:
+            self._remember({**current, **new_record})
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            counters = {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+        memory = self._memory_cache.stats()
+        return {
+            **counters,
+            "size": memory["size"],
+            "max_entries": memory["max_entries"],
+            "evictions": memory["evictions"],
+            "expirations": memory["expirations"],
+        }
+
+    def _get_through(self, lookup_key: Hashable, load):
+        cached = self._get_from_memory(lookup_key)
+
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.set_attribute("cache.l1_hit", cached is not None)
+
+        with self._lock:
+            if cached is not None:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+        if cached is not None:
+            return cached
+
+        loaded = load()
+        if loaded:
+            self._remember(loaded, lookup_key)
+        return loaded
+
+    def _get_from_memory(self, lookup_key: Hashable) -> Optional[dict]:
+        if lookup_key[0] == "id":
+            record = self._memory_cache.get(lookup_key)
+        else:
+            record_id = self._memory_cache.get(lookup_key)
+            record = self._memory_cache.get(("id", record_id)) if record_id is not None else None
+
+        # Callers may change the returned dict; the cached record must stay as it was.
+        return dict(record) if record is not None else None
+
+    def _remember(self, record: Optional[dict], *lookup_keys: Hashable) -> None:
+        if not record or record.get("id") is None:
+            return
+
+        record_id = str(record["id"])
+        self._memory_cache.set(("id", record_id), dict(record))
+
+        keys = list(lookup_keys)
+        if record.get("tmdb_id") is not None:
+            keys.append(("tmdb_id", record["tmdb_id"]))
+        if None not in (record.get("tmdb_series_id"), record.get("season"), record.get("episode")):
+            keys.append(("episode", record["tmdb_series_id"], record["season"], record["episode"]))
+
+        for key in keys:
+            if key[0] != "id":
+                self._memory_cache.set(key, record_id)
+
+    @staticmethod
+    def _object_key(obj) -> Optional[tuple]:
+        """Mirrors the inputs of MediaInfoCache.get_cached_by_obj, so equal keys always mean the same query."""
+        if obj is None:
+            return None
+
+        media_type = normalize_media_type(obj.get("media_type"))
+        title = obj.get("title")
+        if media_type is None or title is None:
+            return None
+
+        year = obj.get("year")
+        season = obj.get("season") if is_tv(media_type) else None
+        episode = obj.get("episode") if is_tv(media_type) else None
+        if is_tv(media_type) and season is None and episode is None:
+            return None
+
+        return (
+            "object",
+            media_type,
+            title.lower(),
+            (obj.get("searchable_reference") or "").lower(),
+            year if is_valid_year(year) else None,
+            season,
+            episode,
+        )
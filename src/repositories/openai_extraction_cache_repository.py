@@ -0,0 +1,118 @@
+from typing import Optional
+
+import psycopg2
+from opentelemetry import trace
+
+from src.repositories.base_repository import BaseRepository
+from src.repositories.connection_pool import BlockingConnectionPool
+from src.utils import get_otel_log_handler
+
+
+_logger = get_otel_log_handler("OpenAIExtractionCacheRepository")
+
+
+class OpenAIExtractionCacheRepository(BaseRepository):
+    def __init__(self, conn_pool: BlockingConnectionPool, skip_database_initialization: bool = False):
+        super().__init__(conn_pool, _logger)
+        if not skip_database_initialization:
+            self._ensure_table_exists()
+
+    def _ensure_table_exists(self):
+        try:
+            with self._get_connection() as conn:
+                with conn.cursor() as cursor:
+                    self._logger.debug("Creating openai_extraction_cache table if it does not exist")
+                    create_table_query = """
+                                         CREATE TABLE IF NOT EXISTS openai_extraction_cache (
+                                             ai_function TEXT NOT NULL,
+                                             prompt_version TEXT NOT NULL,
+                                             input_hash TEXT NOT NULL,
+                                             input TEXT NOT NULL,
+                                             output TEXT NOT NULL,
+                                             expires_at TIMESTAMP NOT NULL,
+                                             created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                                             PRIMARY KEY (ai_function, prompt_version, input_hash)
+                                             );"""
+                    cursor.execute(create_table_query)
+
+                    self._logger.debug("Creating indexes for openai_extraction_cache table")
+                    cursor.execute(
+                        """
+                        CREATE INDEX IF NOT EXISTS idx_openai_extraction_cache_expires_at
+                        ON openai_extraction_cache (expires_at);
+                        """
+                    )
+
+                    # Answers of older prompt versions are never looked up again and go once they expire. They are
+                    # not deleted sooner, because during a rolling deploy the workers still on the old version use them.
+                    self._logger.debug("Purging expired OpenAI extractions")
+                    cursor.execute("DELETE FROM openai_extraction_cache WHERE expires_at <= CURRENT_TIMESTAMP;")
+                    conn.commit()
+        except psycopg2.Error as e:
+            error_message = f"Error creating the OpenAI extraction cache table: {str(e)}"
+            self._logger.error(error_message)
+            raise RuntimeError(error_message) from e
+
+    @_logger.trace("get_output")
+    def get_output(self, ai_function: str, prompt_version: str, input_hash: str) -> Optional[str]:
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.set_attributes({
+                "db.table": "openai_extraction_cache",
+                "db.operation": "select",
+            })
+        try:
+            with self._get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        SELECT output FROM openai_extraction_cache
+                        WHERE ai_function = %s
+                          AND prompt_version = %s
+                          AND input_hash = %s
+                          AND expires_at > CURRENT_TIMESTAMP;
+                        """,
+                        (ai_function, prompt_version, input_hash),
+                    )
+                    result = cursor.fetchone()
+                    return result[0] if result else None
+        except psycopg2.Error as e:
+            error_message = f"Error getting cached OpenAI extraction: {str(e)}"
+            self._logger.error(error_message)
+            raise RuntimeError(error_message) from e
+
+    @_logger.trace("save_output")
+    def save_output(
+            self,
+            ai_function: str,
+            prompt_version: str,
+            input_hash: str,
+            ai_input: str,
+            output: str,
+            ttl_seconds: float) -> None:
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.set_attributes({
+                "db.table": "openai_extraction_cache",
+                "db.operation": "upsert",
+            })
+        try:
+            with self._get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        INSERT INTO openai_extraction_cache
+                            (ai_function, prompt_version, input_hash, input, output, expires_at)
+                        VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP + make_interval(secs => %s))
+                        ON CONFLICT (ai_function, prompt_version, input_hash)
+                        DO UPDATE SET output = EXCLUDED.output,
+                                      expires_at = EXCLUDED.expires_at,
+                                      created_at = CURRENT_TIMESTAMP;
+                        """,
+                        (ai_function, prompt_version, input_hash, ai_input, output, ttl_seconds),
+                    )
+                    conn.commit()
+        except psycopg2.Error as e:
+            error_message = f"Error caching OpenAI extraction: {str(e)}"
+            self._logger.error(error_message)
+            raise RuntimeError(error_message) from e
@@ -1,8 +1,8 @@
 import psycopg2
-from psycopg2.pool import SimpleConnectionPool
 from opentelemetry import trace
 
 from src.repositories.base_repository import BaseRepository
+from src.repositories.connection_pool import BlockingConnectionPool
 from src.utils import get_request_id, get_otel_log_handler
 
 
@@ -10,7 +10,7 @@ _logger = get_otel_log_handler("OpenAILogger")
 
 
 class OpenAILogger(BaseRepository):
-    def __init__(self, conn_pool: SimpleConnectionPool, skip_database_initialization: bool = False):
+    def __init__(self, conn_pool: BlockingConnectionPool, skip_database_initialization: bool = False):
         super().__init__(conn_pool, _logger)
         if not skip_database_initialization:
             self._ensure_table_exists()
@@ -36,6 +36,10 @@ class OpenAILogger(BaseRepository):
                                              );"""
                     cursor.execute(create_table_query)
 
+                    self._logger.debug("Adding prompt columns to openai_history table if they do not exist")
+                    cursor.execute("ALTER TABLE openai_history ADD COLUMN IF NOT EXISTS ai_function TEXT NULL;")
+                    cursor.execute("ALTER TABLE openai_history ADD COLUMN IF NOT EXISTS prompt_version TEXT NULL;")
+
                     self._logger.debug("Creating indexes for openai_history table")
                     cursor.execute(
                         """
@@ -55,7 +59,9 @@ class OpenAILogger(BaseRepository):
             cached_tokens: int,
             output_tokens: int,
             reasoning_tokens: int,
-            total_tokens: int):
+            total_tokens: int,
+            ai_function: str = None,
+            prompt_version: str = None):
         span = trace.get_current_span()
         if span.is_recording():
             span.set_attributes({
@@ -73,12 +79,12 @@ class OpenAILogger(BaseRepository):
             with self._get_connection() as conn:
                 with conn.cursor() as cursor:
                     insert_query = """
-                    INSERT INTO openai_history (input_tokens, cached_tokens, output_tokens, reasoning_tokens, total_tokens, request_id, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
+                    INSERT INTO openai_history (input_tokens, cached_tokens, output_tokens, reasoning_tokens, total_tokens, request_id, ai_function, prompt_version, created_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
                     RETURNING id;
                     """
 
-                    cursor.execute(insert_query, (input_tokens, cached_tokens, output_tokens, reasoning_tokens, total_tokens, request_id))
+                    cursor.execute(insert_query, (input_tokens, cached_tokens, output_tokens, reasoning_tokens, total_tokens, request_id, ai_function, prompt_version))
                     openai_request_log_id = cursor.fetchone()[0]
                     conn.commit()
 
@@ -87,4 +93,40 @@ class OpenAILogger(BaseRepository):
         except psycopg2.Error as e:
             error_message = f"Error logging request start: {str(e)}"
             self._logger.error(error_message)
-            raise RuntimeError(error_message) from e
\ No newline at end of file
+            raise RuntimeError(error_message) from e
+
+    @_logger.trace("get_token_usage_report")
+    def get_token_usage_report(self, days: int = 7):
+        """Cached vs uncached input tokens per AI function and prompt version, over the last `days` days."""
+        try:
+            with self._get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        SELECT COALESCE(ai_function, 'unknown'),
+                               COALESCE(prompt_version, 'unknown'),
+                               COUNT(*),
+                               SUM(input_tokens),
+                               SUM(cached_tokens),
+                               SUM(output_tokens)
+                        FROM openai_history
+                        WHERE created_at >= CURRENT_TIMESTAMP - make_interval(days => %s)
+                        GROUP BY 1, 2
+                        ORDER BY 1, 2;
+                        """,
+                        (days,),
+                    )
+                    return [{
+                        "ai_function": row[0],
+                        "prompt_version": row[1],
+                        "calls": row[2],
+                        "input_tokens": row[3],
+                        "cached_tokens": row[4],
+                        "uncached_tokens": row[3] - row[4],
+                        "cached_ratio": round(row[4] / row[3], 4) if row[3] else 0.0,
+                        "output_tokens": row[5],
+                    } for row in cursor.fetchall()]
+        except psycopg2.Error as e:
+            error_message = f"Error building the OpenAI token usage report: {str(e)}"
+            self._logger.error(error_message)
+            raise RuntimeError(error_message) from e
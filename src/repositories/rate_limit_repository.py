@@ -0,0 +1,76 @@
+import psycopg2
+from opentelemetry import trace
+
+from src.repositories.base_repository import BaseRepository
+from src.repositories.connection_pool import BlockingConnectionPool
+from src.utils import get_otel_log_handler
+
+
+_logger = get_otel_log_handler("RateLimitRepository")
+
+# Windows older than this are purged, so the table never grows past a few hundred rows.
+_WINDOW_RETENTION_SECONDS = 60
+
+
+class RateLimitRepository(BaseRepository):
+    def __init__(self, conn_pool: BlockingConnectionPool, skip_database_initialization: bool = False):
+        super().__init__(conn_pool, _logger)
+        if not skip_database_initialization:
+            self._ensure_table_exists()
+
+    def _ensure_table_exists(self):
+        try:
+            with self._get_connection() as conn:
+                with conn.cursor() as cursor:
+                    self._logger.debug("Creating rate_limit_windows table if it does not exist")
+                    create_table_query = """
+                                         CREATE TABLE IF NOT EXISTS rate_limit_windows (
+                                             limiter_name TEXT NOT NULL,
+                                             window_start BIGINT NOT NULL,
+                                             request_count INTEGER NOT NULL DEFAULT 0,
+                                             PRIMARY KEY (limiter_name, window_start)
+                                             );"""
+                    cursor.execute(create_table_query)
+                    conn.commit()
+        except psycopg2.Error as e:
+            error_message = f"Error creating the rate limit table: {str(e)}"
+            self._logger.error(error_message)
+            raise RuntimeError(error_message) from e
+
+    @_logger.trace("increment_window")
+    def increment_window(self, limiter_name: str, window_start: int) -> int:
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.set_attributes({
+                "db.table": "rate_limit_windows",
+                "db.operation": "upsert",
+                "rate_limiter.name": limiter_name,
+            })
+        try:
+            with self._get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        INSERT INTO rate_limit_windows (limiter_name, window_start, request_count)
+                        VALUES (%s, %s, 1)
+                        ON CONFLICT (limiter_name, window_start)
+                        DO UPDATE SET request_count = rate_limit_windows.request_count + 1
+                        RETURNING request_count;
+                        """,
+                        (limiter_name, window_start),
+                    )
+                    request_count = cursor.fetchone()[0]
+
+                    if request_count == 1:
+                        # First hit of a new window: a cheap moment to drop the old ones.
+                        cursor.execute(
+                            "DELETE FROM rate_limit_windows WHERE limiter_name = %s AND window_start < %s;",
+                            (limiter_name, window_start - _WINDOW_RETENTION_SECONDS),
+                        )
+
+                    conn.commit()
+                    return request_count
+        except psycopg2.Error as e:
+            error_message = f"Error incrementing rate limit window: {str(e)}"
+            self._logger.error(error_message)
+            raise RuntimeError(error_message) from e
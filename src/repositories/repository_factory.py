@@ -1,15 +1,26 @@
 import os
+import threading
 from typing import Optional
 
-from psycopg2.pool import SimpleConnectionPool
-
+from src.memory_cache import TTLLRUCache
+from src.repositories.advisory_lock_repository import AdvisoryLockRepository
+from src.repositories.batched_request_logger import BatchedRequestLogger
+from src.repositories.connection_pool import BlockingConnectionPool
 from src.repositories.media_info_cache import MediaInfoCache
+from src.repositories.media_info_l1_cache import MediaInfoL1Cache
+from src.repositories.openai_extraction_cache_repository import OpenAIExtractionCacheRepository
 from src.repositories.openai_logger import OpenAILogger
+from src.repositories.rate_limit_repository import RateLimitRepository
 from src.repositories.request_logger import RequestLogger
-from src.utils import get_otel_log_handler
+from src.repositories.tmdb_response_cache_repository import TMDBResponseCacheRepository
+from src.utils import get_env_bool, get_env_float, get_env_int, get_otel_log_handler
 
-_db_pool: Optional[SimpleConnectionPool] = None
+_db_pool: Optional[BlockingConnectionPool] = None
+_advisory_lock_pool: Optional[BlockingConnectionPool] = None
+_db_pool_lock = threading.Lock()
 _repos_initialized = set()
+_media_info_l1_cache: Optional[MediaInfoL1Cache] = None
+_batched_request_logger: Optional[BatchedRequestLogger] = None
 _logger = get_otel_log_handler("RepositoryFactory")
 
 def _require_env(name: str) -> str:
@@ -20,21 +31,57 @@ def _require_env(name: str) -> str:
 
 
 @_logger.trace("_get_pool")
-def _get_pool() -> SimpleConnectionPool:
+def _get_pool() -> BlockingConnectionPool:
     global _db_pool
 
     if _db_pool is not None:
         return _db_pool
 
+    with _db_pool_lock:
+        if _db_pool is None:
+            _db_pool = _create_pool(
+                name="postgres",
+                min_connections=get_env_int("POSTGRES_POOL_MIN", 1),
+                max_connections=get_env_int("POSTGRES_POOL_MAX", 10),
+            )
+
+    return _db_pool
+
+
+@_logger.trace("_get_advisory_lock_pool")
+def _get_advisory_lock_pool() -> BlockingConnectionPool:
+    global _advisory_lock_pool
+
+    if _advisory_lock_pool is not None:
+        return _advisory_lock_pool
+
+    # A held advisory lock keeps its session for the whole pipeline run, so these connections come from their own
+    # pool instead of starving the repositories of the shared one.
+    with _db_pool_lock:
+        if _advisory_lock_pool is None:
+            _advisory_lock_pool = _create_pool(
+                name="advisory_locks",
+                min_connections=0,
+                max_connections=get_env_int("SINGLE_FLIGHT_LOCK_POOL_MAX", 4),
+            )
+
+    return _advisory_lock_pool
+
+
+def _create_pool(name: str, min_connections: int, max_connections: int) -> BlockingConnectionPool:
     host = _require_env("POSTGRES_HOST")
     port = int(_require_env("POSTGRES_PORT"))
     user = _require_env("POSTGRES_USER")
     password = _require_env("POSTGRES_PASSWORD")
     dbname = os.environ.get("POSTGRES_DB", "extended_media_info")
 
-    _db_pool = SimpleConnectionPool(
-        minconn=1,
-        maxconn=10,
+    return BlockingConnectionPool(
+        min_connections=min_connections,
+        max_connections=max_connections,
+        acquire_timeout=get_env_float("POSTGRES_POOL_TIMEOUT_SECONDS", 10),
+        health_check_interval=get_env_float("POSTGRES_POOL_HEALTH_CHECK_INTERVAL_SECONDS", 30),
+        max_lifetime=get_env_float("POSTGRES_POOL_MAX_LIFETIME_SECONDS", 1800),
+        name=name,
         host=host,
         port=port,
         user=user,
@@ -42,7 +89,53 @@ def _get_pool() -> SimpleConnectionPool:
         dbname=dbname,
     )
 
-    return _db_pool
+
+def get_connection_pool_stats() -> Optional[dict]:
+    return _db_pool.stats() if _db_pool is not None else None
+
+
+def get_advisory_lock_pool_stats() -> Optional[dict]:
+    return _advisory_lock_pool.stats() if _advisory_lock_pool is not None else None
+
+
+def close_connection_pool() -> None:
+    if _advisory_lock_pool is not None:
+        _advisory_lock_pool.closeall()
+
+    if _db_pool is not None:
+        _db_pool.closeall()
+
+
+def _get_media_info_l1_cache(repository: MediaInfoCache) -> MediaInfoL1Cache:
+    global _media_info_l1_cache
+
+    # One L1 cache per process, so every caller of get_repository("cache") shares the same hot records.
+    if _media_info_l1_cache is None:
+        _media_info_l1_cache = MediaInfoL1Cache(
+            repository,
+            TTLLRUCache(
+                max_entries=get_env_int("MEDIA_CACHE_L1_MAX_ENTRIES", 4096),
+                default_ttl=get_env_float("MEDIA_CACHE_L1_TTL_SECONDS", 3600),
+                name="media_cache_l1",
+            ),
+        )
+
+    return _media_info_l1_cache
+
+
+def _get_batched_request_logger(repository: RequestLogger) -> BatchedRequestLogger:
+    global _batched_request_logger
+
+    # One buffer and flush thread per process.
+    if _batched_request_logger is None:
+        _batched_request_logger = BatchedRequestLogger(
+            repository,
+            max_buffered=get_env_int("REQUEST_LOG_MAX_BUFFERED", 10000),
+            batch_size=get_env_int("REQUEST_LOG_BATCH_SIZE", 200),
+            flush_interval=get_env_float("REQUEST_LOG_FLUSH_INTERVAL_SECONDS", 1),
+        )
+
+    return _batched_request_logger
 
 
 @_logger.trace("get_repository")
@@ -53,12 +146,32 @@ def get_repository(repo_name: str):
     _repos_initialized.add(repo_name)
 
     if repo_name == "cache":
-        return MediaInfoCache(pool, skip_database_initialization=skip_database_initialization)
+        repository = MediaInfoCache(pool, skip_database_initialization=skip_database_initialization)
+        if not get_env_bool("MEDIA_CACHE_L1_ENABLED", True):
+            return repository
+        return _get_media_info_l1_cache(repository)
 
     if repo_name == "request_logger":
-        return RequestLogger(pool, skip_database_initialization=skip_database_initialization)
+        repository = RequestLogger(pool, skip_database_initialization=skip_database_initialization)
+        if not get_env_bool("REQUEST_LOG_BATCHING", True):
+            return repository
+        return _get_batched_request_logger(repository)
 
     if repo_name == "openai_logger":
         return OpenAILogger(pool, skip_database_initialization=skip_database_initialization)
 
+    if repo_name == "openai_extraction_cache":
+        return OpenAIExtractionCacheRepository(pool, skip_database_initialization=skip_database_initialization)
+
+    if repo_name == "rate_limit":
+        return RateLimitRepository(pool, skip_database_initialization=skip_database_initialization)
+
+    if repo_name == "tmdb_response_cache":
+        return TMDBResponseCacheRepository(pool, skip_database_initialization=skip_database_initialization)
+
+    if repo_name == "advisory_lock":
+        return AdvisoryLockRepository(
+            _get_advisory_lock_pool(), skip_database_initialization=skip_database_initialization
+        )
+
     raise ValueError(f"Repository '{repo_name}' is not recognized or not implemented.")
\ No newline at end of file
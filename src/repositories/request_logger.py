@@ -1,8 +1,10 @@
+from typing import List
+
 import psycopg2
-from psycopg2.pool import SimpleConnectionPool
 from opentelemetry import trace
 
 from src.repositories.base_repository import BaseRepository
+from src.repositories.connection_pool import BlockingConnectionPool
 from src.utils import get_otel_log_handler
 
 
@@ -10,7 +12,7 @@ _logger = get_otel_log_handler("RequestLogger")
 
 
 class RequestLogger(BaseRepository):
-    def __init__(self, conn_pool: SimpleConnectionPool, skip_database_initialization: bool = False):
+    def __init__(self, conn_pool: BlockingConnectionPool, skip_database_initialization: bool = False):
         super().__init__(conn_pool, _logger)
         if not skip_database_initialization:
             self._ensure_table_exists()
@@ -114,6 +116,60 @@ class RequestLogger(BaseRepository):
             self._logger.error(error_message)
             raise RuntimeError(error_message) from e
 
+    @_logger.trace("save_batch")
+    def save_batch(self, records: List[dict]) -> int:
+        """
+        Upserts complete request_history rows, keyed by their client-generated id, in a single statement.
+        A row already written when the request started is updated with its completion fields.
+        """
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.set_attributes({
+                "db.table": "request_history",
+                "db.operation": "upsert",
+                "db.record_count": len(records),
+            })
+
+        if not records:
+            return 0
+
+        try:
+            rows = [
+                (
+                    record["id"],
+                    record["endpoint"],
+                    record["filename"],
+                    record["requester_ip"],
+                    record["received_at"],
+                    record.get("result_status"),
+                    record.get("result_media_id"),
+                    record.get("responded_at"),
+                    record.get("error_message"),
+                )
+                for record in records
+            ]
+
+            with self._get_connection() as conn:
+                with conn.cursor() as cursor:
+                    upsert_query = f"""
+                    INSERT INTO request_history (id, endpoint, filename, requester_ip, received_at, result_status, result_media_id, responded_at, error_message)
+                    VALUES {self._values_list(cursor, rows)}
+                    ON CONFLICT (id) DO UPDATE
+                    SET result_status = COALESCE(EXCLUDED.result_status, request_history.result_status),
+                        result_media_id = COALESCE(EXCLUDED.result_media_id, request_history.result_media_id),
+                        responded_at = COALESCE(EXCLUDED.responded_at, request_history.responded_at),
+                        error_message = COALESCE(EXCLUDED.error_message, request_history.error_message);
+                    """
+                    cursor.execute(upsert_query)
+                    conn.commit()
+
+                    self._logger.debug(f"Saved {len(rows)} request history records")
+                    return len(rows)
+        except psycopg2.Error as e:
+            error_message = f"Error saving request history batch: {str(e)}"
+            self._logger.error(error_message)
+            raise RuntimeError(error_message) from e
+
     @_logger.trace("get_recent_requests")
     def get_recent_requests(self, limit: int = 100):
         try:
@@ -0,0 +1,104 @@
+from typing import Optional
+
+import psycopg2
+from psycopg2.extras import Json
+from opentelemetry import trace
+
+from src.repositories.base_repository import BaseRepository
+from src.repositories.connection_pool import BlockingConnectionPool
+from src.utils import get_otel_log_handler
+
+
+_logger = get_otel_log_handler("TMDBResponseCacheRepository")
+
+
+class TMDBResponseCacheRepository(BaseRepository):
+    def __init__(self, conn_pool: BlockingConnectionPool, skip_database_initialization: bool = False):
+        super().__init__(conn_pool, _logger)
+        if not skip_database_initialization:
+            self._ensure_table_exists()
+
+    def _ensure_table_exists(self):
+        try:
+            with self._get_connection() as conn:
+                with conn.cursor() as cursor:
+                    self._logger.debug("Creating tmdb_response_cache table if it does not exist")
+                    create_table_query = """
+                                         CREATE TABLE IF NOT EXISTS tmdb_response_cache (
+                                             cache_key TEXT PRIMARY KEY,
+                                             url TEXT NOT NULL,
+                                             response JSONB NOT NULL,
+                                             expires_at TIMESTAMP NOT NULL,
+                                             created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                                             );"""
+                    cursor.execute(create_table_query)
+
+                    self._logger.debug("Creating indexes for tmdb_response_cache table")
+                    cursor.execute(
+                        """
+                        CREATE INDEX IF NOT EXISTS idx_tmdb_response_cache_expires_at
+                        ON tmdb_response_cache (expires_at);
+                        """
+                    )
+
+                    self._logger.debug("Purging expired TMDB responses")
+                    cursor.execute("DELETE FROM tmdb_response_cache WHERE expires_at <= CURRENT_TIMESTAMP;")
+                    conn.commit()
+        except psycopg2.Error as e:
+            error_message = f"Error creating the TMDB response cache table: {str(e)}"
+            self._logger.error(error_message)
+            raise RuntimeError(error_message) from e
+
+    @_logger.trace("get_response")
+    def get_response(self, cache_key: str) -> Optional[dict]:
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.set_attributes({
+                "db.table": "tmdb_response_cache",
+                "db.operation": "select",
+            })
+        try:
+            with self._get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        SELECT response FROM tmdb_response_cache
+                        WHERE cache_key = %s
+                          AND expires_at > CURRENT_TIMESTAMP;
+                        """,
+                        (cache_key,),
+                    )
+                    result = cursor.fetchone()
+                    return result[0] if result else None
+        except psycopg2.Error as e:
+            error_message = f"Error getting cached TMDB response: {str(e)}"
+            self._logger.error(error_message)
+            raise RuntimeError(error_message) from e
+
+    @_logger.trace("save_response")
+    def save_response(self, cache_key: str, url: str, response: dict, ttl_seconds: float) -> None:
+        span = trace.get_current_span()
+        if span.is_recording():
+            span.set_attributes({
+                "db.table": "tmdb_response_cache",
+                "db.operation": "upsert",
+            })
+        try:
+            with self._get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(
+                        """
+                        INSERT INTO tmdb_response_cache (cache_key, url, response, expires_at)
+                        VALUES (%s, %s, %s, CURRENT_TIMESTAMP + make_interval(secs => %s))
+                        ON CONFLICT (cache_key)
+                        DO UPDATE SET response = EXCLUDED.response,
+                                      expires_at = EXCLUDED.expires_at,
+                                      created_at = CURRENT_TIMESTAMP;
+                        """,
+                        (cache_key, url, Json(response), ttl_seconds),
+                    )
+                    conn.commit()
+        except psycopg2.Error as e:
+            error_message = f"Error caching TMDB response: {str(e)}"
+            self._logger.error(error_message)
+            raise RuntimeError(error_message) from e
@@ -0,0 +1,116 @@
+import threading
+from typing import Any, Dict, Hashable, Optional
+
+from src.utils import get_otel_log_handler
+
+_logger = get_otel_log_handler("SingleFlight")
+
+
+class SingleFlightTimeoutError(TimeoutError):
+    pass
+
+
+class _InFlightCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlightLease:
+    """
+    Ticket returned by SingleFlight.join.
+
+    The leader does the work and must call `complete` or `fail`. Followers call `wait` to get the leader's outcome.
+    """
+    def __init__(self, owner: "SingleFlight", key: Hashable, call: _InFlightCall, is_leader: bool):
+        self._owner = owner
+        self._call = call
+        self.key = key
+        self.is_leader = is_leader
+
+    def wait(self, timeout: Optional[float]) -> Any:
+        if self.is_leader:
+            raise RuntimeError("The leader of a single-flight call can't wait for itself.")
+
+        if not self._call.done.wait(timeout):
+            raise SingleFlightTimeoutError(f"Timed out waiting for the in-flight call for key [{self.key}].")
+
+        if self._call.error is not None:
+            raise self._call.error
+
+        return self._call.result
+
+    def complete(self, result: Any) -> None:
+        self._owner._finish(self, result=result, error=None)
+
+    def fail(self, error: BaseException) -> None:
+        self._owner._finish(self, result=None, error=error)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller runs, the others wait for its outcome.
+
+    Nothing is cached once the leader finishes: the next caller with the same key starts a new flight.
+    """
+    def __init__(self, name: str):
+        self._name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _InFlightCall] = {}
+        self._leaders = 0
+        self._followers = 0
+
+    def join(self, key: Hashable) -> SingleFlightLease:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                self._followers += 1
+                return SingleFlightLease(self, key, call, is_leader=False)
+
+            call = _InFlightCall()
+            self._calls[key] = call
+            self._leaders += 1
+            return SingleFlightLease(self, key, call, is_leader=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self._name,
+                "in_flight": len(self._calls),
+                "leaders": self._leaders,
+                "followers": self._followers,
+            }
+
+    def _finish(self, lease: SingleFlightLease, result: Any, error: Optional[BaseException]) -> None:
+        if not lease.is_leader:
+            raise RuntimeError("Only the leader of a single-flight call can finish it.")
+
+        with self._lock:
+            call = self._calls.pop(lease.key, None)
+
+        if call is None:
+            _logger.warning(f"Single-flight [{self._name}] call for key [{lease.key}] was already finished.")
+            return
+
+        call.result = result
+        call.error = error
+        call.done.set()
+
+        if call.followers:
+            _logger.debug(f"Single-flight [{self._name}] shared one result with {call.followers} waiting callers.")
+
+
+_single_flights: Dict[str, SingleFlight] = {}
+_single_flights_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    with _single_flights_lock:
+        single_flight = _single_flights.get(name)
+        if single_flight is None:
+            single_flight = SingleFlight(name)
+            _single_flights[name] = single_flight
+        return single_flight
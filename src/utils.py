@@ -1,6 +1,8 @@
 import contextvars
 import os
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
 from datetime import datetime
+from typing import Any, Callable, Optional, Sequence, Tuple
 
 from simple_log_factory_ext_otel import TracedLogger, otel_log_factory
 
@@ -17,6 +19,75 @@ def get_request_id():
     except LookupError:
         return None
 
+def get_env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+
+    try:
+        return int(value)
+    except ValueError as e:
+        raise ValueError(f"Environment variable '{name}' must be an integer. Got: [{value}]") from e
+
+def get_env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+
+    try:
+        return float(value)
+    except ValueError as e:
+        raise ValueError(f"Environment variable '{name}' must be a number. Got: [{value}]") from e
+
+def get_env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+def submit_with_context(executor: Executor, func: Callable[..., Any], *args, **kwargs) -> Future:
+    """Submit a callable to an executor, carrying the caller's context variables along.
+
+    Plain executors start every task with an empty context, which would drop the request id
+    and the active OTEL span for anything running on a worker thread.
+    """
+    context = contextvars.copy_context()
+    return executor.submit(context.run, func, *args, **kwargs)
+
+def first_successful(
+        executor: Executor,
+        calls: Sequence[Callable[[], Any]],
+        is_success: Callable[[Any], bool] = bool) -> Tuple[Optional[int], Any]:
+    """Run the calls at once and return (index, result) of the first one whose result passes `is_success`.
+
+    The others aren't waited for: the ones still queued are cancelled, and the ones already running finish in the
+    background with their results dropped. A call that raises counts as failed. Returns (None, None) if every call
+    failed, unless one of them raised, in which case the first error is raised.
+    """
+    futures = {submit_with_context(executor, call): index for index, call in enumerate(calls)}
+    pending = set(futures)
+    first_error = None
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=futures.get):
+                try:
+                    result = future.result()
+                except Exception as exc:  # noqa: BLE001
+                    first_error = first_error or exc
+                    continue
+
+                if is_success(result):
+                    return futures[future], result
+    finally:
+        for future in pending:
+            future.cancel()
+
+    if first_error is not None:
+        raise first_error
+    return None, None
+
 def is_valid_year(year):
     if year is None:
         return False
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from src.utils import get_env_int, get_otel_log_handler, submit_with_context
+
+_logger = get_otel_log_handler("WorkerPool")
+_pipeline_worker_pool: Optional["BlockingWorkerPool"] = None
+
+
+class WorkerPoolSaturatedError(RuntimeError):
+    pass
+
+
+class BlockingWorkerPool:
+    """
+    Runs blocking work (pipeline, database, HTTP) on a bounded set of threads so the event loop stays free.
+
+    Capacity is `max_workers` running tasks plus `max_queue_depth` waiting ones. Anything beyond that is
+    rejected right away with WorkerPoolSaturatedError instead of piling up behind a slow upstream.
+    """
+    def __init__(self, max_workers: int, max_queue_depth: int, name: str = "pipeline"):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+
+        if max_queue_depth < 0:
+            raise ValueError("max_queue_depth must not be negative.")
+
+        self._name = name
+        self._max_workers = max_workers
+        self._max_queue_depth = max_queue_depth
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-worker")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._max_workers + self._max_queue_depth
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> Future:
+        self._acquire_slot()
+        try:
+            future = submit_with_context(self._executor, func, *args, **kwargs)
+        except RuntimeError:
+            self._release_slot(None)
+            raise
+
+        # The slot is released when the thread finishes, not when the caller stops waiting. A client that
+        # disconnects mid-request must not free capacity that is still busy.
+        future.add_done_callback(self._release_slot)
+        return future
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = self._in_flight
+            completed = self._completed
+            rejected = self._rejected
+
+        return {
+            "name": self._name,
+            "max_workers": self._max_workers,
+            "max_queue_depth": self._max_queue_depth,
+            "in_flight": in_flight,
+            "queued": max(0, in_flight - self._max_workers),
+            "completed": completed,
+            "rejected": rejected,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _acquire_slot(self) -> None:
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                rejected = self._rejected
+            else:
+                self._in_flight += 1
+                return
+
+        _logger.warning(f"Worker pool [{self._name}] is saturated. Rejected tasks so far: {rejected}")
+        raise WorkerPoolSaturatedError(
+            f"Worker pool '{self._name}' is at capacity ({self.capacity} tasks). Try again later."
+        )
+
+    def _release_slot(self, _future: Optional[Future]) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if _future is not None:
+                self._completed += 1
+
+
+def get_pipeline_worker_pool() -> BlockingWorkerPool:
+    global _pipeline_worker_pool
+
+    if _pipeline_worker_pool is not None:
+        return _pipeline_worker_pool
+
+    _pipeline_worker_pool = BlockingWorkerPool(
+        max_workers=get_env_int("PIPELINE_MAX_WORKERS", 8),
+        max_queue_depth=get_env_int("PIPELINE_MAX_QUEUE_DEPTH", 32),
+        name="pipeline",
+    )
+
+    return _pipeline_worker_pool
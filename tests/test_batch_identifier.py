@@ -0,0 +1,152 @@
+import threading
+import time
+
+from src.deadline import deadline_scope, get_deadline
+from src.media_identifiers.batch_identifier import BatchIdentifier
+
+
+class FakeCache:
+    def __init__(self, cached_titles=()):
+        self.cached_titles = {title.lower() for title in cached_titles}
+        self.batch_lookups = []
+
+    def get_cached_by_objs(self, objs):
+        self.batch_lookups.append([obj["title"] for obj in objs])
+        return [
+            {"id": f"id-{obj['title']}", "title": obj["title"]} if obj["title"].lower() in self.cached_titles else None
+            for obj in objs
+        ]
+
+
+class FakeIdentify:
+    def __init__(self, fail_on=()):
+        self.fail_on = fail_on
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, file_path):
+        with self._lock:
+            self.calls.append(file_path)
+        if any(marker in file_path for marker in self.fail_on):
+            raise RuntimeError("TMDB is down")
+        if "readme" in file_path:
+            return None
+        return {"id": f"id-{file_path}", "title": file_path}
+
+
+def test_results_keep_the_input_order():
+    files = [
+        "breaking.bad.s05e14.720p.hdtv.x264-immerse.mkv",
+        "the.matrix.1999.1080p.bluray.x264-fgt.mkv",
+        "readme.txt",
+    ]
+    identifier = BatchIdentifier(FakeIdentify(), FakeCache(), max_concurrency=2)
+
+    results = identifier.identify_many(files)
+
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert [result["input"] for result in results] == files
+    assert [result["status"] for result in results] == [200, 200, 204]
+
+
+def test_same_media_is_identified_once():
+    files = [
+        "the.matrix.1999.1080p.bluray.x264-fgt.mkv",
+        "the.matrix.1999.720p.web-dl.x264-other.mkv",
+        "the.matrix.1999.1080p.bluray.x264-fgt.mkv",
+    ]
+    identify = FakeIdentify()
+    identifier = BatchIdentifier(identify, FakeCache(), max_concurrency=4)
+
+    results = identifier.identify_many(files)
+
+    assert len(identify.calls) == 1
+    assert len({result["media"]["id"] for result in results}) == 1
+    assert all(result["status"] == 200 for result in results)
+
+
+def test_cache_hits_are_resolved_with_one_lookup():
+    files = [
+        "the.matrix.1999.1080p.bluray.x264-fgt.mkv",
+        "heat.1995.1080p.bluray.x264-group.mkv",
+        "breaking.bad.s05e14.720p.hdtv.x264-immerse.mkv",
+    ]
+    cache = FakeCache(cached_titles=["The Matrix", "Heat"])
+    identify = FakeIdentify()
+    identifier = BatchIdentifier(identify, cache, max_concurrency=4)
+
+    results = identifier.identify_many(files)
+
+    assert len(cache.batch_lookups) == 1
+    assert len(cache.batch_lookups[0]) == 3
+    assert identify.calls == ["breaking.bad.s05e14.720p.hdtv.x264-immerse.mkv"]
+    assert results[0]["media"]["id"] .lower() == "id-the matrix"
+    assert results[1]["media"]["id"].lower() == "id-heat"
+
+
+def test_a_failure_only_affects_its_own_inputs():
+    files = [
+        "heat.1995.1080p.bluray.x264-group.mkv",
+        "the.matrix.1999.1080p.bluray.x264-fgt.mkv",
+    ]
+    identifier = BatchIdentifier(FakeIdentify(fail_on=["heat"]), FakeCache(), max_concurrency=2)
+
+    results = identifier.identify_many(files)
+
+    assert results[0]["status"] == 500
+    assert results[0]["error"] == "TMDB is down"
+    assert results[1]["status"] == 200
+
+
+def test_concurrent_batches_share_the_same_threads():
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def identify(file_path):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        return {"id": f"id-{file_path}", "title": file_path}
+
+    identifier = BatchIdentifier(identify, FakeCache(), max_concurrency=2)
+    batches = [
+        ["heat.1995.mkv", "ronin.1998.mkv", "alien.1979.mkv"],
+        ["the.matrix.1999.mkv", "the.thing.1982.mkv", "jaws.1975.mkv"],
+        ["fargo.1996.mkv", "seven.1995.mkv", "casino.1995.mkv"],
+    ]
+
+    threads = [threading.Thread(target=identifier.identify_many, args=(files,)) for files in batches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    identifier.close()
+
+    assert max_running <= 2
+
+
+def test_identifications_not_started_by_the_deadline_get_a_504():
+    def identify(file_path):
+        # Keeps the only thread busy until the batch is out of time.
+        while not get_deadline().expired:
+            time.sleep(0.005)
+        return {"id": f"id-{file_path}", "title": file_path}
+
+    files = [
+        "heat.1995.1080p.bluray.x264-group.mkv",
+        "the.matrix.1999.1080p.bluray.x264-fgt.mkv",
+        "ronin.1998.1080p.bluray.x264-group.mkv",
+    ]
+    identifier = BatchIdentifier(identify, FakeCache(), max_concurrency=1)
+
+    with deadline_scope(0.05):
+        results = identifier.identify_many(files)
+    identifier.close()
+
+    assert sorted(result["status"] for result in results) == [200, 504, 504]
+    assert all("budget" in result["error"] for result in results if result["status"] == 504)
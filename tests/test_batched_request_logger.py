@@ -0,0 +1,79 @@
+import uuid
+
+from src.repositories.batched_request_logger import BatchedRequestLogger
+
+
+class FakeRequestLogger:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.batches = []
+
+    def save_batch(self, records):
+        if self.fail:
+            raise RuntimeError("database is down")
+        self.batches.append(records)
+        return len(records)
+
+    def get_recent_requests(self, limit=100):
+        return [record for batch in self.batches for record in batch][:limit]
+
+
+def _logger(repository, max_buffered=100, batch_size=10) -> BatchedRequestLogger:
+    return BatchedRequestLogger(repository, max_buffered=max_buffered, batch_size=batch_size, flush_interval=1, start_thread=False)
+
+
+def test_start_and_completion_are_written_as_one_row():
+    repository = FakeRequestLogger()
+    request_logger = _logger(repository)
+
+    request_id = request_logger.log_start("/api/guess", "file.mkv", "127.0.0.1")
+    request_logger.log_completed(request_id, 200, "media-id")
+
+    assert str(uuid.UUID(request_id)) == request_id
+    assert request_logger.get_recent_requests() == [{
+        "id": request_id,
+        "endpoint": "/api/guess",
+        "filename": "file.mkv",
+        "requester_ip": "127.0.0.1",
+        "received_at": repository.batches[0][0]["received_at"],
+        "result_status": 200,
+        "result_media_id": "media-id",
+        "responded_at": repository.batches[0][0]["responded_at"],
+        "error_message": None,
+    }]
+
+
+def test_completion_after_flush_writes_the_full_row_again():
+    repository = FakeRequestLogger()
+    request_logger = _logger(repository)
+
+    request_id = request_logger.log_start("/api/guess", "file.mkv", "127.0.0.1")
+    request_logger.flush()
+    request_logger.log_completed(request_id, 500, error_message="boom")
+    request_logger.flush()
+
+    completed = repository.batches[1][0]
+    assert completed["filename"] == "file.mkv"
+    assert completed["result_status"] == 500
+
+
+def test_full_buffer_drops_new_requests():
+    request_logger = _logger(FakeRequestLogger(), max_buffered=2)
+
+    for _ in range(3):
+        request_logger.log_start("/api/guess", "file.mkv", "127.0.0.1")
+
+    assert request_logger.stats()["buffered"] == 2
+    assert request_logger.stats()["dropped"] == 1
+
+
+def test_failed_batches_are_kept_for_the_next_flush():
+    repository = FakeRequestLogger(fail=True)
+    request_logger = _logger(repository)
+    request_logger.log_start("/api/guess", "file.mkv", "127.0.0.1")
+
+    assert request_logger.flush() == 0
+    assert request_logger.stats()["failed_batches"] == 1
+
+    repository.fail = False
+    assert request_logger.flush() == 1
@@ -0,0 +1,83 @@
+import io
+import os
+
+from src.bulk_identification import (
+    CsvResultWriter,
+    JsonlResultWriter,
+    ProgressReporter,
+    _truncate_partial_last_line,
+    iter_paths_from_root,
+    run_bulk_identification,
+)
+
+
+def _identify(file_path):
+    if "broken" in file_path:
+        raise RuntimeError("TMDB is down")
+    if file_path.endswith(".txt"):
+        return None
+    return {"id": f"id-{file_path}", "title": file_path, "media_type": "movie"}
+
+
+def _run(file_paths, writer, done_inputs=frozenset()):
+    checkpoints = []
+    run_bulk_identification(
+        file_paths,
+        _identify,
+        writer,
+        workers=2,
+        done_inputs=set(done_inputs),
+        progress=ProgressReporter(total=None, interval=3600, stream=io.StringIO()),
+        checkpoint=lambda: checkpoints.append(True),
+        checkpoint_every=2,
+    )
+    return checkpoints
+
+
+def test_walks_media_files_in_a_stable_order(tmp_path):
+    for relative_path in ["b/2.mkv", "b/1.MP4", "a/notes.txt", "a/3.avi"]:
+        path = tmp_path / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+
+    paths = [os.path.relpath(path, tmp_path) for path in iter_paths_from_root(str(tmp_path), {"mkv", "mp4", "avi"})]
+
+    assert paths == [os.path.join("a", "3.avi"), os.path.join("b", "1.MP4"), os.path.join("b", "2.mkv")]
+
+
+def test_every_path_is_written_once():
+    output = io.StringIO()
+    file_paths = ["heat.1995.mkv", "broken.mkv", "readme.txt", "ronin.1998.mkv", "the.matrix.1999.mkv"]
+
+    checkpoints = _run(file_paths, JsonlResultWriter(output))
+
+    output.seek(0)
+    # The failed path is left to be retried.
+    assert JsonlResultWriter.read_done_inputs(output) == set(file_paths) - {"broken.mkv"}
+    assert len(output.getvalue().splitlines()) == len(file_paths)
+    assert len(checkpoints) == 3
+
+
+def test_resuming_skips_the_paths_already_written_and_retries_errors():
+    first_run = io.StringIO()
+    _run(["heat.1995.mkv", "broken.mkv"], CsvResultWriter(first_run, write_header=True))
+    first_run.seek(0)
+    done_inputs = CsvResultWriter.read_done_inputs(first_run)
+
+    second_run = io.StringIO()
+    _run(["heat.1995.mkv", "broken.mkv", "ronin.1998.mkv"], CsvResultWriter(second_run, write_header=False), done_inputs)
+
+    rows = sorted(second_run.getvalue().splitlines())
+    assert done_inputs == {"heat.1995.mkv"}
+    assert len(rows) == 2
+    assert rows[0].startswith("1,broken.mkv,500,")
+    assert rows[1].startswith("2,ronin.1998.mkv,200,")
+
+
+def test_a_half_written_last_line_is_dropped(tmp_path):
+    output_path = tmp_path / "results.jsonl"
+    output_path.write_bytes(b'{"input": "heat.1995.mkv"}\n{"input": "ron')
+
+    _truncate_partial_last_line(str(output_path))
+
+    assert output_path.read_bytes() == b'{"input": "heat.1995.mkv"}\n'
@@ -0,0 +1,117 @@
+import threading
+
+import psycopg2
+import pytest
+from psycopg2 import extensions
+
+from src.repositories.connection_pool import BlockingConnectionPool, ConnectionPoolTimeoutError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self._connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute(self, query):
+        if not self._connection.alive:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.alive = True
+        self.info = type("Info", (), {"transaction_status": extensions.TRANSACTION_STATUS_IDLE})()
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+def _pool(max_connections=2, clock=None, **kwargs) -> BlockingConnectionPool:
+    options = {
+        "min_connections": 0,
+        "max_connections": max_connections,
+        "acquire_timeout": 0.05,
+        "health_check_interval": 30,
+        "max_lifetime": 1800,
+        "connect": FakeConnection,
+    }
+    options.update(kwargs)
+    if clock is not None:
+        options["clock"] = clock
+    return BlockingConnectionPool(**options)
+
+
+def test_getconn_times_out_when_exhausted():
+    pool = _pool(max_connections=1)
+    pool.getconn()
+
+    with pytest.raises(ConnectionPoolTimeoutError):
+        pool.getconn()
+
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_waiter_gets_the_returned_connection():
+    pool = _pool(max_connections=1, acquire_timeout=5)
+    first = pool.getconn()
+    acquired = []
+
+    waiter = threading.Thread(target=lambda: acquired.append(pool.getconn()))
+    waiter.start()
+    pool.putconn(first)
+    waiter.join()
+
+    assert acquired == [first]
+    assert pool.stats()["open"] == 1
+
+
+def test_dead_idle_connection_is_replaced():
+    clock = FakeClock()
+    pool = _pool(clock=clock)
+    first = pool.getconn()
+    pool.putconn(first)
+
+    first.alive = False
+    clock.now = 60
+    second = pool.getconn()
+
+    assert second is not first
+    assert first.closed
+    assert pool.stats()["failed_health_checks"] == 1
+
+
+def test_old_connection_is_recycled_and_open_transactions_are_rolled_back():
+    clock = FakeClock()
+    pool = _pool(clock=clock, max_lifetime=100)
+    first = pool.getconn()
+    first.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+    pool.putconn(first)
+
+    assert first.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE
+    assert pool.getconn() is first
+
+    pool.putconn(first)
+    clock.now = 100
+
+    assert pool.getconn() is not first
+    assert pool.stats()["recycled"] == 1
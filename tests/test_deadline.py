@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.deadline import (
+    Deadline,
+    DeadlineExceededError,
+    check_deadline,
+    deadline_scope,
+    get_deadline,
+    remaining_budget,
+    with_deadline,
+)
+from src.utils import submit_with_context
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_remaining_counts_down_to_zero():
+    clock = FakeClock()
+    deadline = Deadline(5, clock=clock)
+
+    clock.now += 2
+    assert deadline.remaining() == 3
+    assert not deadline.expired
+
+    clock.now += 10
+    assert deadline.remaining() == 0
+    assert deadline.expired
+
+
+def test_no_budget_leaves_limits_as_they_are():
+    assert get_deadline() is None
+    assert remaining_budget(10) == 10
+    assert remaining_budget() is None
+
+    with deadline_scope(0):
+        assert get_deadline() is None
+        check_deadline("anything")
+
+
+def test_remaining_budget_caps_limits():
+    with deadline_scope(2):
+        assert remaining_budget(10) <= 2
+        assert remaining_budget(1) == 1
+
+    assert get_deadline() is None
+
+
+def test_inner_scopes_keep_the_sooner_deadline():
+    with deadline_scope(2) as outer:
+        with deadline_scope(30) as inner:
+            assert inner is outer
+        with deadline_scope(1) as inner:
+            assert inner is not outer
+            assert inner.budget_seconds == 1
+
+
+def test_check_deadline_raises_once_expired():
+    with deadline_scope(0.001):
+        deadline = get_deadline()
+        while not deadline.expired:
+            pass
+
+        with pytest.raises(DeadlineExceededError, match="TMDB"):
+            check_deadline("a TMDB call")
+
+
+def test_deadline_follows_work_to_other_threads():
+    with deadline_scope(5) as deadline, ThreadPoolExecutor(max_workers=1) as executor:
+        assert submit_with_context(executor, get_deadline).result() is deadline
+
+
+def test_with_deadline_gives_every_call_its_own_budget():
+    deadlines = []
+    wrapped = with_deadline(lambda: deadlines.append(get_deadline()), 5)
+
+    wrapped()
+    wrapped()
+
+    assert deadlines[0] is not None
+    assert deadlines[0] is not deadlines[1]
+    assert get_deadline() is None
@@ -0,0 +1,42 @@
+import pytest
+from guessit import guessit
+
+from src.media_identifiers.media_identification_tasks import guessit_tasks
+from src.media_identifiers.media_identification_tasks.guessit_tasks import (
+    _fast_parse_candidate,
+    _normalize_guessit_metadata,
+)
+from fixtures.scene_name_corpus import CANONICAL_SCENE_NAMES, NON_CANONICAL_SCENE_NAMES
+
+_COMPARED_FIELDS = ("title", "type", "year", "season", "episode", "episode_title")
+
+
+def _fields(metadata: dict) -> dict:
+    normalized = _normalize_guessit_metadata(metadata)
+    return {field: normalized.get(field) for field in _COMPARED_FIELDS}
+
+
+@pytest.mark.parametrize("name", CANONICAL_SCENE_NAMES)
+def test_fast_path_agrees_with_guessit(name):
+    fast_metadata = _fast_parse_candidate(name)
+
+    assert fast_metadata is not None
+    assert _fields(fast_metadata) == _fields(dict(guessit(name)))
+
+
+@pytest.mark.parametrize("name", NON_CANONICAL_SCENE_NAMES)
+def test_ambiguous_names_fall_back_to_guessit(name):
+    assert _fast_parse_candidate(name) is None
+
+
+def test_disabled_fast_path_sends_every_name_to_guessit(monkeypatch):
+    parsed = []
+    monkeypatch.setattr(guessit_tasks, "guessit", lambda candidate: parsed.append(candidate) or {"title": "Heat"})
+    monkeypatch.setattr(guessit_tasks, "get_guessit_process_pool", lambda: None)
+
+    guessit_tasks._run_guessit("Heat.1995.mkv")
+    assert parsed == []
+
+    monkeypatch.setattr(guessit_tasks, "_fast_path_enabled", False)
+    guessit_tasks._run_guessit("Heat.1995.mkv")
+    assert parsed == ["Heat.1995.mkv"]
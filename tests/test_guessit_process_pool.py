@@ -0,0 +1,39 @@
+import os
+import signal
+
+import pytest
+from guessit import guessit
+
+from src.guessit_process_pool import GuessItProcessPool
+
+_CANDIDATE = "Breaking.Bad.S05E14.720p.HDTV.x264-IMMERSE.mkv"
+
+
+@pytest.fixture
+def pool():
+    process_pool = GuessItProcessPool(max_workers=1, max_queue_depth=0, task_timeout=30)
+    yield process_pool
+    process_pool.shutdown(wait=True)
+
+
+def test_worker_result_matches_in_process_guessit(pool):
+    assert pool.guess(_CANDIDATE) == dict(guessit(_CANDIDATE))
+    assert pool.stats()["completed"] == 1
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGKILL"), reason="Needs SIGKILL to kill the worker process.")
+def test_pool_is_replaced_when_a_worker_dies(pool):
+    pool.guess(_CANDIDATE)
+    for pid in list(pool._executor._processes):
+        os.kill(pid, signal.SIGKILL)
+
+    assert pool.guess(_CANDIDATE) == dict(guessit(_CANDIDATE))
+    assert pool.stats()["restarts"] == 1
+    assert pool.guess("The.Matrix.1999.1080p.BluRay.x264.mkv")["title"] == "The Matrix"
+
+
+def test_caller_parses_when_pool_is_full(pool):
+    pool._in_flight = pool.capacity
+
+    assert pool.guess(_CANDIDATE)["title"] == "Breaking Bad"
+    assert pool.stats()["inline"] == 1
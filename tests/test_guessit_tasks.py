@@ -1,4 +1,7 @@
+from src.media_identifiers.media_identification_tasks import guessit_tasks
 from src.media_identifiers.media_identification_tasks.guessit_tasks import _build_fallback_input
+from src.memory_cache import TTLLRUCache
+from fixtures.scene_name_corpus import FILE_PATHS
 
 
 def test_build_fallback_input_limits_noisy_path_segments():
@@ -83,3 +86,124 @@ def test_build_fallback_input_prefers_release_folder_over_file():
 
     assert "pulse.3.2008" in fallback_lower
     assert "gua" not in fallback_lower
+
+
+def test_release_folder_is_parsed_once_for_every_file(monkeypatch):
+    parsed = []
+    real_guessit = guessit_tasks.guessit
+
+    def counting_guessit(candidate):
+        parsed.append(candidate)
+        return real_guessit(candidate)
+
+    monkeypatch.setattr(guessit_tasks, "guessit", counting_guessit)
+    monkeypatch.setattr(guessit_tasks, "_guessit_cache", TTLLRUCache(max_entries=100, default_ttl=None, name="test"))
+
+    release = "/data/completed/Death.Proof.2007.1080p.BluRay.x264-1920"
+    results = [
+        guessit_tasks.identify_media_with_guess_it(f"{release}/{file_name}")
+        for file_name in ("1920-proof.r00", "1920-proof.r01", "1920-proof.nfo", "1920-proof.sfv")
+    ]
+
+    assert all(result["title"] == "Death Proof" for result in results)
+    assert len(parsed) == len(set(parsed))
+    assert guessit_tasks.get_guessit_cache().stats()["hits"] > 0
+
+
+def test_candidate_variants_share_one_memo_entry(monkeypatch):
+    parsed = []
+    real_guessit = guessit_tasks.guessit
+
+    def counting_guessit(candidate):
+        parsed.append(candidate)
+        return real_guessit(candidate)
+
+    monkeypatch.setattr(guessit_tasks, "guessit", counting_guessit)
+    monkeypatch.setattr(guessit_tasks, "_guessit_cache", TTLLRUCache(max_entries=100, default_ttl=None, name="test"))
+
+    first = guessit_tasks._guess_candidate("Death Proof 2007 Grindhouse Cut")
+    second = guessit_tasks._guess_candidate("  DEATH PROOF 2007 grindhouse cut ")
+
+    assert parsed == ["Death Proof 2007 Grindhouse Cut"]
+    assert second == first
+    assert len(guessit_tasks.get_guessit_cache()) == 1
+
+
+def test_candidate_identifications_start_with_the_best_one():
+    for file_path in FILE_PATHS:
+        identifications = guessit_tasks.identify_media_candidates_with_guess_it(file_path, limit=3)
+        best = guessit_tasks.identify_media_with_guess_it(file_path)
+
+        if best is not None:
+            assert identifications[0] == best, file_path
+        # Plus the file name on its own.
+        assert len(identifications) <= 4
+        titles = [(item["title"].lower(), item["media_type"], item["year"], item["season"], item["episode"])
+                  for item in identifications]
+        assert len(titles) == len(set(titles))
+
+
+def test_candidate_identifications_include_other_path_segments():
+    identifications = guessit_tasks.identify_media_candidates_with_guess_it(
+        "/media/Movies/Heat (1995)/The.Insider.1999.1080p.BluRay.x264.mkv", limit=5)
+
+    assert {"Heat", "The Insider"} <= {item["title"] for item in identifications}
+
+
+def test_candidate_identifications_include_the_file_name_on_its_own():
+    file_path = "/downloads/my favourite collection of great films/heat.1995.mkv"
+    # The file name has fewer meaningful tokens than its folder, so it isn't one of the path's candidates.
+    assert guessit_tasks._generate_guessit_inputs(file_path) == ["my favourite collection of great films"]
+
+    identifications = guessit_tasks.identify_media_candidates_with_guess_it(file_path, limit=3)
+
+    assert identifications[0]["title"] == "my favourite collection of great films"
+    assert (identifications[-1]["title"], identifications[-1]["year"]) == ("heat", 1995)
+
+
+def test_candidate_score_upper_bound_is_never_below_the_score():
+    for file_path in FILE_PATHS:
+        for index, candidate in enumerate(guessit_tasks._generate_guessit_inputs(file_path)):
+            scored = guessit_tasks._score_candidate(candidate, index)
+            if scored is not None:
+                assert guessit_tasks._candidate_score_upper_bound(candidate, index) >= scored[0], candidate
+
+
+def test_ranked_evaluation_picks_the_same_candidate_with_fewer_parses(monkeypatch):
+    parsed = []
+    real_score_candidate = guessit_tasks._score_candidate
+
+    def counting_score_candidate(candidate, index):
+        parsed.append(candidate)
+        return real_score_candidate(candidate, index)
+
+    monkeypatch.setattr(guessit_tasks, "_score_candidate", counting_score_candidate)
+    skipped_before = guessit_tasks.get_guessit_stats()["candidates_skipped"]
+
+    candidate_count = 0
+    for file_path in FILE_PATHS:
+        candidates = guessit_tasks._generate_guessit_inputs(file_path)
+        candidate_count += len(candidates)
+        expected = guessit_tasks._pick_best_candidate(candidates)
+
+        parsed.clear()
+        assert guessit_tasks._pick_best_candidate_ranked(candidates) == expected, file_path
+        assert len(parsed) <= len(candidates)
+
+    skipped = guessit_tasks.get_guessit_stats()["candidates_skipped"] - skipped_before
+    assert skipped > 0
+
+
+def test_ranked_evaluation_keeps_the_earlier_candidate_on_a_tie(monkeypatch):
+    def guess(candidate):
+        if candidate.startswith("unparsable"):
+            return None
+        return {"title": "Heat", "type": "movie", "candidate": candidate}
+
+    monkeypatch.setattr(guessit_tasks, "_guess_candidate", guess)
+    # Past the third candidate there's no positional bonus, so the last two score the same. The last one could score
+    # more, so it's parsed first, and the earlier one still has to be parsed to win the tie.
+    candidates = ["unparsable one", "unparsable two", "unparsable three", "Heat aa", "Heat bb cc"]
+
+    assert guessit_tasks._pick_best_candidate(candidates)["candidate"] == "Heat aa"
+    assert guessit_tasks._pick_best_candidate_ranked(candidates)["candidate"] == "Heat aa"
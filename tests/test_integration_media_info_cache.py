@@ -0,0 +1,261 @@
+import os
+import uuid
+
+import psycopg2
+import pytest
+
+REQUIRED_ENV_VARS = [
+    "POSTGRES_HOST",
+    "POSTGRES_PORT",
+    "POSTGRES_USER",
+    "POSTGRES_PASSWORD",
+]
+
+_missing_env = [env for env in REQUIRED_ENV_VARS if not os.environ.get(env)]
+if _missing_env:
+    pytest.skip(
+        f"Skipping integration tests: missing environment variables {_missing_env}",
+        allow_module_level=True,
+    )
+
+from src.repositories.connection_pool import BlockingConnectionPool
+from src.repositories.media_info_cache import MediaInfoCache
+
+
+def _connection_kwargs() -> dict:
+    return {
+        "host": os.environ["POSTGRES_HOST"],
+        "port": int(os.environ["POSTGRES_PORT"]),
+        "user": os.environ["POSTGRES_USER"],
+        "password": os.environ["POSTGRES_PASSWORD"],
+        "dbname": os.environ.get("POSTGRES_DB", "extended_media_info"),
+    }
+
+
+def _run_sql(statement: str) -> None:
+    conn = psycopg2.connect(**_connection_kwargs())
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(statement)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def schema():
+    # Every test gets its own scratch schema, so it never touches the real cache tables. uuid-ossp goes in public
+    # first: created from the scratch schema, dropping it would cascade to every uuid_generate_v4() default.
+    name = f"media_info_cache_test_{uuid.uuid4().hex[:12]}"
+    _run_sql(f'CREATE EXTENSION IF NOT EXISTS "uuid-ossp" SCHEMA public; CREATE SCHEMA {name};')
+    yield name
+    _run_sql(f"DROP SCHEMA IF EXISTS {name} CASCADE;")
+
+
+@pytest.fixture
+def pool(schema):
+    pool = BlockingConnectionPool(
+        min_connections=0,
+        max_connections=2,
+        acquire_timeout=5,
+        health_check_interval=60,
+        max_lifetime=3600,
+        options=f"-c search_path={schema},public",
+        **_connection_kwargs(),
+    )
+    yield pool
+    pool.closeall()
+
+
+@pytest.fixture
+def cache(pool):
+    return MediaInfoCache(pool)
+
+
+def _movie(tmdb_id: int, title: str, year: int, searchable_reference: str = None) -> dict:
+    return {
+        "searchable_reference": searchable_reference or title.lower(),
+        "tmdb_id": tmdb_id,
+        "title": title,
+        "original_title": title,
+        "media_type": "movie",
+        "year": year,
+    }
+
+
+def _episode(tmdb_id: int, title: str, year: int, season: int, episode: int) -> dict:
+    return {
+        "searchable_reference": title.lower(),
+        "tmdb_id": tmdb_id,
+        "tmdb_series_id": 1000,
+        "title": title,
+        "original_title": title,
+        "media_type": "tv",
+        "year": year,
+        "season": season,
+        "episode": episode,
+    }
+
+
+def _lookup_rows(pool, media_id) -> set:
+    conn = pool.getconn()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT lookup_field, lookup_key, media_type, year, season, episode FROM cached_media_lookup "
+                "WHERE media_id = %s;",
+                (media_id,),
+            )
+            return set(cursor.fetchall())
+    finally:
+        pool.putconn(conn)
+
+
+def test_insert_fills_the_lookup_table(cache, pool):
+    cached = cache.cache_data(_movie(1, "Shin Godzilla", 2016, searchable_reference="shin godzilla 2016"))
+
+    assert _lookup_rows(pool, cached["id"]) == {
+        ("title", "shin godzilla", "movie", 2016, 0, 0),
+        ("searchable_reference", "shin godzilla 2016", "movie", 2016, 0, 0),
+    }
+
+
+def test_cache_many_skips_cached_tmdb_ids_and_fills_the_lookup_table(cache):
+    cache.cache_data(_episode(11, "Dark", 2017, 1, 1))
+
+    # The titles carry a % to check the rendered VALUES list isn't interpolated a second time.
+    inserted = cache.cache_many([
+        _episode(11, "Dark", 2017, 1, 1),
+        _episode(12, "Dark", 2017, 1, 2),
+        _episode(13, "100% Dark", 2017, 1, 3),
+    ])
+
+    assert inserted == 2
+    assert cache.get_cached_by_obj({"title": "Dark", "media_type": "tv", "season": 1, "episode": 2})["tmdb_id"] == 12
+    assert cache.get_cached_by_tmdb_id(13)["title"] == "100% Dark"
+
+
+def test_update_resyncs_the_lookup_table(cache, pool):
+    cached = cache.cache_data(_movie(1, "Working Title", 2016))
+
+    cache.update_cache({"id": cached["id"], "title": "Final Title", "searchable_reference": "final title"})
+
+    assert _lookup_rows(pool, cached["id"]) == {
+        ("title", "final title", "movie", 2016, 0, 0),
+        ("searchable_reference", "final title", "movie", 2016, 0, 0),
+    }
+    assert cache.get_cached_by_obj({"title": "Working Title", "media_type": "movie", "year": 2016}) is None
+    assert cache.get_cached_by_obj({"title": "Final Title", "media_type": "movie", "year": 2016})["id"] == cached["id"]
+
+
+def test_existing_rows_are_backfilled_when_the_lookup_table_is_created(cache, pool):
+    cached = cache.cache_data(_movie(1, "Shin Godzilla", 2016))
+
+    conn = pool.getconn()
+    try:
+        with conn.cursor() as cursor:
+            # Puts the schema back where it was before the lookup table existed, with a row already cached.
+            cursor.execute("DROP TRIGGER trg_sync_cached_media_lookup ON cached_media;")
+            cursor.execute("DROP TABLE cached_media_lookup;")
+        conn.commit()
+    finally:
+        pool.putconn(conn)
+
+    MediaInfoCache(pool)
+
+    assert _lookup_rows(pool, cached["id"]) == {
+        ("title", "shin godzilla", "movie", 2016, 0, 0),
+        ("searchable_reference", "shin godzilla", "movie", 2016, 0, 0),
+    }
+    assert cache.get_cached_by_obj({"title": "shin GODZILLA", "media_type": "movie", "year": 2016})["id"] == cached["id"]
+
+
+def test_names_only_match_the_column_they_came_from(cache):
+    # The old query compared the title to cached titles, and the given searchable reference and the one built from
+    # the title to cached searchable references. A searchable reference never matched a cached title.
+    cache.cache_data(_movie(1, "Alien", 1979, searchable_reference="alien directors cut"))
+
+    assert cache.get_cached_by_obj({"title": "ALIEN", "media_type": "movie", "year": 1979})["tmdb_id"] == 1
+    assert cache.get_cached_by_obj(
+        {"title": "Something Else", "searchable_reference": "Alien Directors Cut", "media_type": "movie", "year": 1979}
+    )["tmdb_id"] == 1
+    assert cache.get_cached_by_obj(
+        {"title": "Something Else", "searchable_reference": "alien", "media_type": "movie", "year": 1979}
+    ) is None
+    assert cache.get_cached_by_obj({"title": "Alien Directors Cut", "media_type": "movie", "year": 1979}) is not None
+
+
+def test_movies_ignore_season_and_episode(cache):
+    cache.cache_data(_movie(1, "Alien", 1979))
+
+    assert cache.get_cached_by_obj({"title": "Alien", "media_type": "movie", "season": 2, "episode": 3})["tmdb_id"] == 1
+
+
+def test_year_is_only_filtered_when_valid(cache):
+    cache.cache_data(_movie(1, "Alien", 1979))
+
+    assert cache.get_cached_by_obj({"title": "Alien", "media_type": "movie"})["tmdb_id"] == 1
+    assert cache.get_cached_by_obj({"title": "Alien", "media_type": "movie", "year": 1986}) is None
+
+
+def test_episodes_need_season_and_episode(cache):
+    cache.cache_data(_episode(11, "Dark", 2017, 1, 1))
+
+    assert cache.get_cached_by_obj({"title": "Dark", "media_type": "tv", "season": 1, "episode": 1})["tmdb_id"] == 11
+    assert cache.get_cached_by_obj({"title": "Dark", "media_type": "tv", "season": 1}) is None
+    assert cache.get_cached_by_obj({"title": "Dark", "media_type": "tv", "season": 1, "episode": 2}) is None
+
+
+def test_get_cached_by_objs_returns_one_result_per_object_in_input_order(cache):
+    alien = cache.cache_data(_movie(1, "Alien", 1979))
+    heat = cache.cache_data(_movie(2, "Heat", 1995, searchable_reference="heat directors cut"))
+    first_episode = cache.cache_data(_episode(11, "Dark", 2017, 1, 1))
+    second_episode = cache.cache_data(_episode(12, "Dark", 2017, 1, 2))
+
+    results = cache.get_cached_by_objs([
+        {"title": "Dark", "media_type": "tv", "season": 1, "episode": 2},
+        {"title": "Missing", "media_type": "movie", "year": 2001},
+        {"title": "alien", "media_type": "movie", "year": 1979},
+        {"title": "Something Else", "searchable_reference": "Heat Directors Cut", "media_type": "movie"},
+        {"title": "Dark", "media_type": "tv", "season": 1},
+        {"title": "Alien", "media_type": "movie", "year": 1979},
+        {"title": "Dark", "media_type": "tv", "season": 1, "episode": 1},
+        {"title": "Dark", "media_type": "movie"},
+        {"title": "Alien", "media_type": "movie", "year": 1986},
+        {"title": "Dark", "media_type": "tv", "season": 1, "episode": 2},
+    ])
+
+    assert [result and result["id"] for result in results] == [
+        second_episode["id"],
+        None,
+        alien["id"],
+        heat["id"],
+        None,
+        alien["id"],
+        first_episode["id"],
+        None,
+        None,
+        second_episode["id"],
+    ]
+    assert all("wanted_position" not in result for result in results if result)
+
+
+def test_get_cached_by_objs_matches_get_cached_by_obj(cache):
+    cache.cache_data(_movie(1, "Alien", 1979, searchable_reference="alien directors cut"))
+    cache.cache_data(_episode(11, "Dark", 2017, 1, 1))
+    objs = [
+        {"title": "ALIEN", "media_type": "movie", "year": 1979},
+        {"title": "Alien", "media_type": "movie", "season": 2, "episode": 3},
+        {"title": "Something Else", "searchable_reference": "alien", "media_type": "movie"},
+        {"title": "Alien Directors Cut", "media_type": "movie"},
+        {"title": "Dark", "media_type": "tv", "season": 1, "episode": 1},
+        {"title": "Dark", "media_type": "tv", "season": 1, "episode": 1, "year": 2018},
+        {"title": "Dark", "media_type": "documentary", "season": 1, "episode": 1},
+    ]
+
+    assert cache.get_cached_by_objs(objs) == [cache.get_cached_by_obj(obj) for obj in objs]
+
+
+def test_get_cached_by_objs_without_lookups(cache):
+    assert cache.get_cached_by_objs([]) == []
+    assert cache.get_cached_by_objs([{"title": "Dark", "media_type": "tv"}]) == [None]
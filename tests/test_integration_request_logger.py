@@ -0,0 +1,107 @@
+import os
+import uuid
+from datetime import datetime, timedelta, UTC
+
+import psycopg2
+import pytest
+
+REQUIRED_ENV_VARS = [
+    "POSTGRES_HOST",
+    "POSTGRES_PORT",
+    "POSTGRES_USER",
+    "POSTGRES_PASSWORD",
+]
+
+_missing_env = [env for env in REQUIRED_ENV_VARS if not os.environ.get(env)]
+if _missing_env:
+    pytest.skip(
+        f"Skipping integration tests: missing environment variables {_missing_env}",
+        allow_module_level=True,
+    )
+
+from src.repositories.connection_pool import BlockingConnectionPool
+from src.repositories.request_logger import RequestLogger
+
+
+def _connection_kwargs() -> dict:
+    return {
+        "host": os.environ["POSTGRES_HOST"],
+        "port": int(os.environ["POSTGRES_PORT"]),
+        "user": os.environ["POSTGRES_USER"],
+        "password": os.environ["POSTGRES_PASSWORD"],
+        "dbname": os.environ.get("POSTGRES_DB", "extended_media_info"),
+    }
+
+
+def _run_sql(statement: str) -> None:
+    conn = psycopg2.connect(**_connection_kwargs())
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(statement)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@pytest.fixture
+def pool():
+    # A scratch schema, so the test never touches the real request history. uuid-ossp goes in public first:
+    # created from the scratch schema, dropping it would cascade to every uuid_generate_v4() default.
+    schema = f"request_logger_test_{uuid.uuid4().hex[:12]}"
+    _run_sql(f'CREATE EXTENSION IF NOT EXISTS "uuid-ossp" SCHEMA public; CREATE SCHEMA {schema};')
+    pool = BlockingConnectionPool(
+        min_connections=0,
+        max_connections=1,
+        acquire_timeout=5,
+        health_check_interval=60,
+        max_lifetime=3600,
+        options=f"-c search_path={schema},public",
+        **_connection_kwargs(),
+    )
+    yield pool
+    pool.closeall()
+    _run_sql(f"DROP SCHEMA IF EXISTS {schema} CASCADE;")
+
+
+def _history(pool) -> dict:
+    conn = pool.getconn()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT id::text, filename, result_status, error_message FROM request_history;")
+            return {row[0]: row[1:] for row in cursor.fetchall()}
+    finally:
+        pool.putconn(conn)
+
+
+def test_save_batch_inserts_new_rows_and_completes_started_ones(pool):
+    repository = RequestLogger(pool)
+    started_id = repository.log_start("/api/guess", "Heat.1995.mkv", "127.0.0.1")
+    new_id = str(uuid.uuid4())
+    received_at = datetime.now(UTC)
+
+    saved = repository.save_batch([
+        {
+            "id": started_id,
+            "endpoint": "/api/guess",
+            "filename": "Heat.1995.mkv",
+            "requester_ip": "127.0.0.1",
+            "received_at": received_at,
+            "result_status": 200,
+            "responded_at": received_at + timedelta(seconds=1),
+        },
+        {
+            "id": new_id,
+            "endpoint": "/api/guess",
+            "filename": "100% Heat.mkv",
+            "requester_ip": "127.0.0.1",
+            "received_at": received_at,
+            "result_status": 500,
+            "error_message": "boom",
+        },
+    ])
+
+    assert saved == 2
+    assert _history(pool) == {
+        started_id: ("Heat.1995.mkv", 200, None),
+        new_id: ("100% Heat.mkv", 500, "boom"),
+    }
@@ -0,0 +1,44 @@
+from src.media_identifiers import media_identifier
+from src.media_identifiers.media_identifier import MediaIdentifier
+
+
+class _FakeCache:
+    def __init__(self):
+        self.cached = []
+
+    def get_cached_by_tmdb_id(self, tmdb_id):
+        return None
+
+    def get_cached_tv_episode(self, tmdb_series_id, season, episode):
+        return None
+
+    def cache_data(self, record):
+        self.cached.append(record)
+        return {**record, "id": "cached"}
+
+
+def _identifier(monkeypatch, cache):
+    monkeypatch.setattr(media_identifier, "get_repository", lambda name: cache)
+    return MediaIdentifier()
+
+
+def _episode(**media):
+    return {"title": "Dark", "media_type": "tv", "season": 1, "episode": 2, "tmdb_series_id": 70523, **media}
+
+
+def test_episode_with_only_the_series_id_is_not_cached(monkeypatch):
+    cache = _FakeCache()
+    identifier = _identifier(monkeypatch, cache)
+    media = _episode(tmdb_id=70523)
+
+    # Caching it would store the episode under the series' tmdb_id, and every later episode would get this row.
+    assert identifier._persist_media(media) is media
+    assert cache.cached == []
+
+
+def test_episode_with_its_own_tmdb_id_is_cached(monkeypatch):
+    cache = _FakeCache()
+    identifier = _identifier(monkeypatch, cache)
+
+    assert identifier._persist_media(_episode(tmdb_id=1337))["id"] == "cached"
+    assert [record["tmdb_id"] for record in cache.cached] == [1337]
@@ -0,0 +1,101 @@
+from src.memory_cache import TTLLRUCache
+from src.repositories.media_info_l1_cache import MediaInfoL1Cache
+
+
+class FakeMediaInfoCache:
+    def __init__(self):
+        self.rows = {}
+        self.lookups = 0
+
+    def get_cached_by_obj(self, obj):
+        self.lookups += 1
+        return next((dict(row) for row in self.rows.values() if row["title"].lower() == obj["title"].lower()), None)
+
+    def get_cached_by_objs(self, objs):
+        self.lookups += 1
+        return [
+            next((dict(row) for row in self.rows.values() if row["title"].lower() == obj["title"].lower()), None)
+            for obj in objs
+        ]
+
+    def get_cached_by_tmdb_id(self, tmdb_id):
+        self.lookups += 1
+        return next((dict(row) for row in self.rows.values() if row["tmdb_id"] == tmdb_id), None)
+
+    def cache_data(self, new_record):
+        row = {**new_record, "id": f"id-{len(self.rows) + 1}"}
+        self.rows[row["id"]] = row
+        return dict(row)
+
+    def update_cache(self, new_record):
+        self.rows[new_record["id"]].update(new_record)
+
+
+def _l1_cache(repository) -> MediaInfoL1Cache:
+    return MediaInfoL1Cache(repository, TTLLRUCache(max_entries=100, default_ttl=None, name="test"))
+
+
+def _movie() -> dict:
+    return {"title": "Heat", "media_type": "movie", "year": 1995, "tmdb_id": 949}
+
+
+def test_hits_are_served_from_memory():
+    repository = FakeMediaInfoCache()
+    repository.cache_data(_movie())
+    cache = _l1_cache(repository)
+
+    first = cache.get_cached_by_obj(_movie())
+    second = cache.get_cached_by_obj(_movie())
+    by_tmdb_id = cache.get_cached_by_tmdb_id(949)
+
+    assert first == second == by_tmdb_id
+    assert repository.lookups == 1
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_batch_lookups_only_send_memory_misses_to_the_database():
+    repository = FakeMediaInfoCache()
+    repository.cache_data(_movie())
+    repository.cache_data({"title": "Ronin", "media_type": "movie", "year": 1998, "tmdb_id": 8195})
+    cache = _l1_cache(repository)
+    cache.get_cached_by_obj(_movie())
+    ronin = {"title": "Ronin", "media_type": "movie", "year": 1998}
+    unknown = {"title": "Unknown", "media_type": "movie", "year": 2001}
+
+    results = cache.get_cached_by_objs([ronin, _movie(), unknown])
+
+    assert [result["tmdb_id"] if result else None for result in results] == [8195, 949, None]
+    assert repository.lookups == 2
+    assert cache.get_cached_by_obj(ronin)["tmdb_id"] == 8195
+    assert repository.lookups == 2
+
+
+def test_misses_are_not_cached():
+    repository = FakeMediaInfoCache()
+    cache = _l1_cache(repository)
+
+    assert cache.get_cached_by_obj(_movie()) is None
+    repository.cache_data(_movie())
+
+    assert cache.get_cached_by_obj(_movie())["tmdb_id"] == 949
+
+
+def test_writes_go_through_to_memory():
+    repository = FakeMediaInfoCache()
+    cache = _l1_cache(repository)
+
+    cached = cache.cache_data(_movie())
+    cache.update_cache({"id": cached["id"], "overview": "A heist."})
+
+    assert cache.get_cached_by_tmdb_id(949)["overview"] == "A heist."
+    assert repository.lookups == 0
+
+
+def test_returned_records_are_copies():
+    cache = _l1_cache(FakeMediaInfoCache())
+    cache.cache_data(_movie())
+
+    cache.get_cached_by_tmdb_id(949)["title"] = "Changed"
+
+    assert cache.get_cached_by_tmdb_id(949)["title"] == "Heat"
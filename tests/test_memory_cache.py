@@ -0,0 +1,44 @@
+from src.memory_cache import TTLLRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_evicts_least_recently_used_entry():
+    cache = TTLLRUCache(max_entries=2, default_ttl=None, name="test")
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLLRUCache(max_entries=10, default_ttl=5, name="test", clock=clock)
+
+    cache.set("default", "value")
+    cache.set("custom", "value", ttl=60)
+    clock.now = 10
+
+    assert cache.get("default") is None
+    assert cache.get("custom") == "value"
+    assert cache.stats()["expirations"] == 1
+
+
+def test_none_values_are_not_cached():
+    cache = TTLLRUCache(max_entries=10, default_ttl=None, name="test")
+
+    cache.set("key", None)
+
+    assert len(cache) == 0
@@ -0,0 +1,70 @@
+from src.media_identifiers.openai_extraction_cache import OpenAIExtractionCache, hash_input, normalize_input
+from src.media_identifiers.prompt_registry import RenderedPrompt
+from src.memory_cache import TTLLRUCache
+
+_PROMPT = RenderedPrompt(name="extract_movie_title_ai_function", prefix="prefix", version="aaaaaaaaaaaa")
+_FILE_PATH = r"tmp\Death.Proof.2007.1080p.BluRay.x264-1920\1920-proof.rar"
+
+
+class _FakeRepository:
+    def __init__(self, fail: bool = False):
+        self.rows = {}
+        self.fail = fail
+
+    def get_output(self, ai_function, prompt_version, input_hash):
+        if self.fail:
+            raise RuntimeError("database is down")
+        return self.rows.get((ai_function, prompt_version, input_hash))
+
+    def save_output(self, ai_function, prompt_version, input_hash, ai_input, output, ttl_seconds):
+        if self.fail:
+            raise RuntimeError("database is down")
+        self.rows[(ai_function, prompt_version, input_hash)] = output
+
+
+def _cache(repository=None) -> OpenAIExtractionCache:
+    return OpenAIExtractionCache(TTLLRUCache(max_entries=10, default_ttl=None, name="test"), 60, repository)
+
+
+def test_normalized_input_ignores_separators_and_spacing():
+    assert normalize_input(_FILE_PATH) == normalize_input(" tmp/Death.Proof.2007.1080p.BluRay.x264-1920/1920-proof.rar ")
+
+
+def test_answers_are_keyed_by_prompt_version():
+    cache = _cache()
+    cache.set(_PROMPT, _FILE_PATH, "Death Proof")
+
+    changed_prompt = RenderedPrompt(name=_PROMPT.name, prefix="new prefix", version="bbbbbbbbbbbb")
+
+    assert cache.get(_PROMPT, _FILE_PATH.replace("\\", "/")) == "Death Proof"
+    assert cache.get(changed_prompt, _FILE_PATH) is None
+
+
+def test_failed_calls_are_not_cached():
+    repository = _FakeRepository()
+    cache = _cache(repository)
+
+    cache.set(_PROMPT, _FILE_PATH, None)
+
+    assert repository.rows == {}
+    assert cache.get(_PROMPT, _FILE_PATH) is None
+
+
+def test_persistent_tier_survives_a_new_process():
+    repository = _FakeRepository()
+    _cache(repository).set(_PROMPT, _FILE_PATH, "Death Proof")
+
+    cache = _cache(repository)
+
+    assert (_PROMPT.name, _PROMPT.version, hash_input(normalize_input(_FILE_PATH))) in repository.rows
+    assert cache.get(_PROMPT, _FILE_PATH) == "Death Proof"
+    assert cache.stats()["persistent"]["hits"] == 1
+
+
+def test_persistent_errors_fall_back_to_memory():
+    cache = _cache(_FakeRepository(fail=True))
+
+    cache.set(_PROMPT, _FILE_PATH, "Death Proof")
+
+    assert cache.get(_PROMPT, _FILE_PATH) == "Death Proof"
+    assert cache.stats()["persistent"]["errors"] == 1
@@ -0,0 +1,51 @@
+import pytest
+
+from src.media_identifiers.media_identification_tasks import openai_tasks
+from src.media_identifiers.openai_identifier import parse_media_details
+
+
+def test_parse_media_details_validates_the_schema():
+    details = parse_media_details('{"media_type": "TV", "title": " Fargo ", "year": 2014, "season": 1, "episode": 2}')
+
+    assert details == {"media_type": "tv", "title": "Fargo", "year": 2014, "season": 1, "episode": 2}
+    assert parse_media_details('{"media_type": "unknown", "title": null, "year": null, "season": null, "episode": null}') is None
+    assert parse_media_details("Fargo") is None
+    assert parse_media_details('{"media_type": "movie", "title": "Heat", "year": true, "season": 1, "episode": 1}') == {
+        "media_type": "movie", "title": "Heat", "year": None, "season": None, "episode": None,
+    }
+
+
+def test_combined_mode_identifies_everything_in_one_call(monkeypatch):
+    monkeypatch.setattr(openai_tasks, "_openai_extraction_mode", openai_tasks.COMBINED_EXTRACTION)
+    monkeypatch.setattr(openai_tasks, "identify_media_details_with_open_ai", lambda file_path: {
+        "media_type": "tv", "title": "Fargo", "year": 2014, "season": 1, "episode": 2,
+    })
+    monkeypatch.setattr(openai_tasks, "identify_media_type_with_open_ai", lambda file_path: _fail_per_field_call())
+
+    media, success = openai_tasks.openai_run_basic_identification_by_filename({"year": 2015}, file_path="fargo.mkv")
+
+    assert success is True
+    assert media == {"media_type": "tv", "title": "Fargo", "year": 2015, "season": 1, "episode": 2, "used_openai": True}
+
+
+def test_combined_mode_falls_back_to_per_field_calls(monkeypatch):
+    monkeypatch.setattr(openai_tasks, "_openai_extraction_mode", openai_tasks.COMBINED_EXTRACTION)
+    monkeypatch.setattr(openai_tasks, "identify_media_details_with_open_ai", lambda file_path: None)
+    monkeypatch.setattr(openai_tasks, "identify_media_type_with_open_ai", lambda file_path: "movie")
+    monkeypatch.setattr(openai_tasks, "identify_movie_title_with_open_ai", lambda file_path: "Heat")
+
+    media, success = openai_tasks.openai_run_basic_identification_by_filename(None, file_path="heat.mkv")
+
+    assert success is True
+    assert media == {"title": "Heat", "media_type": "movie", "used_openai": True}
+
+
+def test_unknown_extraction_mode_is_rejected(monkeypatch):
+    monkeypatch.setenv("OPENAI_EXTRACTION_MODE", "all_at_once")
+
+    with pytest.raises(ValueError, match="OPENAI_EXTRACTION_MODE"):
+        openai_tasks._read_openai_extraction_mode()
+
+
+def _fail_per_field_call():
+    raise AssertionError("The per-field calls should not run when the combined call succeeds.")
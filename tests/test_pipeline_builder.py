@@ -32,3 +32,25 @@ def test_metadata_pipeline_starts_with_cache_lookup():
     assert any(isinstance(handler, TMDBIdentifyMovieHandler) for handler in handlers)
 
 
+
+
+def test_plans_are_built_once_per_mode():
+    first = build_pipeline(MediaIdentificationRequest.from_filename("Movie.Title.2024.1080p.mkv"))
+    second = build_pipeline(MediaIdentificationRequest.from_filename("Show.S01E02.720p.mkv"))
+    metadata = build_pipeline(MediaIdentificationRequest.from_metadata(media_type="movie", title="Heat", year=1995))
+
+    assert first is second
+    assert metadata is not first
+    assert not hasattr(first, "append")
+
+
+def test_movie_plans_never_apply_tv_steps():
+    handlers = build_pipeline(MediaIdentificationRequest.from_filename("Movie.Title.2024.1080p.mkv"))
+
+    movie_steps = [type(handler) for index, handler in enumerate(handlers) if handlers.applies(index, "movie")]
+    tv_steps = [type(handler) for index, handler in enumerate(handlers) if handlers.applies(index, "tv")]
+
+    assert TMDBIdentifyMovieHandler in movie_steps
+    assert TMDBIdentifySeriesHandler not in movie_steps
+    assert TMDBIdentifySeriesHandler in tv_steps
+    assert TMDBIdentifyMovieHandler not in tv_steps
@@ -0,0 +1,173 @@
+import threading
+
+from src.media_identifiers.pipeline import PipelineContext, StepStatus
+from src.media_identifiers.pipeline import handlers
+from src.media_identifiers.pipeline.handlers import (
+    SpeculativeOpenAIIdentificationHandler,
+    TMDBEpisodeDetailsHandler,
+    TMDBIdentifyMovieHandler,
+)
+from src.models.media_identification_request import MediaIdentificationRequest
+
+
+def _context(title="Heat", year=None):
+    context = PipelineContext(MediaIdentificationRequest.from_filename("/media/Heat.mkv"), cache_repository=None)
+    context.media = {"title": title, "media_type": "movie", "year": year, "used_guessit": True}
+    return context
+
+
+def _tmdb_search(found_titles):
+    def identify(media):
+        if media["title"] not in found_titles:
+            return media, False
+        return {**media, "tmdb_id": found_titles[media["title"]], "used_tmdb": True}, True
+
+    return identify
+
+
+def _openai(title, release=None, finished=None):
+    def identify(media, file_path):
+        if release is not None:
+            release.wait(5)
+        if finished is not None:
+            finished.set()
+        return {**media, "title": title, "used_openai": True}, True
+
+    return identify
+
+
+def test_speculation_only_for_weak_guessit_titles(monkeypatch):
+    handler = SpeculativeOpenAIIdentificationHandler()
+    assert not handler.handles(_context())
+
+    monkeypatch.setattr(handlers, "_speculative_openai_enabled", True)
+    assert handler.handles(_context())
+    assert not handler.handles(_context(title="Heat", year=1995))
+    assert not handler.handles(_context(title="Crouching Tiger Hidden Dragon"))
+
+
+def test_openai_title_wins_when_the_guessit_title_has_no_match(monkeypatch):
+    monkeypatch.setattr(handlers, "tmdb_identify_movie_by_id", _tmdb_search({"Heat (1995)": 949}))
+    monkeypatch.setattr(handlers, "openai_run_basic_identification_by_filename", _openai("Heat (1995)"))
+    context = _context()
+
+    result = SpeculativeOpenAIIdentificationHandler().invoke(context)
+
+    assert result.status == StepStatus.SUCCESS
+    assert context.media["tmdb_id"] == 949
+    assert context.media["used_openai"] is True
+
+
+def test_guessit_title_wins_without_waiting_for_openai(monkeypatch):
+    monkeypatch.setattr(handlers, "tmdb_identify_movie_by_id", _tmdb_search({"Heat": 949}))
+    release = threading.Event()
+    openai_finished = threading.Event()
+    monkeypatch.setattr(
+        handlers, "openai_run_basic_identification_by_filename", _openai("Heat", release, openai_finished))
+    context = _context()
+
+    result = SpeculativeOpenAIIdentificationHandler().invoke(context)
+    openai_was_running = not openai_finished.is_set()
+    release.set()
+
+    assert openai_was_running
+    assert result.status == StepStatus.SUCCESS
+    assert context.media["tmdb_id"] == 949
+    assert "used_openai" not in context.media
+
+
+def test_fatal_when_neither_title_matches(monkeypatch):
+    monkeypatch.setattr(handlers, "tmdb_identify_movie_by_id", _tmdb_search({}))
+    monkeypatch.setattr(handlers, "openai_run_basic_identification_by_filename", _openai("Heist"))
+
+    result = SpeculativeOpenAIIdentificationHandler().invoke(_context())
+
+    assert result.status == StepStatus.FATAL
+
+
+def _tmdb_context(file_path, media):
+    context = PipelineContext(MediaIdentificationRequest.from_filename(file_path), cache_repository=None)
+    context.media = {"used_guessit": True, **media}
+    return context
+
+
+def test_tmdb_tries_the_other_guessit_titles_in_the_path(monkeypatch):
+    searched = []
+
+    def search(media):
+        searched.append(media["title"])
+        return _tmdb_search({"The Insider": 9008})(media)
+
+    monkeypatch.setattr(handlers, "tmdb_identify_movie_by_id", search)
+    context = _tmdb_context(
+        "/media/Movies/Heat (1995)/The.Insider.1999.1080p.BluRay.x264.mkv",
+        {"title": "Heat", "media_type": "movie", "year": 1995},
+    )
+
+    result = TMDBIdentifyMovieHandler().invoke(context)
+
+    assert result.status == StepStatus.SUCCESS
+    assert context.media["tmdb_id"] == 9008
+    assert context.media["title"] == "The Insider"
+    assert searched[0] == "Heat"
+    assert searched.count("Heat") == 1
+
+
+def test_tmdb_fails_when_no_title_in_the_path_matches(monkeypatch):
+    monkeypatch.setattr(handlers, "tmdb_identify_movie_by_id", _tmdb_search({}))
+    context = _tmdb_context(
+        "/media/Movies/Heat (1995)/The.Insider.1999.1080p.BluRay.x264.mkv",
+        {"title": "Heat", "media_type": "movie", "year": 1995},
+    )
+
+    assert TMDBIdentifyMovieHandler().invoke(context).status == StepStatus.FATAL
+
+
+def test_tmdb_tries_the_file_name_when_its_folder_won(monkeypatch):
+    monkeypatch.setattr(handlers, "tmdb_identify_movie_by_id", _tmdb_search({"heat": 949}))
+    context = _tmdb_context(
+        "/downloads/my favourite collection of great films/heat.1995.mkv",
+        {"title": "my favourite collection of great films", "media_type": "movie"},
+    )
+
+    result = TMDBIdentifyMovieHandler().invoke(context)
+
+    assert result.status == StepStatus.SUCCESS
+    assert context.media["tmdb_id"] == 949
+    assert context.media["year"] == 1995
+
+
+def test_speculation_falls_back_to_the_other_titles_in_the_path(monkeypatch):
+    monkeypatch.setattr(handlers, "tmdb_identify_movie_by_id", _tmdb_search({"heat": 949}))
+    monkeypatch.setattr(handlers, "openai_run_basic_identification_by_filename", _openai("Favourite Films"))
+    context = _tmdb_context(
+        "/downloads/my favourite collection of great films/heat.1995.mkv",
+        {"title": "my favourite collection of great films", "media_type": "movie"},
+    )
+
+    result = SpeculativeOpenAIIdentificationHandler().invoke(context)
+
+    assert result.status == StepStatus.SUCCESS
+    assert context.media["tmdb_id"] == 949
+
+
+def _episode_context(**media):
+    context = PipelineContext(MediaIdentificationRequest.from_filename("/media/Dark.S01E02.mkv"), cache_repository=None)
+    context.media = {"title": "Dark", "media_type": "tv", "season": 1, "episode": 2, **media}
+    return context
+
+
+def test_episode_step_runs_while_tmdb_id_is_the_series_id():
+    handler = TMDBEpisodeDetailsHandler()
+
+    # Series identification leaves the series id in tmdb_id, so the episode hasn't been fetched yet.
+    assert handler.handles(_episode_context(tmdb_id=70523, tmdb_series_id=70523))
+    assert handler.handles(_episode_context(tmdb_series_id=70523))
+
+
+def test_episode_step_skipped_once_the_episode_is_known():
+    handler = TMDBEpisodeDetailsHandler()
+
+    assert not handler.handles(_episode_context(tmdb_id=1337, tmdb_series_id=70523))
+    assert not handler.handles(_episode_context(tmdb_id=70523, tmdb_series_id=70523, episode=None))
+    assert not handler.handles(_episode_context(tmdb_id=70523))
@@ -0,0 +1,152 @@
+import threading
+
+import pytest
+
+from src.deadline import deadline_scope
+from src.media_identifiers.pipeline import (
+    DagPipelineController,
+    PipelineContext,
+    PipelineController,
+    PipelineHandler,
+    StepResult,
+)
+from src.media_identifiers.pipeline.base import PipelineExecutionError
+from src.models.media_identification_request import MediaIdentificationRequest
+
+
+class FieldHandler(PipelineHandler):
+    """Writes `values` (after waiting at `barrier`, if given), if every field in `requires` is set."""
+    def __init__(self, name, reads, values, requires=(), barrier=None, status=None):
+        self.name = name
+        self.reads = frozenset(reads)
+        self.writes = frozenset(values)
+        self.values = values
+        self.requires = requires
+        self.barrier = barrier
+        self.status = status
+        self.threads = []
+
+    def handles(self, context):
+        return all(context.media.get(field) is not None for field in self.requires)
+
+    def invoke(self, context):
+        self.threads.append(threading.current_thread().name)
+        if self.barrier is not None:
+            self.barrier.wait()
+        context.update_media(self.values)
+        return self.status or StepResult.success()
+
+
+class BarrierHandler(PipelineHandler):
+    name = "barrier"
+
+    def __init__(self):
+        self.seen = None
+
+    def invoke(self, context):
+        self.seen = dict(context.media)
+        context.update_media({"checked": True})
+        return StepResult.success()
+
+
+def _context():
+    request = MediaIdentificationRequest.from_metadata(media_type="tv", title="Dark", year=2017, season=1, episode=2)
+    return PipelineContext(request, cache_repository=None)
+
+
+def _tv_handlers(barrier=None):
+    return [
+        FieldHandler("identify_series", ["title"], {"tmdb_id": 70523, "tmdb_series_id": 70523}),
+        BarrierHandler(),
+        # Doesn't apply (season is known), so the episode details don't have to wait for it.
+        FieldHandler("season_episode", ["season", "episode"], {"season": 9}, requires=["missing"]),
+        FieldHandler("external_ids", ["tmdb_id"], {"imdb_id": "tt5753856"}, requires=["tmdb_id"], barrier=barrier),
+        FieldHandler(
+            "episode_details",
+            ["tmdb_series_id", "season", "episode"],
+            {"tmdb_id": 1320040, "episode_title": "Lies"},
+            requires=["tmdb_series_id"],
+            barrier=barrier),
+        FieldHandler("needs_episode", ["episode_title"], {"summary": "done"}, requires=["episode_title"]),
+    ]
+
+
+def test_same_outcome_as_running_in_order():
+    sequential = PipelineController(_tv_handlers()).run(_context())
+    concurrent = DagPipelineController(_tv_handlers()).run(_context())
+
+    assert concurrent.media == sequential.media
+    assert concurrent.media["tmdb_id"] == 1320040
+    assert concurrent.media["imdb_id"] == "tt5753856"
+    assert concurrent.media["summary"] == "done"
+
+
+def test_independent_steps_run_at_the_same_time():
+    # External ids and episode details only get past the barrier if they run at the same time.
+    both_running = threading.Barrier(2, timeout=5)
+    handlers = _tv_handlers(barrier=both_running)
+
+    DagPipelineController(handlers).run(_context())
+
+    assert not both_running.broken
+    assert handlers[2].threads == []
+    assert handlers[3].threads != handlers[4].threads
+
+
+def test_barriers_see_every_earlier_step():
+    handlers = _tv_handlers()
+
+    DagPipelineController(handlers).run(_context())
+
+    assert handlers[1].seen["tmdb_id"] == 70523
+
+
+def test_fatal_steps_stop_the_pipeline():
+    handlers = [
+        FieldHandler("identify_series", ["title"], {"tmdb_id": 1}, status=StepResult.fatal("Not found on TMDB")),
+        FieldHandler("external_ids", ["tmdb_id"], {"imdb_id": "tt1"}, requires=["tmdb_id"]),
+    ]
+
+    with pytest.raises(PipelineExecutionError, match="Not found on TMDB"):
+        DagPipelineController(handlers).run(_context())
+
+    assert handlers[1].threads == []
+
+
+def test_done_steps_end_the_pipeline_before_later_merges():
+    handlers = [
+        FieldHandler("cache_lookup", ["title"], {"cached": True}, status=StepResult.done("Cache hit")),
+        FieldHandler("unrelated", ["season"], {"extra": "value"}),
+    ]
+
+    result = DagPipelineController(handlers).run(_context())
+
+    assert result.completed
+    assert result.media["cached"] is True
+    assert "extra" not in result.media
+
+
+@pytest.mark.parametrize("controller_type", [PipelineController, DagPipelineController])
+def test_optional_steps_are_skipped_when_the_budget_runs_low(controller_type):
+    handlers = _tv_handlers()
+    handlers[3].optional = True
+
+    with deadline_scope(1):
+        context = _context()
+        result = controller_type(handlers).run(context)
+
+    assert result.partial
+    assert context.skipped_for_budget == ["external_ids"]
+    assert result.media.get("imdb_id") is None
+    assert result.media["episode_title"] == "Lies"
+
+
+def test_optional_steps_run_with_enough_budget():
+    handlers = _tv_handlers()
+    handlers[3].optional = True
+
+    with deadline_scope(60):
+        result = DagPipelineController(handlers).run(_context())
+
+    assert not result.partial
+    assert result.media["imdb_id"] == "tt5753856"
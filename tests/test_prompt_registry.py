@@ -0,0 +1,40 @@
+from src.media_identifiers.ai_functions import extract_movie_title_ai_function
+from src.media_identifiers.ai_functions.extract_media_type_ai_function import extract_media_type_from_filename
+from src.media_identifiers.prompt_registry import PromptRegistry
+
+
+def test_filename_goes_after_a_shared_prefix():
+    registry = PromptRegistry()
+    prompt = registry.get(extract_media_type_from_filename, "gpt-4o-mini")
+
+    first = prompt.build_input("Heat.1995.mkv")
+    second = prompt.build_input("Fargo.S01E02.mkv")
+
+    assert first.startswith(prompt.prefix) and second.startswith(prompt.prefix)
+    assert first.endswith("Heat.1995.mkv\n```")
+    assert "def extract_media_type_from_filename" in prompt.prefix
+
+
+def test_prompts_are_rendered_once_with_a_stable_version():
+    registry = PromptRegistry()
+
+    first = registry.get(extract_movie_title_ai_function, "gpt-4o-mini")
+    again = PromptRegistry().get(extract_movie_title_ai_function, "gpt-4o-mini")
+
+    assert registry.get(extract_movie_title_ai_function, "gpt-4o-mini") is first
+    assert first.name == "extract_movie_title_ai_function"
+    assert first.version == again.version
+    assert first.version != registry.get(extract_media_type_from_filename, "gpt-4o-mini").version
+
+
+def test_version_changes_with_the_model_and_the_output_schema():
+    registry = PromptRegistry()
+    response_format = {"type": "json_schema", "name": "title", "schema": {"type": "object"}}
+
+    plain = registry.get(extract_movie_title_ai_function, "gpt-4o-mini")
+    other_model = registry.get(extract_movie_title_ai_function, "gpt-4.1-mini")
+    structured = PromptRegistry().get(extract_movie_title_ai_function, "gpt-4o-mini", response_format)
+
+    assert len({plain.version, other_model.version, structured.version}) == 3
+    assert plain.prefix == other_model.prefix == structured.prefix
+    assert structured.response_format == response_format
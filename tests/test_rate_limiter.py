@@ -0,0 +1,88 @@
+import pytest
+
+from src.rate_limiter import RateLimitExceededError, SharedWindowRateLimiter, TokenBucketRateLimiter
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class FakeWindowRepository:
+    def __init__(self):
+        self.windows = {}
+
+    def increment_window(self, limiter_name: str, window_start: int) -> int:
+        key = (limiter_name, window_start)
+        self.windows[key] = self.windows.get(key, 0) + 1
+        return self.windows[key]
+
+
+def test_token_bucket_allows_burst_then_spaces_calls():
+    clock = FakeClock()
+    limiter = TokenBucketRateLimiter(rate_per_second=10, burst=2, name="test", clock=clock, sleep=clock.sleep)
+
+    assert limiter.acquire(max_wait=1) == 0
+    assert limiter.acquire(max_wait=1) == 0
+    assert limiter.acquire(max_wait=1) == pytest.approx(0.1)
+
+
+def test_token_bucket_rejects_when_wait_exceeds_deadline():
+    clock = FakeClock()
+    limiter = TokenBucketRateLimiter(rate_per_second=1, burst=1, name="test", clock=clock, sleep=clock.sleep)
+
+    limiter.acquire(max_wait=0)
+
+    with pytest.raises(RateLimitExceededError):
+        limiter.acquire(max_wait=0.5)
+
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_token_bucket_pause_delays_next_caller():
+    clock = FakeClock()
+    limiter = TokenBucketRateLimiter(rate_per_second=100, burst=5, name="test", clock=clock, sleep=clock.sleep)
+
+    limiter.pause_for(3)
+
+    assert limiter.acquire(max_wait=5) == pytest.approx(3.01)
+    assert limiter.stats()["throttled"] == 1
+
+
+def test_token_bucket_spaces_callers_queued_during_pause():
+    clock = FakeClock()
+    limiter = TokenBucketRateLimiter(rate_per_second=10, burst=5, name="test", clock=clock, sleep=lambda _: None)
+
+    limiter.pause_for(2)
+    wake_times = [clock.now + limiter.acquire(max_wait=5) for _ in range(4)]
+
+    assert wake_times == pytest.approx([1002.1, 1002.2, 1002.3, 1002.4])
+
+
+def test_shared_window_waits_for_next_window_when_full():
+    clock = FakeClock(now=500.25)
+    limiter = SharedWindowRateLimiter(
+        FakeWindowRepository(), limit_per_second=2, name="test", clock=clock, sleep=clock.sleep
+    )
+
+    assert limiter.acquire(max_wait=2) == 0
+    assert limiter.acquire(max_wait=2) == 0
+    assert limiter.acquire(max_wait=2) == pytest.approx(0.75)
+
+
+def test_shared_window_rejects_past_deadline():
+    clock = FakeClock(now=500.25)
+    limiter = SharedWindowRateLimiter(
+        FakeWindowRepository(), limit_per_second=1, name="test", clock=clock, sleep=clock.sleep
+    )
+
+    limiter.acquire(max_wait=0)
+
+    with pytest.raises(RateLimitExceededError):
+        limiter.acquire(max_wait=0.5)
@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+from src.media_identifiers.helpers import build_identification_key
+from src.media_identifiers.pipeline.base import PipelineContext, StepStatus
+from src.media_identifiers.pipeline.handlers import SingleFlightHandler
+from src.models.media_identification_request import MediaIdentificationRequest
+from src.repositories.advisory_lock_repository import AdvisoryLockRepository
+from src.repositories.connection_pool import ConnectionPoolTimeoutError
+from src.single_flight import SingleFlight
+
+
+class ExhaustedPool:
+    def getconn(self, timeout=None):
+        raise ConnectionPoolTimeoutError("every lock connection is in use")
+
+
+def test_followers_receive_the_leader_result():
+    single_flight = SingleFlight("test")
+    leader = single_flight.join("key")
+    followers = [single_flight.join("key") for _ in range(3)]
+    results = []
+
+    threads = [threading.Thread(target=lambda lease=lease: results.append(lease.wait(5))) for lease in followers]
+    for thread in threads:
+        thread.start()
+
+    leader.complete({"tmdb_id": 1})
+    for thread in threads:
+        thread.join()
+
+    assert leader.is_leader is True
+    assert not any(lease.is_leader for lease in followers)
+    assert results == [{"tmdb_id": 1}] * 3
+    assert single_flight.stats()["in_flight"] == 0
+    assert single_flight.join("key").is_leader is True
+
+
+def test_followers_receive_the_leader_error():
+    single_flight = SingleFlight("test")
+    leader = single_flight.join("key")
+    follower = single_flight.join("key")
+
+    leader.fail(ValueError("boom"))
+
+    with pytest.raises(ValueError):
+        follower.wait(1)
+
+
+def test_identification_key_is_normalized():
+    first = build_identification_key({"title": "Fargo", "media_type": "TV", "year": 2014, "season": 1, "episode": 2})
+    second = build_identification_key({"searchable_reference": "fargo", "media_type": "tv", "year": 2014, "season": 1, "episode": 2})
+
+    assert first == second
+    assert build_identification_key({"title": "Fargo"}) is None
+
+
+def test_handler_shares_the_leader_result_with_concurrent_requests():
+    request = MediaIdentificationRequest.from_metadata(media_type="movie", title="Unique Movie Title", year=2001)
+    leader_context = PipelineContext(request, cache_repository=None)
+    follower_context = PipelineContext(request, cache_repository=None)
+    handler = SingleFlightHandler()
+    outcome = {}
+
+    assert handler.invoke(leader_context).status == StepStatus.SUCCESS
+    assert leader_context.single_flight_lease.is_leader is True
+
+    follower = threading.Thread(target=lambda: outcome.update(status=handler.invoke(follower_context).status))
+    follower.start()
+    leader_context.release_single_flight(result={"tmdb_id": 10, "title": "Unique Movie Title"})
+    follower.join()
+
+    assert outcome["status"] == StepStatus.DONE
+    assert follower_context.cached_result == {"tmdb_id": 10, "title": "Unique Movie Title"}
+
+
+def test_handler_runs_once_per_request():
+    request = MediaIdentificationRequest.from_metadata(media_type="movie", title="Another Unique Title", year=2002)
+    context = PipelineContext(request, cache_repository=None)
+    handler = SingleFlightHandler()
+
+    assert handler.handles(context) is True
+    handler.invoke(context)
+
+    assert handler.handles(context) is False
+    context.release_single_flight(result=None)
+
+
+def test_advisory_lock_is_skipped_when_the_lock_pool_is_exhausted():
+    repository = AdvisoryLockRepository(ExhaustedPool())
+
+    assert repository.acquire("media_identification:movie|heat|1995", timeout_seconds=1) is None
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.media_identifiers.stream_identifier import LineTooLongError, identify_stream, iter_lines
+from src.worker_pool import BlockingWorkerPool
+
+_executor = ThreadPoolExecutor(max_workers=8)
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def _collect(async_iterator):
+    return [item async for item in async_iterator]
+
+
+def test_lines_are_split_across_chunks():
+    chunks = _chunks(b"the.matrix.1999.mkv\r\nheat.19", b"95.mkv\n\n  \nronin.1998.mkv")
+
+    lines = asyncio.run(_collect(iter_lines(chunks, max_line_length=100)))
+
+    assert lines == ["the.matrix.1999.mkv", "heat.1995.mkv", "ronin.1998.mkv"]
+
+
+def test_overlong_lines_stop_the_stream():
+    with pytest.raises(LineTooLongError):
+        asyncio.run(_collect(iter_lines(_chunks(b"a" * 50, b"b" * 60), max_line_length=100)))
+
+
+def test_every_path_gets_a_result_with_its_index():
+    def identify(file_path):
+        if file_path == "broken.mkv":
+            raise RuntimeError("TMDB is down")
+        if file_path == "readme.txt":
+            return None
+        return {"title": file_path}
+
+    async def file_paths():
+        for file_path in ["heat.1995.mkv", "broken.mkv", "readme.txt"]:
+            yield file_path
+
+    results = asyncio.run(_collect(identify_stream(file_paths(), identify, max_in_flight=2, submit=_executor.submit)))
+
+    by_index = {result["index"]: result for result in results}
+    assert sorted(by_index) == [0, 1, 2]
+    assert by_index[0]["status"] == 200
+    assert by_index[1]["status"] == 500
+    assert by_index[1]["error"] == "TMDB is down"
+    assert by_index[2]["status"] == 204
+
+
+def test_input_is_not_read_ahead_of_the_in_flight_limit():
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+    read = 0
+    max_read_ahead = 0
+    completed = 0
+
+    def identify(file_path):
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        return {"title": file_path}
+
+    async def file_paths():
+        nonlocal read, max_read_ahead
+        for index in range(40):
+            read += 1
+            max_read_ahead = max(max_read_ahead, read - completed)
+            yield f"file-{index}.mkv"
+
+    async def consume():
+        nonlocal completed
+        async for _ in identify_stream(file_paths(), identify, max_in_flight=3, submit=_executor.submit):
+            completed += 1
+
+    asyncio.run(consume())
+
+    assert completed == 40
+    assert max_running <= 3
+    assert max_read_ahead <= 4
+
+
+async def _paths(*file_paths):
+    for file_path in file_paths:
+        yield file_path
+
+
+def test_a_full_pool_makes_the_stream_wait_for_its_own_identifications():
+    pool = BlockingWorkerPool(max_workers=1, max_queue_depth=0, name="test")
+
+    results = asyncio.run(_collect(identify_stream(
+        _paths("a.mkv", "b.mkv", "c.mkv"),
+        lambda file_path: {"title": file_path},
+        max_in_flight=3,
+        submit=pool.submit)))
+    pool.shutdown()
+
+    assert sorted(result["status"] for result in results) == [200, 200, 200]
+
+
+def test_paths_get_a_503_when_the_pool_is_full_of_other_work():
+    pool = BlockingWorkerPool(max_workers=1, max_queue_depth=0, name="test")
+    release = threading.Event()
+    pool.submit(release.wait)
+
+    results = asyncio.run(_collect(identify_stream(
+        _paths("a.mkv"),
+        lambda file_path: {"title": file_path},
+        max_in_flight=3,
+        submit=pool.submit)))
+    release.set()
+    pool.shutdown()
+
+    assert [result["status"] for result in results] == [503]
+    assert "capacity" in results[0]["error"]
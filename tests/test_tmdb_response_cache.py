@@ -0,0 +1,30 @@
+from src.media_identifiers.tmdb_response_cache import TMDBResponseCache, build_cache_key, classify_endpoint
+from src.memory_cache import TTLLRUCache
+
+_BASE_URL = "https://api.themoviedb.org/3"
+_TTLS = {"search": 1, "details": 2, "external_ids": 3, "season": 4, "episode": 5}
+
+
+def test_cache_key_ignores_parameter_order_and_case():
+    first = build_cache_key(f"{_BASE_URL}/search/movie", {"query": "Fargo ", "Language": "en-US", "page": 1})
+    second = build_cache_key(f"{_BASE_URL}/search/movie/", {"page": "1", "language": "en-US", "query": "Fargo"})
+
+    assert first == second
+
+
+def test_classify_endpoint():
+    assert classify_endpoint(f"{_BASE_URL}/search/tv") == "search"
+    assert classify_endpoint(f"{_BASE_URL}/movie/275") == "details"
+    assert classify_endpoint(f"{_BASE_URL}/tv/60622/external_ids") == "external_ids"
+    assert classify_endpoint(f"{_BASE_URL}/tv/60622/season/1") == "season"
+    assert classify_endpoint(f"{_BASE_URL}/tv/60622/season/1/episode/1") == "episode"
+
+
+def test_same_series_details_are_served_from_memory():
+    cache = TMDBResponseCache(TTLLRUCache(max_entries=10, default_ttl=None, name="test"), _TTLS)
+    url = f"{_BASE_URL}/tv/60622"
+
+    cache.set(url, {"language": "en-US"}, {"id": 60622, "name": "Fargo"})
+
+    assert cache.get(url, {"language": "en-US"}) == {"id": 60622, "name": "Fargo"}
+    assert cache.get(url, {"language": "pt-BR"}) is None
@@ -0,0 +1,91 @@
+from src.media_identifiers.media_identification_tasks import tmdb_tasks
+from src.media_identifiers.pipeline import DagPipelineController
+from src.media_identifiers.pipeline.base import PipelineContext
+from src.media_identifiers.pipeline.handlers import TMDBEpisodeDetailsHandler, TMDBSeriesExternalIdsHandler
+from src.models.media_identification_request import MediaIdentificationRequest
+from src.models.media_info import MediaInfoBuilder
+
+
+class FakeCacheRepository:
+    def __init__(self):
+        self.cached_records = []
+
+    def cache_many(self, records):
+        self.cached_records.extend(records)
+        return len(records)
+
+
+def _series_media() -> dict:
+    return MediaInfoBuilder() \
+        .with_title("Fargo") \
+        .with_original_title("Fargo") \
+        .with_media_type("tv") \
+        .with_year(2014) \
+        .with_tmdb_id(60622) \
+        .with_tmdb_series_id(60622) \
+        .with_season(1) \
+        .with_episode(2) \
+        .build()
+
+
+def _season_episodes() -> list:
+    return [
+        MediaInfoBuilder()
+        .with_media_type("tv")
+        .with_tmdb_id(1000 + number)
+        .with_tmdb_series_id(60622)
+        .with_season(1)
+        .with_episode(number)
+        .with_episode_title(f"Episode {number}")
+        .build()
+        for number in range(1, 4)
+    ]
+
+
+def test_season_prefetch_caches_every_episode_and_returns_current(monkeypatch):
+    monkeypatch.setattr(tmdb_tasks, "request_tmdb_season_details", lambda tmdb_id, season: _season_episodes())
+    cache_repository = FakeCacheRepository()
+
+    media, success = tmdb_tasks.tmdb_get_episode_details_from_season(
+        _series_media(),
+        success=True,
+        cache_repository=cache_repository,
+    )
+
+    assert success is True
+    assert media["tmdb_id"] == 1002
+    assert media["episode_title"] == "Episode 2"
+    assert media["title"] == "Fargo"
+    assert [record["episode"] for record in cache_repository.cached_records] == [1, 2, 3]
+    assert all(record["year"] == 2014 for record in cache_repository.cached_records)
+
+
+def test_episode_details_handler_runs_while_tmdb_id_is_the_series_id():
+    request = MediaIdentificationRequest.from_metadata(media_type="tv", title="Fargo", year=2014, season=1, episode=2)
+    context = PipelineContext(request, cache_repository=FakeCacheRepository())
+    handler = TMDBEpisodeDetailsHandler()
+
+    context.update_media(_series_media())
+    assert handler.handles(context) is True
+
+    context.update_media({"tmdb_id": 1002})
+    assert handler.handles(context) is False
+
+
+def test_prefetched_episodes_carry_the_series_external_ids(monkeypatch):
+    monkeypatch.setattr(tmdb_tasks, "request_tmdb_season_details", lambda tmdb_id, season: _season_episodes())
+    monkeypatch.setattr(
+        tmdb_tasks,
+        "_tmdb_get_media_external_ids",
+        lambda media_data, **kwargs: ({"imdb_id": "tt2802850", "tvdb_id": 269613}, True))
+    request = MediaIdentificationRequest.from_metadata(media_type="tv", title="Fargo", year=2014, season=1, episode=2)
+    cache_repository = FakeCacheRepository()
+    context = PipelineContext(request, cache_repository=cache_repository)
+    context.update_media(_series_media())
+
+    DagPipelineController([TMDBSeriesExternalIdsHandler(), TMDBEpisodeDetailsHandler()]).run(context)
+
+    assert context.media["imdb_id"] == "tt2802850"
+    assert [record["episode"] for record in cache_repository.cached_records] == [1, 2, 3]
+    assert all(record["imdb_id"] == "tt2802850" for record in cache_repository.cached_records)
+    assert all(record["tvdb_id"] == 269613 for record in cache_repository.cached_records)
@@ -0,0 +1,48 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.utils import first_successful
+
+
+def test_first_successful_returns_the_first_success_without_waiting_for_the_rest():
+    release = threading.Event()
+    slow_finished = threading.Event()
+
+    def slow():
+        release.wait(5)
+        slow_finished.set()
+        return "slow"
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        winner, result = first_successful(executor, [slow, lambda: "fast"])
+        slow_was_running = not slow_finished.is_set()
+        release.set()
+
+    assert (winner, result) == (1, "fast")
+    assert slow_was_running
+
+
+def test_first_successful_skips_failures():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        winner, result = first_successful(
+            executor,
+            [lambda: (None, False), lambda: ({"tmdb_id": 1}, True)],
+            is_success=lambda outcome: outcome[1],
+        )
+
+    assert winner == 1
+    assert result == ({"tmdb_id": 1}, True)
+
+
+def test_first_successful_when_nothing_succeeds():
+    def boom():
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert first_successful(executor, [lambda: None, lambda: 0]) == (None, None)
+        assert first_successful(executor, [boom, lambda: "ok"]) == (1, "ok")
+
+        with pytest.raises(ValueError, match="boom"):
+            first_successful(executor, [boom, lambda: None])
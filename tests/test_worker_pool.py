@@ -0,0 +1,51 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.utils import get_request_id, set_request_id
+from src.worker_pool import BlockingWorkerPool, WorkerPoolSaturatedError
+
+
+def test_slow_tasks_run_concurrently():
+    pool = BlockingWorkerPool(max_workers=4, max_queue_depth=0, name="test")
+    # Only lets the tasks through once all four are running at the same time; otherwise they fail after 5s.
+    all_running = threading.Barrier(4, timeout=5)
+
+    async def run_all():
+        return await asyncio.gather(*(pool.run(all_running.wait) for _ in range(4)))
+
+    asyncio.run(run_all())
+
+    pool.shutdown()
+    assert not all_running.broken
+    assert pool.stats()["completed"] == 4
+
+
+def test_rejects_when_capacity_is_exhausted():
+    pool = BlockingWorkerPool(max_workers=1, max_queue_depth=1, name="test")
+    release = threading.Event()
+
+    pool.submit(release.wait)
+    pool.submit(release.wait)
+
+    with pytest.raises(WorkerPoolSaturatedError):
+        pool.submit(release.wait)
+
+    release.set()
+    pool.shutdown()
+
+    stats = pool.stats()
+    assert stats["rejected"] == 1
+    assert stats["in_flight"] == 0
+
+
+def test_context_variables_reach_worker_thread():
+    pool = BlockingWorkerPool(max_workers=1, max_queue_depth=0, name="test")
+
+    async def run_with_request_id():
+        set_request_id("request-123")
+        return await pool.run(get_request_id)
+
+    assert asyncio.run(run_with_request_id()) == "request-123"
+    pool.shutdown()